@@ -1,35 +1,188 @@
 import re
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import zipfile
-import os
 import plotly.express as px
 import plotly.graph_objects as go
-import random
 
 from scipy.stats import chi2_contingency
 
-from import_data import load_data
+from betting import STRATEGIES, backtest, bankroll_curves, strategy_ranking
+from dataset import current_dataset, dataset_fingerprint, invalidate_dataset
+from elo import ELO_PARAMS
+from form import compute_form, player_form, short_histories
+from import_data import load_data_from_zip
+from odds_analysis import calibration_scores, implied_probabilities, margin_over_time, reliability_bins
+from simulation import actual_table_likelihood, simulate_season, simulation_summary
+from standings import compute_standings, league_table
+from substitutions import (MINUTE_LABELS, substitution_summary, substitution_timing, substitutions_by_result,
+                           substitutions_per_match, team_substitutions)
+from team_view import RESULTS, played
+
+# Noms des championnats
+CHAMPIONSHIP_NAMES = {
+    1: "Ligue 1",
+    2: "Premier League",
+    3: "La Liga",
+    4: "Bundesliga",
+    5: "Serie A",
+}
 
 st.set_page_config(page_title="⚽️ Statistiques de Football", layout="wide")
 st.title("📊 Football Data Explorer")
 
-tabs = st.tabs([
-    "⬆️ Data",
-    "⚽️ 4.1 - Clubs",
-    "🧍‍♂️ 4.2 - Joueurs",
-    "📅 4.3 - Matchs",
-    "📈 5.1 - Résultats",
-    "⚡️ 5.2 - Messi",
-    "👕 5.3 - Liverpool/Arsenal",
-    "🏠📊 5.4 - Lieu du match/Résultat",
-    "💸 5.5 - Paris sportif",
-    "🧠 5.6 - Formation/Victoire"
-])
+
+# Calculs des analyses, mémorisés par version du jeu de données : l'empreinte sert de clé
+# de cache, le Dataset (_ds) n'est pas haché. Un rerun ne recalcule que la page affichée,
+# et seulement si les données ont changé.
+
+# Forme de tous les joueurs pour une statistique et une fenêtre (une stat du format long est
+# élargie seule, juste pour ce calcul)
+@st.cache_data(show_spinner=False)
+def player_form_table(fingerprint, _ds, stat, window):
+    return compute_form(_ds.with_player_stats(_ds.player_match_rows(), [stat]), stat, window)
+
+
+# Classements de tous les championnats et de toutes les saisons
+@st.cache_data(show_spinner=False)
+def all_standings(fingerprint, _ds):
+    return compute_standings(_ds.team_view(), _ds.team_names())
+
+
+# Nombre de buts par (championnat, joueur), à partir des agrégats joueur/saison
+# (buteurs présents sur la feuille de match)
+@st.cache_data(show_spinner=False)
+def top_scorers(fingerprint, _ds):
+    seasons = _ds.player_seasons()
+    seasons = seasons[seasons['team_id'].notna() & (seasons['goals'] > 0)]
+    return seasons.groupby(['championship', 'playerid'], observed=True)['goals'].sum().reset_index()
+
+
+# Moyennes mensuelles des notes par poste pour un club
+@st.cache_data(show_spinner=False)
+def monthly_marks_by_position(fingerprint, _ds, team_id):
+    team_players = _ds.team_player_rows(team_id)
+
+    # Nettoyer les positions
+    team_players['position'] = (
+        team_players['position']
+        .str.lower()
+        .str.strip()
+        .replace({'striker': 'forward'})
+    )
+
+    # Supprimer la timezone si elle existe
+    team_players['date'] = team_players['date'].dt.tz_localize(None)
+
+    return (
+        team_players
+        .groupby([
+            team_players['date'].dt.to_period('M').dt.to_timestamp().rename('month'),
+            'position'
+        ])['final_mark_2015']
+        .mean()
+        .reset_index()
+        .rename(columns={'final_mark_2015': 'avg_note'})
+    )
+
+
+# Écart de buts match par match, du point de vue de chaque club
+@st.cache_data(show_spinner=False)
+def goal_diffs(fingerprint, _ds, team_ids):
+    def compute_goal_diff(team_id):
+        df = _ds.team_view(team_id)
+        df['goal_diff'] = df['goals_for'] - df['goals_against']
+        df['club'] = _ds.team_names()[team_id]
+        return df[['date', 'goal_diff', 'club']]
+
+    df_combined = pd.concat([compute_goal_diff(team_id) for team_id in team_ids])
+    return df_combined.sort_values(by=['club', 'date'])
+
+
+# Remplacements de tous les clubs : changements rattachés à leur club, matchs joués avec le nombre de
+# changements du club et résumé par club et par saison
+@st.cache_data(show_spinner=False)
+def substitution_tables(fingerprint, _ds):
+    team_subs = team_substitutions(_ds.substitutions(), _ds.matches())
+    per_match = substitutions_per_match(_ds.team_view(), team_subs)
+    return team_subs, per_match, substitution_summary(per_match)
+
+
+# Tableau de contingence lieu/résultat et test du chi2
+@st.cache_data(show_spinner=False)
+def home_away_contingency(fingerprint, _ds):
+    # Une ligne par club et par match joué : lieu et résultat
+    view = played(_ds.team_view())
+    all_results = pd.DataFrame({
+        'lieu': np.where(view['home'], 'Domicile', 'Extérieur'),
+        'result': view['result'].map(RESULTS).to_numpy(),
+    })
+
+    # Tableau de contingence effectifs
+    cont = all_results.groupby(['lieu', 'result']).size().unstack(fill_value=0)
+    cont = cont[['Victoire', 'Nul', 'Défaite']]
+
+    # Test du chi2 sur 2x3
+    chi2, p, _, _ = chi2_contingency(cont.values)
+    return cont, chi2, p
+
+
+# Gains de toutes les stratégies de paris pour tous les clubs (une ligne par club et par match)
+@st.cache_data(show_spinner=False)
+def betting_results(fingerprint, _ds):
+    return backtest(_ds.team_view())
+
+
+# Probabilités implicites des cotes de tous les matchs
+@st.cache_data(show_spinner=False)
+def odds_probabilities(fingerprint, _ds):
+    return implied_probabilities(_ds.matches())
+
+
+# Simulations Monte-Carlo d'une saison (résultat identique pour les mêmes paramètres)
+@st.cache_data(show_spinner="Simulation des saisons...")
+def season_simulation(fingerprint, _ds, championship, season, n_sims):
+    return simulate_season(_ds.matches(championship, season), n_sims=n_sims)
+
+
+# Classement Elo pour d'autres paramètres que ceux par défaut : quelques combinaisons gardées,
+# les plus anciennes sont libérées
+@st.cache_data(show_spinner="Calcul du classement Elo...", max_entries=8)
+def elo_ratings(fingerprint, _ds, params):
+    return _ds.ratings(params)
+
+
+@st.cache_data(show_spinner=False)
+def formation_win_rates(fingerprint, _ds):
+    # 1. Une ligne par club et par match joué (vue club/match)
+    all_teams = played(_ds.team_view())
+
+    # 2. Formation normalisée, calculée une fois par formation distincte ("343d" -> "3-4-3")
+    formations = all_teams['formation'].astype(str)
+    cleaned = {f: "-".join(re.sub(r'[^\d]', '', f.lower())) for f in formations.unique()}
+    all_teams = all_teams.assign(formation=formations.map(cleaned))
+
+    # 3. Calculer le taux de victoire par formation
+    return (
+        all_teams
+          .assign(win=all_teams['result'] == 1)
+          .groupby('formation')
+          .agg(
+             win_rate=('win', 'mean'),
+             count   =('result', 'size')
+          )
+        .reset_index()
+        .sort_values(
+            by=['win_rate', 'count'],
+            ascending=[False, False]
+        )
+    )
+
 
 # Onglet Upload
-with tabs[0]:
+def page_upload():
     st.header("⬆️ Upload des données JSON / ZIP")
 
     uploaded_file = st.file_uploader("Choisis un fichier JSON ou ZIP", type=['json', 'zip'])
@@ -37,1038 +190,1253 @@ with tabs[0]:
         if uploaded_file.type == "application/zip" or uploaded_file.name.endswith('.zip'):
             with zipfile.ZipFile(uploaded_file) as z:
                 json_files = [f for f in z.namelist() if f.endswith('.json')]
+                upload_key = (uploaded_file.name, uploaded_file.size)
                 if not json_files:
                     st.error("Le ZIP ne contient pas de fichiers JSON.")
+                elif st.session_state.get("upload_key") == upload_key:
+                    # ZIP déjà ingéré lors d'un précédent rerun : on réutilise les données de la session
+                    st.success(f"{len(json_files)} fichiers JSON déjà chargés.")
                 else:
-                    # Sauvegarde les fichiers JSON extraits dans ../data
-                    data_dir = '../data'
-                    os.makedirs(data_dir, exist_ok=True)
-                    for jf in json_files:
-                        with z.open(jf) as f:
-                            content = f.read()
-                            # On récupère juste le nom du fichier sans les sous-dossiers
-                            filename = os.path.basename(jf)
-                            with open(os.path.join(data_dir, filename), 'wb') as out_f:
-                                out_f.write(content)
-                    st.success(f"{len(json_files)} fichiers JSON extraits dans {data_dir}.")
-
-                    # Charger les données
-                    data = load_data(force_refresh=False)
+                    # Parsing en flux des membres du ZIP, sans extraction dans ../data
+                    data = load_data_from_zip(z)
+                    st.success(f"{len(json_files)} fichiers JSON lus depuis le ZIP.")
                     if data is None or any(d is None for d in data):
                         st.error("Erreur: les données n'ont pas pu être chargées.")
                     else:
-                        teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df, transfers_df = data
-
-                        matches_df[['home_idteam', 'away_idteam']] = matches_df[['home_idteam', 'away_idteam']].astype('Int64')
-                        teams_df['idteam'] = teams_df['idteam'].astype('Int64')
-
-                        st.session_state["data_loaded"] = True  # Marquer que les données sont prêtes
-                        st.session_state["teams_df"] = teams_df
-                        st.session_state["players_df"] = players_df
-                        st.session_state["matches_df"] = matches_df
-                        st.session_state["highlights_df"] = highlights_df
-                        st.session_state["substitutions_df"] = substitutions_df
-                        st.session_state["match_players_df"] = match_players_df
+                        # Les CSV ont changé : la version partagée du jeu de données est rechargée
+                        invalidate_dataset()
+                        with st.expander("📦 Mémoire des tables (Mo)"):
+                            st.dataframe(current_dataset().memory)
+
+                        st.session_state["upload_key"] = upload_key
         else:
             st.error("Merci d'uploader un fichier ZIP contenant les JSON.")
+    elif dataset_fingerprint() is not None:
+        st.info("Données déjà chargées : upload un fichier ZIP pour les remplacer.")
     else:
         st.info("Upload un fichier ZIP pour commencer.")
 
 
 # 4.1. Liste des clubs
-with tabs[1]:
+def page_clubs(ds):
     st.header("⚽️ 4.1 - Informations sur les clubs")
+    teams_df = ds.teams()
+
+    clubs_df = teams_df[['idteam', 'name']].sort_values('name').reset_index(drop=True)
+    st.dataframe(clubs_df, use_container_width=True)
+
+    # 4.1 Nom du club dont l'id est 43
+    # Rechercher le club avec l'ID 43
+    st.subheader("🔍 Recherche de club par ID")
+
+    id_disponibles = sorted(teams_df['idteam'].unique())
+
+    # Trouver l'index de 43 si présent
+    index_defaut = id_disponibles.index(43) if 43 in id_disponibles else 0
+
+    id_selection = st.selectbox("Sélectionnez un ID de club :", id_disponibles, index=index_defaut)
+
+    club_nom = teams_df.loc[teams_df['idteam'] == id_selection, 'name'].iloc[0]
+    st.success(f"Le club avec l'ID **{id_selection}** est : **{club_nom}**")
+
+    # 4.1 Nombre total de clubs
+    nombre_clubs = len(teams_df['idteam'].unique())
+    st.info(f"Nombre total de clubs : **{nombre_clubs}**")
+
+    # 4.1 Effectif d'un club au fil d'une saison (passages en club)
+    st.subheader("👥 Effectif d'un club")
+    club_id = club_selector(ds, "Club", 'squad_club', 'Liverpool')
+    if club_id is None:
+        return
+    club = ds.team_names()[club_id]
+
+    # Saisons du club et dates de son premier et dernier match de chaque saison
+    periods = (
+        ds.team_view(club_id)
+        .groupby(['championship', 'season'], observed=True)['date']
+        .agg(['min', 'max'])
+        .sort_values('max')
+    )
+    if periods.empty:
+        st.info(f"Aucun match pour {club}.")
+        return
+    labels = {key: f"{CHAMPIONSHIP_NAMES.get(key[0], f'Championnat {key[0]}')} {key[1]}" for key in periods.index}
+    period = st.selectbox("Saison", list(labels), index=len(labels) - 1, format_func=labels.get, key='squad_season')
+    first, last = periods.loc[period, 'min'].date(), periods.loc[period, 'max'].date()
+
+    spells = ds.spells().team(club_id, first, last)
+    if spells.empty:
+        st.info(f"Aucun passage de joueur connu pour {club} sur cette saison.")
+        return
+    st.plotly_chart(spells_timeline(spells, 'player_name', f"Effectif de {club} - {labels[period]}"),
+                    use_container_width=True)
+
+    # Effectif à une date de la saison
+    date = first
+    if first < last:
+        date = st.slider("Effectif au", min_value=first, max_value=last, value=last, key='squad_date')
+    squad = ds.spells().squad_at(club_id, date)
+    st.write(f"**{len(squad)}** joueur(s) à {club} le {date.strftime('%d/%m/%Y')}")
+    st.dataframe(pd.DataFrame({
+        'ID': squad['playerid'],
+        'Joueur': squad['player_name'],
+        'Arrivé le': squad['start_date'].dt.strftime('%d/%m/%Y'),
+        "Jusqu'au": squad['end_date'].dt.strftime('%d/%m/%Y'),
+    }), hide_index=True)
 
-    if "data_loaded" in st.session_state and st.session_state["data_loaded"]:
-        clubs_df = teams_df[['idteam', 'name']].sort_values('name').reset_index(drop=True)
-        st.dataframe(clubs_df, use_container_width=True)
-
-        # 4.1 Nom du club dont l'id est 43
-        # Rechercher le club avec l'ID 43
-        st.subheader("🔍 Recherche de club par ID")
-
-        # S'assurer que les ID sont bien des entiers
-        teams_df['idteam'] = teams_df['idteam'].astype(int)
-        id_disponibles = sorted(teams_df['idteam'].unique())
-
-        # Trouver l'index de 43 si présent
-        index_defaut = id_disponibles.index(43) if 43 in id_disponibles else 0
-
-        id_selection = st.selectbox("Sélectionnez un ID de club :", id_disponibles, index=index_defaut)
-
-        club_nom = teams_df.loc[teams_df['idteam'] == id_selection, 'name'].iloc[0]
-        st.success(f"Le club avec l'ID **{id_selection}** est : **{club_nom}**")
-
-        # 4.1 Nombre total de clubs
-        nombre_clubs = len(teams_df['idteam'].unique())
-        st.info(f"Nombre total de clubs : **{nombre_clubs}**")
-    else:
-        st.warning("📁 Merci d’uploader d’abord un fichier JSON/ZIP dans l’onglet Upload.")
 
 # 4.2 Liste des joueurs
-with tabs[2]:
-    if "data_loaded" in st.session_state and st.session_state["data_loaded"]:
-        st.header("🧍‍♂️ 4.2 - Informations sur les joueurs")
+def page_players(ds):
+    st.header("🧍‍♂️ 4.2 - Informations sur les joueurs")
 
-        joueurs_df = players_df[['playerid', 'lastname']].sort_values('lastname').reset_index(drop=True)
+    joueurs_df = ds.players()[['playerid', 'lastname']].sort_values('lastname').reset_index(drop=True)
 
-        st.subheader("Liste des joueurs :")
-        st.dataframe(joueurs_df, use_container_width=True)
-
-        # 4.2 Nombre total de joueurs
-        nombre_joueurs = len(joueurs_df)
-        st.info(f"Nombre total de joueurs : **{nombre_joueurs}**")
-    else:
-        st.warning("📁 Merci d’uploader d’abord un fichier JSON/ZIP dans l’onglet Upload.")
+    st.subheader("Liste des joueurs :")
+    st.dataframe(joueurs_df, use_container_width=True)
 
-# 4.3
-with tabs[3]:
-    if "data_loaded" in st.session_state and st.session_state["data_loaded"]:
-        st.header("📅 4.3 - Informations sur les matchs")
-
-        # Préparer le DataFrame des matchs
-        matchs_df = matches_df[['matchid', 'date', 'home_idteam', 'away_idteam', 'home_score', 'away_score']].copy().reset_index(drop=True)
-        matchs_df = matchs_df.sort_values('date')
-        # Ajouter les noms des équipes
-        matchs_df = matchs_df.merge(teams_df[['idteam', 'name']], left_on='home_idteam', right_on='idteam', how='left')
-        matchs_df = matchs_df.merge(teams_df[['idteam', 'name']], left_on='away_idteam', right_on='idteam', how='left', suffixes=('_home', '_away'))
-
-        # Sélectionner et renommer les colonnes pour affichage
-        matchs_df = matchs_df[['matchid', 'date', 'name_home', 'name_away', 'home_score', 'away_score']]
-        matchs_df.columns = ['ID Match', 'Date', 'Équipe Domicile', 'Équipe Extérieur', 'Score Domicile', 'Score Extérieur']
-
-        # Afficher dans Streamlit
-        st.subheader("Liste des matchs :")
-        st.dataframe(matchs_df, hide_index=True, use_container_width=True)
-
-        # Filtrer les matchs d'Arsenal à domicile
-        arsenal_home = matchs_df[matchs_df['Équipe Domicile'] == 'Arsenal']
-
-        # Affichage
-        st.subheader("Matchs où Arsenal joue à domicile")
-        if not arsenal_home.empty:
-            st.dataframe(arsenal_home[['ID Match', 'Date', 'Équipe Extérieur', 'Score Domicile', 'Score Extérieur']], hide_index=True, use_container_width=True)
-            st.success(f"{len(arsenal_home)} match(s) trouvé(s).")
-        else:
-            st.warning("Aucun match trouvé où Arsenal joue à domicile.")
+    # 4.2 Nombre total de joueurs
+    nombre_joueurs = len(joueurs_df)
+    st.info(f"Nombre total de joueurs : **{nombre_joueurs}**")
 
-        # 4.3 Affichage des matchs du 11 août 2019
-        st.subheader("Matchs du 11 août 2019")
 
-        # Conversion de la colonne Date en datetime
-        matchs_df['Date'] = pd.to_datetime(matchs_df['Date'])
+# Matchs d'un club (aucun si le club est introuvable) avec les colonnes de la liste des matchs
+def team_match_table(ds, team_id):
+    matches = ds.team_matches(team_id) if team_id is not None else ds.matches().iloc[:0]
+    names = ds.team_names()
+    return pd.DataFrame({
+        'ID Match': matches['matchid'],
+        'Date': matches['date'],
+        'Équipe Domicile': matches['home_idteam'].map(names),
+        'Équipe Extérieur': matches['away_idteam'].map(names),
+        'Score Domicile': matches['home_score'],
+        'Score Extérieur': matches['away_score'],
+        'home_idteam': matches['home_idteam'],
+    })
 
-        # Filtrage des matchs du 11 août 2019
-        date_cible = pd.to_datetime("2019-08-11").date()
-        matchs_11_08_2019 = matchs_df[matchs_df['Date'].dt.date == date_cible]
 
-        if not matchs_11_08_2019.empty:
-            st.write("Voici les matchs joués le **11 août 2019** :")
-            st.dataframe(matchs_11_08_2019, use_container_width=True, hide_index=True)
-        else:
-            st.warning("Aucun match n'a été joué le 11 août 2019.")
-
-        # 4.3 Affichage du nombre de matchs en 2019
-        matchs_2019 = matchs_df[matchs_df['Date'].dt.year == 2019]
-        nombre_matchs_2019 = len(matchs_2019)
-
-        # Affichage avec st.metric qui donne un joli encadré
-        st.subheader("Nombre de matchs en 2019")
-        st.metric(label="Matchs joués", value=nombre_matchs_2019)
-
-        # 4.3 Affichage du nombre de matchs de Liverpool
-        # Filtrer tous les matchs où Liverpool a joué
-        matchs_liverpool = matchs_df[
-            (matchs_df['Équipe Domicile'] == 'Liverpool') |
-            (matchs_df['Équipe Extérieur'] == 'Liverpool')
-            ]
-
-        # Calcul des stats
-        nombre_matchs_liverpool = len(matchs_liverpool)
-        matchs_domicile = len(matchs_liverpool[matchs_liverpool['Équipe Domicile'] == 'Liverpool'])
-        matchs_exterieur = len(matchs_liverpool[matchs_liverpool['Équipe Extérieur'] == 'Liverpool'])
-
-        # Affichage général
-        st.subheader("Matchs joués par Liverpool")
-        st.metric(label="Total", value=nombre_matchs_liverpool)
-
-        # Deux colonnes côte à côte pour domicile / extérieur
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.metric(label="🏟️ À domicile", value=matchs_domicile)
-        with col2:
-            st.metric(label="🚌 À l'extérieur", value=matchs_exterieur)
+# 4.3
+def page_matches(ds):
+    st.header("📅 4.3 - Informations sur les matchs")
+
+    # Préparer le DataFrame des matchs (avec le nom des équipes)
+    matchs_df = ds.matches_with_names().sort_values('date')
+
+    # Sélectionner et renommer les colonnes pour affichage
+    matchs_df = matchs_df[['matchid', 'date', 'home_team_name', 'away_team_name', 'home_score', 'away_score']]
+    matchs_df.columns = ['ID Match', 'Date', 'Équipe Domicile', 'Équipe Extérieur', 'Score Domicile', 'Score Extérieur']
+
+    # Afficher dans Streamlit
+    st.subheader("Liste des matchs :")
+    st.dataframe(matchs_df, hide_index=True, use_container_width=True)
+
+    # Matchs d'Arsenal à domicile, lus dans la plage du club de la vue club/match
+    arsenal_id = ds.find_team_id('Arsenal')
+    arsenal_home = team_match_table(ds, arsenal_id)
+    arsenal_home = arsenal_home[arsenal_home['home_idteam'] == arsenal_id]
+
+    # Affichage
+    st.subheader("Matchs où Arsenal joue à domicile")
+    if not arsenal_home.empty:
+        st.dataframe(arsenal_home[['ID Match', 'Date', 'Équipe Extérieur', 'Score Domicile', 'Score Extérieur']], hide_index=True, use_container_width=True)
+        st.success(f"{len(arsenal_home)} match(s) trouvé(s).")
     else:
-        st.warning("📁 Merci d’uploader d’abord un fichier JSON/ZIP dans l’onglet Upload.")
-
-with tabs[4]:
-    if "data_loaded" in st.session_state and st.session_state["data_loaded"]:
-        # 5.1 Résultats en fonction du club (championnat 5)
-        st.header("📈 5.1 - Résultats en fonction du club (championnat 5)")
-        matches_df['date'] = pd.to_datetime(matches_df['date'])
-
-        # Section 1 : Résultats par club – Serie A 2019-2020
-        st.subheader("1️⃣ Résultats par club – Serie A 2019-2020")
-
-        # Période de la saison
-        start_sa = pd.Timestamp('2019-08-23', tz='UTC')
-        end_sa = pd.Timestamp('2020-08-03', tz='UTC')
-
-        # Filtrage Serie A (championship == 5)
-        serie_a = matches_df[
-            (matches_df['championship'] == 5.0) &
-            (matches_df['date'] > start_sa) &
-            (matches_df['date'] < end_sa)
-            ]
-
-        # Équipes participantes
-        serie_a_ids = pd.unique(serie_a[['home_idteam', 'away_idteam']].values.ravel())
-        teams_sa = teams_df[teams_df['idteam'].isin(serie_a_ids)]
-
-        # Calcul des résultats par équipe
-        results = {name: {'V': 0, 'N': 0, 'D': 0} for name in teams_sa['name']}
-        for _, m in serie_a.iterrows():
-            home = teams_sa.loc[teams_sa['idteam'] == m['home_idteam'], 'name'].values[0]
-            away = teams_sa.loc[teams_sa['idteam'] == m['away_idteam'], 'name'].values[0]
-
-            if m['home_score'] > m['away_score']:
-                results[home]['V'] += 1
-                results[away]['D'] += 1
-            elif m['home_score'] < m['away_score']:
-                results[home]['D'] += 1
-                results[away]['V'] += 1
-            else:
-                results[home]['N'] += 1
-                results[away]['N'] += 1
-
-        # Création du DataFrame récapitulatif
-        summary_sa = pd.DataFrame(results).T
-        summary_sa['Total'] = summary_sa.sum(axis=1)
-        summary_sa = summary_sa[['V', 'N', 'D', 'Total']].sort_index()
-
-        # Tableau interactif
-        st.subheader("📊 Tableau des résultats")
-        st.dataframe(summary_sa)
-
-        # Graphique interactif avec Plotly
-        fig = go.Figure(data=[
-            go.Bar(name='Victoires', x=summary_sa.index, y=summary_sa['V'], marker_color='green'),
-            go.Bar(name='Nuls', x=summary_sa.index, y=summary_sa['N'], marker_color='gray'),
-            go.Bar(name='Défaites', x=summary_sa.index, y=summary_sa['D'], marker_color='red')
-        ])
-
-        fig.update_layout(
-            barmode='group',
-            title='Résultats par club – Serie A 2019-2020',
-            xaxis_title='Club',
-            yaxis_title='Nombre de matchs',
-            xaxis_tickangle=-45,
-            legend_title_text='Résultat',
-            height=500
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
+        st.warning("Aucun match trouvé où Arsenal joue à domicile.")
 
-        # Section 2 : Top 10 ratio de victoires – Premier League 2020-2021
-        st.subheader("2️⃣ Top 10 ratio de victoires – Premier League 2020-2021")
-
-        # Période Premier League
-        start_pl = pd.Timestamp('2020-09-11', tz='UTC')
-        end_pl = pd.Timestamp('2021-05-24', tz='UTC')
-
-        # Filtrage des matchs de Premier League
-        pl = matches_df[
-            (matches_df['championship'] == 2.0) &
-            (matches_df['date'] > start_pl) &
-            (matches_df['date'] < end_pl)
-            ]
-
-        # Mapping id -> nom d'équipe
-        team_names = teams_df.set_index('idteam')['name'].to_dict()
-
-        # Calcul victoires et totaux
-        stats = {}
-        for _, row in pl.iterrows():
-            for side, team_col, opp_score, team_score in [
-                ('home', 'home_idteam', 'away_score', 'home_score'),
-                ('away', 'away_idteam', 'home_score', 'away_score')
-            ]:
-                tid = row[team_col]
-                stats.setdefault(tid, {'V': 0, 'Total': 0})
-                stats[tid]['Total'] += 1
-                if row[team_score] > row[opp_score]:
-                    stats[tid]['V'] += 1
-
-        # Création DataFrame
-        df_pl = pd.DataFrame.from_dict(stats, orient='index')
-        df_pl['team'] = df_pl.index.map(team_names)
-        df_pl = df_pl.dropna(subset=['team'])  # supprimer ceux sans nom d'équipe
-        df_pl['Ratio'] = df_pl['V'] / df_pl['Total']
-
-        # Top 10 par ratio
-        df_pl = df_pl.sort_values('Ratio', ascending=False).head(10)[['team', 'V', 'Total', 'Ratio']]
-
-        # Affichage tableau
-        st.subheader("📊 Classement des équipes")
-        st.dataframe(df_pl)
-
-        # Graphique interactif
-        fig = px.bar(
-            df_pl,
-            x='team',
-            y='Ratio',
-            text='Ratio',
-            title='Top 10 des équipes par ratio de victoires - Premier League 2020-2021',
-            labels={'team': 'Équipe', 'Ratio': 'Ratio de victoires'},
-            color='Ratio',
-            color_continuous_scale='blues'
-        )
+    # 4.3 Affichage des matchs du 11 août 2019
+    st.subheader("Matchs du 11 août 2019")
 
-        fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-        fig.update_layout(xaxis_tickangle=-45)
+    # Filtrage des matchs du 11 août 2019
+    date_cible = pd.to_datetime("2019-08-11").date()
+    matchs_11_08_2019 = matchs_df[matchs_df['Date'].dt.date == date_cible]
 
-        st.plotly_chart(fig, use_container_width=True)
+    if not matchs_11_08_2019.empty:
+        st.write("Voici les matchs joués le **11 août 2019** :")
+        st.dataframe(matchs_11_08_2019, use_container_width=True, hide_index=True)
     else:
-        st.warning("📁 Merci d’uploader d’abord un fichier JSON/ZIP dans l’onglet Upload.")
-
-with tabs[5]:
-    if "data_loaded" in st.session_state and st.session_state["data_loaded"]:
-        # 5.2 ID de Messi
-        st.header("⚡️ 5.2 - Analyse des performances du joueur Messi")
-        st.subheader("ID du joueur Messi")
-        st.write("🔍 Recherche de l'ID d'un joueur")
-
-        # Champ de texte pour le nom de famille
-        lastname = st.text_input("Entrez le nom de famille du joueur", value="Messi")
-
-        # Fonction de recherche
-        @st.cache_data
-        def find_player_id(lastname):
-            player = players_df[players_df['lastname'].str.lower() == lastname.lower()]  # insensible à la casse
-            if not player.empty:
-                return player['playerid'].values[0]
-            else:
-                return None
-
-        # Affichage du résultat
-        if lastname:
-            player_id = find_player_id(lastname)
-            if player_id:
-                st.success(f"✅ L'identifiant du joueur **{lastname}** est : `{player_id}`")
-            else:
-                st.error("❌ Joueur non trouvé.")
-
-        # 5.2 clubs de Messi
-        st.subheader("Historique des clubs de Messi")
-
-        # Chargement des transferts
-        transfers = pd.read_csv('./csv_output/transfers.csv', parse_dates=['start_date','end_date'])
-
-        # ID joueur (Messi ici)
-        player_id = 19054
-
-        # Extraction des clubs
-        clubs = transfers.loc[transfers['playerid'] == player_id, 'team'].unique()
-
-        if len(clubs) > 0:
-            st.write(f"Le joueur avec l'ID `{player_id}` a porté les maillots des clubs suivants :")
-            for club in clubs:
-                st.markdown(f"- **{club}**")
-        else:
-            st.write("Aucun club trouvé pour ce joueur.")
-
-        # 5.2 Messi notes finales 2015
-        st.subheader("Évolution des notes finales 2015 de Messi (3 matchs aléatoires)")
-
-        # === 1. Charger les données ===
-        match_players = pd.read_csv('./csv_output/match_players.csv')
-        matches = pd.read_csv('./csv_output/matches.csv', parse_dates=['date'])
-
-        # === 2. ID de Messi ===
-        player_id = 19054
-
-        # === 3. Fusionner les dates des matchs ===
-        df = match_players.merge(matches[['matchid', 'date']], on='matchid')
-
-        # === 4. Filtrer les lignes de Messi avec des notes valides ===
-        player_df = df[(df['playerid'] == player_id) & df['final_mark_2015'].notna()].sort_values('date').reset_index(
-            drop=True)
-
-        if len(player_df) < 3:
-            st.error(f"Pas assez de matchs ({len(player_df)}) pour le joueur {player_id}.")
-        else:
-            # === 5. Sélectionner 3 matchs consécutifs aléatoires ===
-            start_idx = random.randint(0, len(player_df) - 3)
-            sample3 = player_df.iloc[start_idx:start_idx + 3]
-
-            # === 6. Afficher graphique interactif ===
-            fig = px.line(
-                sample3,
-                x='date',
-                y='final_mark_2015',
-                markers=True,
-                title=f"Évolution des notes sur 3 matchs consécutifs - Messi",
-                labels={'date': 'Date du match', 'final_mark_2015': 'Note finale 2015'}
-            )
-
-            # Ajouter les annotations (tooltip au survol déjà activé)
-            fig.update_traces(text=sample3['final_mark_2015'].astype(str), textposition='top center')
-            fig.update_layout(xaxis_tickformat='%Y-%m-%d')
-
-            st.plotly_chart(fig, use_container_width=True)
-
-            # === 7. Afficher les dates ===
-            st.write("🗓️ Dates des 3 matchs sélectionnés :", sample3['date'].dt.strftime('%Y-%m-%d').tolist())
-
-        # 5.2 Cartons jounes et rouges Messi
-        st.subheader("Cartons jaunes et rouges de Messi")
-
-        # Charger les données
-        highlights = pd.read_csv('./csv_output/highlights.csv')
-
-        # ID du joueur
-        player_id = 19054
-
-        # Filtrer événements du joueur
-        player_events = highlights[highlights['playerid'] == player_id]
-
-        # Compter cartons
-        yellow_cards = (player_events['type'] == 'yellowcard').sum()
-        red_cards = player_events['type'].isin(['secondyellow', 'straightred']).sum()
-
-        # Affichage
-        st.write(f"Cartons pour le joueur avec l'ID `{player_id}` :")
-        st.markdown(f"- 🟨 Jaunes : **{yellow_cards}**")
-        st.markdown(f"- 🟥 Rouges : **{red_cards}**")
-
-        # 5.2 Messi est-il le meilleur scoreur
-        st.subheader("Messi est-il le meilleur scoreur ?")
-
-        # === Charger les données ===
-        highlights = pd.read_csv('./csv_output/highlights.csv')
-        match_players = pd.read_csv('./csv_output/match_players.csv')
-        matches = pd.read_csv('./csv_output/matches.csv')
-        players = pd.read_csv('./csv_output/players.csv')
-        teams = pd.read_csv('./csv_output/teams.csv')
-
-        # === Mapping des championnats ===
-        champ_names_map = matches[['championship']].drop_duplicates().sort_values('championship')
-        champ_names_map['champ_name'] = champ_names_map['championship'].map({
-            1.0: "Ligue 1",
-            2.0: "Premier League",
-            3.0: "La Liga",
-            4.0: "Bundesliga",
-            5.0: "Serie A",
-        }).fillna("Inconnu")
-        champ_id_to_name = champ_names_map.set_index('championship')['champ_name'].to_dict()
-
-        # === Filtrer les buts ===
-        goals = highlights[highlights['type'] == 'goal']
-
-        # === Jointure avec match_players pour obtenir playerid → match ===
-        goals_with_champ = goals.merge(match_players[['matchid', 'playerid']], on=['matchid', 'playerid'])
-        goals_with_champ = goals_with_champ.merge(matches[['matchid', 'championship']], on='matchid')
-
-        # === Top scoreurs ===
-        top_scorers = goals_with_champ.groupby(['championship', 'playerid']).size().reset_index(name='goals')
-
-        # === ID de Messi ===
-        target_id = 19054
-
-        # === Championnats où Messi a marqué ===
-        player_champs = goals_with_champ[goals_with_champ['playerid'] == target_id]['championship'].unique()
-
-        if len(player_champs) == 0:
-            st.warning("Aucun championnat trouvé pour ce joueur.")
+        st.warning("Aucun match n'a été joué le 11 août 2019.")
+
+    # 4.3 Affichage du nombre de matchs en 2019
+    matchs_2019 = matchs_df[matchs_df['Date'].dt.year == 2019]
+    nombre_matchs_2019 = len(matchs_2019)
+
+    # Affichage avec st.metric qui donne un joli encadré
+    st.subheader("Nombre de matchs en 2019")
+    st.metric(label="Matchs joués", value=nombre_matchs_2019)
+
+    # 4.3 Affichage du nombre de matchs de Liverpool
+    # Tous les matchs où Liverpool a joué
+    liverpool_id = ds.find_team_id('Liverpool')
+    matchs_liverpool = team_match_table(ds, liverpool_id)
+
+    # Calcul des stats
+    nombre_matchs_liverpool = len(matchs_liverpool)
+    matchs_domicile = int((matchs_liverpool['home_idteam'] == liverpool_id).sum())
+    matchs_exterieur = nombre_matchs_liverpool - matchs_domicile
+
+    # Affichage général
+    st.subheader("Matchs joués par Liverpool")
+    st.metric(label="Total", value=nombre_matchs_liverpool)
+
+    # Deux colonnes côte à côte pour domicile / extérieur
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.metric(label="🏟️ À domicile", value=matchs_domicile)
+    with col2:
+        st.metric(label="🚌 À l'extérieur", value=matchs_exterieur)
+
+
+# Choix d'un championnat et d'une saison (valeurs par défaut si elles existent dans les données)
+def season_selector(ds, key, championship=None, season=None):
+    championships = ds.championships()
+    col1, col2 = st.columns(2)
+    with col1:
+        championship = st.selectbox(
+            "Championnat", championships,
+            index=championships.index(championship) if championship in championships else 0,
+            format_func=lambda c: CHAMPIONSHIP_NAMES.get(c, f"Championnat {c}"),
+            key=f"{key}_championship",
+        )
+    seasons = ds.seasons(championship)
+    with col2:
+        season = st.selectbox("Saison", seasons, index=seasons.index(season) if season in seasons else 0,
+                              key=f"{key}_season")
+    return championship, season
+
+
+def page_results(ds):
+    # 5.1 Résultats en fonction du club
+    st.header("📈 5.1 - Résultats en fonction du club")
+    standings = all_standings(ds.fingerprint, ds)
+
+    # Section 1 : Résultats par club (par défaut Serie A 2019-2020)
+    st.subheader("1️⃣ Résultats par club")
+    championship, season = season_selector(ds, 'results', championship=5, season='2019-2020')
+    champ_name = CHAMPIONSHIP_NAMES.get(championship, f"Championnat {championship}")
+    table = league_table(standings, championship, season)
+
+    # Tableau interactif
+    st.subheader("📊 Tableau des résultats")
+    summary = table[['rank', 'team', 'played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against',
+                     'goal_diff', 'points']]
+    summary.columns = ['Rang', 'Club', 'J', 'V', 'N', 'D', 'BP', 'BC', 'Diff', 'Pts']
+    st.dataframe(summary, hide_index=True)
+
+    # Graphique interactif avec Plotly
+    fig = go.Figure(data=[
+        go.Bar(name='Victoires', x=table['team'], y=table['wins'], marker_color='green'),
+        go.Bar(name='Nuls', x=table['team'], y=table['draws'], marker_color='gray'),
+        go.Bar(name='Défaites', x=table['team'], y=table['losses'], marker_color='red')
+    ])
+
+    fig.update_layout(
+        barmode='group',
+        title=f'Résultats par club – {champ_name} {season}',
+        xaxis_title='Club',
+        yaxis_title='Nombre de matchs',
+        xaxis_tickangle=-45,
+        legend_title_text='Résultat',
+        height=500
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Section 2 : Top 10 ratio de victoires (par défaut Premier League 2020-2021)
+    st.subheader("2️⃣ Top 10 ratio de victoires")
+    championship, season = season_selector(ds, 'ratio', championship=2, season='2020-2021')
+    champ_name = CHAMPIONSHIP_NAMES.get(championship, f"Championnat {championship}")
+
+    df_ratio = (
+        league_table(standings, championship, season)
+        .sort_values('win_ratio', ascending=False, kind='stable')
+        .head(10)[['team', 'wins', 'played', 'win_ratio']]
+        .rename(columns={'wins': 'V', 'played': 'Total', 'win_ratio': 'Ratio'})
+    )
+
+    # Affichage tableau
+    st.subheader("📊 Classement des équipes")
+    st.dataframe(df_ratio, hide_index=True)
+
+    # Graphique interactif
+    fig = px.bar(
+        df_ratio,
+        x='team',
+        y='Ratio',
+        text='Ratio',
+        title=f'Top 10 des équipes par ratio de victoires - {champ_name} {season}',
+        labels={'team': 'Équipe', 'Ratio': 'Ratio de victoires'},
+        color='Ratio',
+        color_continuous_scale='blues'
+    )
+
+    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+    fig.update_layout(xaxis_tickangle=-45)
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Section 3 : Classement à une date, sans recalcul (bilans cumulés)
+    st.subheader("3️⃣ Classement à une date")
+    championship, season = season_selector(ds, 'asof', championship=5, season='2019-2020')
+    champ_name = CHAMPIONSHIP_NAMES.get(championship, f"Championnat {championship}")
+    cumulative = ds.cumulative_standings()
+    matchdays = cumulative.matchdays(championship, season)
+    if not matchdays:
+        st.info("Aucun match joué pour cette saison.")
+        return
+
+    date = st.select_slider("Date", options=matchdays, value=matchdays[-1],
+                            format_func=lambda d: d.strftime('%d/%m/%Y'), key='asof_date')
+    table = cumulative.table_at(championship, season, date, ds.team_names())
+
+    summary = table[['rank', 'team', 'played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against',
+                     'goal_diff', 'points']]
+    summary.columns = ['Rang', 'Club', 'J', 'V', 'N', 'D', 'BP', 'BC', 'Diff', 'Pts']
+    st.dataframe(summary, hide_index=True)
+
+    fig = px.bar(
+        table,
+        x='team',
+        y='points',
+        title=f"Classement au {date.strftime('%d/%m/%Y')} - {champ_name} {season}",
+        labels={'team': 'Club', 'points': 'Points'},
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+# Statistiques utilisables pour la forme : colonnes numériques des feuilles de match (note en premier)
+# puis stats individuelles du dictionnaire des stats (stat_dict)
+def form_stats(ds):
+    match_players = ds.match_players()
+    numeric = [col for col in match_players.columns if pd.api.types.is_numeric_dtype(match_players[col])
+               and col not in ('playerid', 'matchid', 'team_id', 'formation_place')]
+    numeric = sorted(numeric, key=lambda col: col != 'final_mark_2015')
+    return numeric + [stat for stat in ds.stat_names() if stat not in numeric]
+
+
+# Frise des passages en club (une barre par passage, fin incluse), une ligne par valeur de y
+def spells_timeline(spells, y, title):
+    bars = pd.DataFrame({
+        y: spells[y].astype(str),
+        'Club': spells['team'].astype(str),
+        'Début': spells['start_date'].dt.tz_localize(None),
+        'Fin': spells['end_date'].dt.tz_localize(None) + pd.Timedelta(days=1),
+    })
+    fig = px.timeline(bars, x_start='Début', x_end='Fin', y=y, color='Club', title=title,
+                      labels={'player_name': 'Joueur', 'team': 'Club'})
+    fig.update_yaxes(autorange='reversed')
+    fig.update_layout(height=max(300, 25 * bars[y].nunique() + 150))
+    return fig
+
+
+def page_player(ds):
+    # 5.2 ID du joueur (par défaut Messi)
+    st.header("⚡️ 5.2 - Analyse des performances d'un joueur")
+    st.subheader("ID du joueur")
+    st.write("🔍 Recherche de l'ID d'un joueur")
+
+    # Champ de texte pour le nom de famille (début du nom, sans accents ou avec une faute de frappe)
+    lastname = st.text_input("Entrez le nom de famille du joueur", value="Messi")
+
+    # Candidats classés : noms identiques, puis commençant par la recherche, puis les plus proches
+    candidates = ds.player_index().search(lastname, limit=20)
+    if candidates.empty:
+        st.error("❌ Joueur non trouvé.")
+        return
+    labels = dict(zip(candidates['id'], candidates['name'] + " (" + candidates['id'].astype(str) + ")"))
+    player_id = st.selectbox("Joueur", list(labels), format_func=labels.get, key='player_choice')
+    name = ds.player_names().get(player_id, lastname)
+
+    # Affichage du résultat
+    st.success(f"✅ L'identifiant du joueur **{name}** est : `{player_id}`")
+
+    # 5.2 clubs du joueur
+    st.subheader(f"Historique des clubs de {name}")
+
+    # Extraction des clubs : passages du joueur lus dans l'index des passages en club
+    spells = ds.player_transfers(player_id)
+    clubs = spells['team'].unique()
+
+    if len(clubs) > 0:
+        st.write(f"Le joueur avec l'ID `{player_id}` a porté les maillots des clubs suivants :")
+        for club in clubs:
+            st.markdown(f"- **{club}**")
+        st.plotly_chart(spells_timeline(spells, 'team', f"Passages en club de {name}"), use_container_width=True)
+
+        # Club du joueur à une date
+        first, last = spells['start_date'].min().date(), spells['end_date'].max().date()
+        date = st.date_input("Club à la date du", value=last, min_value=first, max_value=last, key='player_club_date')
+        spell = ds.spells().club_at(player_id, date)
+        if spell is None:
+            st.info(f"{name} n'avait pas de club connu le {date.strftime('%d/%m/%Y')}.")
         else:
-            for champ in player_champs:
-                champ_name = champ_id_to_name.get(champ, f"Championnat {champ}")
-                st.subheader(f"🏆 Top 10 buteurs - {champ_name}")
-
-                # Scoreurs de ce championnat
-                scorers_in_champ = top_scorers[top_scorers['championship'] == champ].sort_values(by='goals',
-                                                                                                 ascending=False).reset_index(
-                    drop=True)
-
-                # Ajout des noms
-                scorers_in_champ['lastname'] = scorers_in_champ['playerid'].map(
-                    lambda pid: players.loc[players['playerid'] == pid, 'lastname'].values[0]
-                    if pid in players['playerid'].values else "Inconnu"
-                )
-
-                top_10 = scorers_in_champ.head(10)[['playerid', 'lastname', 'goals']]
-                top_10.columns = ['ID Joueur', 'Nom', 'Buts']
-                st.dataframe(top_10)
-
-                # === Graphique interactif avec Plotly ===
-                fig = px.bar(
-                    top_10,
-                    x='Nom',
-                    y='Buts',
-                    color='Nom',
-                    text='Buts',
-                    title=f"Top 10 des buteurs dans {champ_name}",
-                    labels={'Nom': 'Joueur', 'Buts': 'Nombre de buts'},
-                )
-                fig.update_traces(textposition='outside')
-                fig.update_layout(xaxis_tickangle=-45, showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
-
-                # === Classement de Messi ===
-                if target_id in scorers_in_champ['playerid'].values:
-                    rank = scorers_in_champ[scorers_in_champ['playerid'] == target_id].index[0] + 1
-                    total = len(scorers_in_champ)
-                    st.success(
-                        f"🎯 Messi est **{rank}ᵉ** meilleur buteur du championnat **{champ_name}** sur {total} buteurs.")
-                else:
-                    st.info("Le joueur n’a pas marqué dans ce championnat.")
+            st.write(f"Le {date.strftime('%d/%m/%Y')}, {name} jouait à **{spell['team']}** "
+                     f"(du {spell['start_date'].strftime('%d/%m/%Y')} au {spell['end_date'].strftime('%d/%m/%Y')}).")
     else:
-        st.warning("📁 Merci d’uploader d’abord un fichier JSON/ZIP dans l’onglet Upload.")
-
-
-with tabs[6]:
-    if "data_loaded" in st.session_state and st.session_state["data_loaded"]:
-        # 5.3 ID de Liverpool et Arsenal
-        st.header("👕 5.3 - Analyse des statistiques des clubs Liverpool et Arsenal")
-        teams = pd.read_csv('./csv_output/teams.csv')
-
-        clubs = teams[teams['name'].isin(['Liverpool', 'Arsenal']).reset_index(drop=True)];
-
-        st.write("### IDs des clubs")
-        clubs_reset = clubs.reset_index(drop=True)
-        st.dataframe(clubs_reset)
-
-        # 5.3 Joueurs d'Arsenal
-        st.subheader("Joueurs ayant joué pour Arsenal")
-
-        # Charger les fichiers
-        players = pd.read_csv('./csv_output/players.csv')
-        teams = pd.read_csv('./csv_output/teams.csv')
-        match_players = pd.read_csv('./csv_output/match_players.csv')
+        st.write("Aucun club trouvé pour ce joueur.")
 
-        # Trouver l'ID d'Arsenal
-        arsenal_team = teams[teams['name'].str.contains('Arsenal', case=False)]
-
-        if not arsenal_team.empty:
-            arsenal_id = arsenal_team.iloc[0]['idteam']
-
-            # Récupérer les IDs des joueurs ayant joué pour Arsenal
-            arsenal_players_ids = match_players[match_players['team_id'] == arsenal_id]['playerid'].unique()
-
-            # Filtrer les joueurs
-            arsenal_players = players[players['playerid'].isin(arsenal_players_ids)]
-
-            # Nettoyer et trier
-            player_table = (
-                arsenal_players[['playerid', 'lastname']]
-                .drop_duplicates()
-                .sort_values(by='lastname')
-                .reset_index(drop=True)
-            )
-
-            st.markdown(f"#### {len(player_table)} joueurs ont été repérés pour Arsenal")
-            st.dataframe(player_table)
-
-        else:
-            st.error("❌ Le club Arsenal n’a pas été trouvé dans les données.")
-
-        # 5.3 Un match entre Liverpool et Arsenal existe-t-il ?
-        st.subheader("Matchs entre Liverpool et Arsenal")
-
-        # Chargement des fichiers
-        teams = pd.read_csv('./csv_output/teams.csv')
-        matches = pd.read_csv('./csv_output/matches.csv')
-        match_players = pd.read_csv('./csv_output/match_players.csv')
-        players = pd.read_csv('./csv_output/players.csv')
-
-        # Récupération des IDs
-        teams_filtered = teams[teams['name'].str.contains('Liverpool|Arsenal', case=False)]
-
-        if len(teams_filtered) < 2:
-            st.error("❌ Impossible de trouver Liverpool ou Arsenal dans les données.")
-        else:
-            liverpool_id = teams_filtered[teams_filtered['name'].str.contains('Liverpool', case=False)].iloc[0]['idteam']
-            arsenal_id   = teams_filtered[teams_filtered['name'].str.contains('Arsenal', case=False)].iloc[0]['idteam']
-
-            # Filtrer les matchs entre les deux clubs
-            direct_matches = matches[
-                ((matches['home_idteam'] == liverpool_id) & (matches['away_idteam'] == arsenal_id)) |
-                ((matches['home_idteam'] == arsenal_id) & (matches['away_idteam'] == liverpool_id))
-            ]
-
-            if direct_matches.empty:
-                st.warning("Aucun match trouvé entre Liverpool et Arsenal.")
-            else:
-                st.success(f"{len(direct_matches)} match(s) trouvé(s) entre Liverpool et Arsenal.")
-
-                # Affichage des matchs
-                match_data = []
-                for _, row in direct_matches.iterrows():
-                    home = teams[teams['idteam'] == row['home_idteam']]['name'].values[0]
-                    away = teams[teams['idteam'] == row['away_idteam']]['name'].values[0]
-                    home_score = row['home_score']
-                    away_score = row['away_score']
-                    date = pd.to_datetime(row['date']).strftime('%Y-%m-%d') if 'date' in row else 'Date inconnue'
-                    match_data.append({
-                        'Date': date,
-                        'Match': f"{home} {home_score} - {away_score} {away}"
-                    })
-
-                st.subheader("Résultats des confrontations")
-                st.dataframe(pd.DataFrame(match_data))
-
-                # Prendre le 1er match et afficher les joueurs de Liverpool
-                match_id = direct_matches.iloc[0]['matchid']
-                liverpool_players = match_players[
-                    (match_players['matchid'] == match_id) &
-                    (match_players['team_id'] == liverpool_id)
-                ][['playerid', 'position']]
-
-                # Ajouter noms des joueurs
-                liverpool_players = liverpool_players.merge(players[['playerid', 'lastname']], on='playerid', how='left')
-                liverpool_players = liverpool_players[['lastname', 'position']].drop_duplicates().sort_values('lastname').reset_index(drop=True)
-
-                st.subheader(f"Joueurs de Liverpool lors du match ID {match_id}")
-                st.dataframe(liverpool_players)
-
-        # 5.3 Evolution des notes moyennes par position en fonction du temps du club de Liverpool
-        st.subheader("Évolution interactive des notes moyennes par poste chez Liverpool")
-
-        # === Charger les données ===
-        match_players = pd.read_csv('./csv_output/match_players.csv')
-        matches = pd.read_csv('./csv_output/matches.csv', parse_dates=['date'])
-        teams = pd.read_csv('./csv_output/teams.csv')
-
-        # === Trouver l'ID de Liverpool ===
-        liverpool_id = teams[teams['name'].str.contains("Liverpool", case=False, na=False)]['idteam'].iloc[0]
-
-        # === Filtrer les joueurs de Liverpool ===
-        liverpool_players = match_players[match_players['team_id'] == liverpool_id].copy()
-
-        # === Préparer les données ===
-        liverpool_players['matchid'] = liverpool_players['matchid'].astype(str)
-        matches['matchid'] = matches['matchid'].astype(str)
-
-        # Fusion avec la date des matchs
-        liverpool_players = liverpool_players.merge(matches[['matchid', 'date']], on='matchid', how='left')
-
-        # Nettoyer les positions
-        liverpool_players['position'] = (
-            liverpool_players['position']
-            .str.lower()
-            .str.strip()
-            .replace({'striker': 'forward'})
-        )
-
-        # Supprimer la timezone si elle existe
-        liverpool_players['date'] = liverpool_players['date'].dt.tz_localize(None)
-
-        # === Moyennes mensuelles par poste ===
-        avg_notes = (
-            liverpool_players
-            .groupby([
-                liverpool_players['date'].dt.to_period('M').dt.to_timestamp().rename('month'),
-                'position'
-            ])['final_mark_2015']
-            .mean()
-            .reset_index()
-            .rename(columns={'final_mark_2015': 'avg_note'})
-        )
-
-        # === Tracer avec Plotly ===
+    # 5.2 Bilan par saison : lecture des agrégats calculés à l'ingestion
+    st.subheader(f"Bilan par saison de {name}")
+    seasons = ds.player_seasons(player_id)
+    if seasons.empty:
+        st.info("Aucune statistique pour ce joueur.")
+    else:
+        profile = pd.DataFrame({
+            'Championnat': seasons['championship'].map(lambda c: CHAMPIONSHIP_NAMES.get(c, f"Championnat {c}")),
+            'Saison': seasons['season'],
+            'Club': seasons['team_id'].map(ds.team_names()).astype(object).fillna("Inconnu"),
+            'Matchs': seasons['appearances'],
+            'Minutes': seasons['minutes'],
+            'Buts': seasons['goals'],
+            'Jaunes': seasons['yellow_cards'],
+            'Rouges': seasons['red_cards'],
+            'Note moyenne': seasons['mean_mark'].round(2),
+        })
+        st.dataframe(profile, hide_index=True)
+
+    # 5.2 Forme du joueur : moyenne glissante, moyenne exponentielle et séries
+    st.subheader(f"Forme de {name}")
+    col1, col2 = st.columns(2)
+    with col1:
+        stat = st.selectbox("Statistique", form_stats(ds), key='form_stat')
+    with col2:
+        window = st.slider("Fenêtre (matchs)", min_value=2, max_value=10, value=3, key='form_window')
+
+    form = player_form_table(ds.fingerprint, ds, stat, window)
+    history = player_form(form, player_id)
+
+    if history.empty:
+        st.info(f"Aucun match avec la statistique {stat} pour ce joueur.")
+    else:
+        if len(history) < window:
+            st.warning(f"Seulement {len(history)} match(s) pour le joueur {player_id} : "
+                       f"moyenne glissante sur {window} matchs indisponible.")
+
+        last = history.iloc[-1]
+        streak = int(last['streak'])
+        cols = st.columns(3)
+        cols[0].metric(f"Moyenne sur {window} matchs",
+                       f"{last['rolling_mean']:.2f}" if pd.notna(last['rolling_mean']) else "—")
+        cols[1].metric("Moyenne exponentielle", f"{last['ewma']:.2f}")
+        cols[2].metric("Série en cours",
+                       f"{abs(streak)} match(s) {'au-dessus' if streak > 0 else 'en dessous'} de sa moyenne")
+
+        curves = history.melt(id_vars='date', value_vars=['value', 'rolling_mean', 'ewma'],
+                              var_name='courbe', value_name='valeur')
+        curves['courbe'] = curves['courbe'].map({'value': stat, 'rolling_mean': f"Moyenne sur {window} matchs",
+                                                 'ewma': "Moyenne exponentielle"})
         fig = px.line(
-            avg_notes,
-            x='month',
-            y='avg_note',
-            color='position',
+            curves,
+            x='date',
+            y='valeur',
+            color='courbe',
             markers=True,
-            title="Évolution des notes moyennes par poste - Liverpool",
-            labels={
-                'month': 'Mois',
-                'avg_note': 'Note moyenne',
-                'position': 'Poste'
-            }
+            title=f"Évolution de {stat} - {name}",
+            labels={'date': 'Date du match', 'valeur': stat, 'courbe': ''}
         )
-
-        fig.update_traces(hovertemplate='<br>Mois: %{x|%B %Y}<br>Note: %{y:.2f}')
-        fig.update_layout(hovermode='x unified', legend_title_text='Poste')
-
+        fig.update_layout(xaxis_tickformat='%Y-%m-%d', hovermode='x unified')
         st.plotly_chart(fig, use_container_width=True)
 
-        # 5.3 Evolution des écarts de résultats des clubs Liverpool et Arsenal
-        st.subheader("Évolution interactive des écarts de résultats : Liverpool vs Arsenal")
-
-        # 2. Trouver les IDs de Liverpool et Arsenal
-        liverpool_id = teams_df[teams_df['name'].str.contains("Liverpool", case=False, na=False)]['idteam'].iloc[0]
-        arsenal_id = teams_df[teams_df['name'].str.contains("Arsenal", case=False, na=False)]['idteam'].iloc[0]
-
+    short = short_histories(form, window)
+    st.caption(f"{len(short)} joueur(s) avec moins de {window} matchs pour {stat} : moyenne glissante non calculée.")
 
-        # 3. Filtrer les matchs de Liverpool et Arsenal
-        def compute_goal_diff(df, team_id):
-            df = df.copy()
-            df['goal_diff'] = df.apply(
-                lambda row: row['home_score'] - row['away_score'] if row['home_idteam'] == team_id
-                else row['away_score'] - row['home_score'], axis=1
-            )
-            df['club'] = teams_df[teams_df['idteam'] == team_id]['name'].values[0]
-            return df[['date', 'goal_diff', 'club']]
+    # 5.2 Cartons jaunes et rouges du joueur
+    st.subheader(f"Cartons jaunes et rouges de {name}")
 
+    # Compter cartons (somme des agrégats par saison)
+    yellow_cards = seasons['yellow_cards'].sum()
+    red_cards = seasons['red_cards'].sum()
 
-        liverpool_matches = matches_df[
-            (matches_df['home_idteam'] == liverpool_id) | (matches_df['away_idteam'] == liverpool_id)
-            ]
-        arsenal_matches = matches_df[
-            (matches_df['home_idteam'] == arsenal_id) | (matches_df['away_idteam'] == arsenal_id)
-            ]
+    # Affichage
+    st.write(f"Cartons pour le joueur avec l'ID `{player_id}` :")
+    st.markdown(f"- 🟨 Jaunes : **{yellow_cards}**")
+    st.markdown(f"- 🟥 Rouges : **{red_cards}**")
 
-        # 4. Calculer les écarts
-        liverpool_data = compute_goal_diff(liverpool_matches, liverpool_id)
-        arsenal_data = compute_goal_diff(arsenal_matches, arsenal_id)
+    # 5.2 Le joueur est-il le meilleur scoreur
+    st.subheader(f"{name} est-il le meilleur scoreur ?")
 
-        # 5. Fusionner les deux
-        df_combined = pd.concat([liverpool_data, arsenal_data])
-        df_combined = df_combined.sort_values(by=['club', 'date'])
+    # === Mapping des championnats ===
+    champ_id_to_name = {champ: CHAMPIONSHIP_NAMES.get(champ, "Inconnu") for champ in ds.championships()}
 
-        # 6. Tracer avec Plotly
-        fig = px.line(
-            df_combined,
-            x='date',
-            y='goal_diff',
-            color='club',
-            markers=True,
-            title="Évolution interactive des écarts de résultats",
-            labels={'goal_diff': 'Écart de buts', 'date': 'Date'}
-        )
+    # === Top scoreurs ===
+    scorers = top_scorers(ds.fingerprint, ds)
 
-        fig.update_traces(mode='lines+markers', hovertemplate='<br>Date: %{x|%d %B %Y}<br>Écart: %{y}',
-                          text=df_combined['club'])
-        fig.update_layout(legend_title_text='Club', hovermode='x unified')
-
-        st.plotly_chart(fig, use_container_width=True)
-
-        # 5.3 Nombre moyen de changement par match d'Arsenal
-        st.subheader("Nombre moyen de changements par match d'Arsenal")
-
-        # === 1. Charger les données ===
-        matches_df = pd.read_csv('./csv_output/matches.csv', parse_dates=['date'])
-        substitutions_df = pd.read_csv('./csv_output/substitutions.csv')
-        teams_df = pd.read_csv('./csv_output/teams.csv')
-
-        # === 2. Trouver l'ID d'Arsenal ===
-        arsenal_id = teams_df[
-            teams_df['name'].str.contains("Arsenal", case=False, na=False)
-        ]['idteam'].iloc[0]
-
-        # === 3. Filtrer les matchs d'Arsenal ===
-        arsenal_matches = matches_df[
-            (matches_df['home_idteam'] == arsenal_id) |
-            (matches_df['away_idteam'] == arsenal_id)
-            ].copy()
-
-        # === 4. Compter les substitutions par match ===
-        subs_per_match = (
-            substitutions_df
-            .query('matchid in @arsenal_matches.matchid')
-            .groupby('matchid')
-            .size()
-            .reset_index(name='substitution_count')
-        )
+    # === Championnats où le joueur a marqué ===
+    player_champs = scorers[scorers['playerid'] == player_id]['championship'].unique()
 
-        # === 5. Fusionner et préparer ===
-        arsenal_matches = (
-            arsenal_matches
-            .merge(subs_per_match, on='matchid', how='left')
-        )
-        arsenal_matches['substitution_count'] = arsenal_matches['substitution_count'].fillna(0)
-        avg_subs = arsenal_matches['substitution_count'].mean()
-
-        # Affichage du metric
-        st.metric(label="Moyenne substitutions", value=f"{avg_subs:.2f}")
-
-        # Affichage de l'histogramme avec Plotly
-        st.subheader("Distribution des substitutions par match")
-        fig = px.histogram(
-            arsenal_matches,
-            x='substitution_count',
-            nbins=int(arsenal_matches['substitution_count'].max()) + 1,
-            title="Histogramme des substitutions - Arsenal",
-            labels={'substitution_count': 'Nombre de substitutions', 'count': 'Nombre de matchs'}
-        )
-        fig.update_layout(xaxis_tickmode='linear')
-        st.plotly_chart(fig, use_container_width=True)
+    if len(player_champs) == 0:
+        st.warning("Aucun championnat trouvé pour ce joueur.")
     else:
-        st.warning("📁 Merci d’uploader d’abord un fichier JSON/ZIP dans l’onglet Upload.")
-
-with tabs[7]:
-    if "data_loaded" in st.session_state and st.session_state["data_loaded"]:
-        # 5.4 Corrélation entre match à domicile et victoire
-        st.header("🏠📊 5.4 - Corrélation entre match à domicile et victoire")
-
-        # Charger les données
-        matches = pd.read_csv('./csv_output/matches.csv')
-
-        # Préparer le résultat pour home et away
-        matches['result_home'] = matches.apply(lambda row: 'Victoire' if row['home_score'] > row['away_score'] else (
-            'Défaite' if row['home_score'] < row['away_score'] else 'Nul'), axis=1)
-        matches['result_away'] = matches.apply(lambda row: 'Victoire' if row['away_score'] > row['home_score'] else (
-            'Défaite' if row['away_score'] < row['home_score'] else 'Nul'), axis=1)
-
-        # Créer enregistrements par équipe
-        home = matches[['home_idteam', 'result_home']].rename(columns={'home_idteam': 'idteam', 'result_home': 'result'})
-        home['lieu'] = 'Domicile'
-        away = matches[['away_idteam', 'result_away']].rename(columns={'away_idteam': 'idteam', 'result_away': 'result'})
-        away['lieu'] = 'Extérieur'
-        all_results = pd.concat([home, away], ignore_index=True)
-
-        # Tableau de contingence effectifs
-        cont = all_results.groupby(['lieu', 'result']).size().unstack(fill_value=0)
-
-        # Afficher les effectifs
-        st.subheader("Tableau de contingence : effectifs")
-        cont = cont[['Victoire', 'Nul', 'Défaite']]
-        st.table(cont)
-
-        # Pourcentages ligne à ligne
-        pct = cont.div(cont.sum(axis=1), axis=0) * 100
-        pct = pct.round(1)
-        pct = pct[['Victoire', 'Nul', 'Défaite']]
-        pct_formatted = pct.applymap(lambda x: f"{x:.1f}%")
-
-        st.subheader("Tableau de contingence : pourcentages (%) par lieu")
-        st.table(pct_formatted)
-
-        # Test du chi2 sur 2x3
-        chi2, p, _, _ = chi2_contingency(cont.values)
-        st.markdown(f"**Chi2** = {chi2:.2f}, **p-value** = {p:.1f}")
-        if p < 0.05:
-            st.success(
-                "✅ **Corrélation significative détectée.** On remarque que les résultats (victoire, défaite, nul) "
-                "varient en fonction du lieu du match. Le test du Chi² confirme que cette différence n’est probablement "
-                "pas due au hasard (p < 0.05)."
-            )
-        else:
-            st.info(
-                "ℹ️ **Pas de corrélation significative détectée.** On ne constate pas de réelle différence entre les résultats "
-                "à domicile ou à l’extérieur. D’après le test du Chi², ces variations semblent être dues au hasard (p ≥ 0.05)."
+        for champ in player_champs:
+            champ_name = champ_id_to_name.get(champ, f"Championnat {champ}")
+            st.subheader(f"🏆 Top 10 buteurs - {champ_name}")
+
+            # Scoreurs de ce championnat
+            scorers_in_champ = scorers[scorers['championship'] == champ].sort_values(by='goals',
+                                                                                     ascending=False).reset_index(
+                drop=True)
+
+            # Ajout des noms
+            scorers_in_champ['lastname'] = scorers_in_champ['playerid'].map(ds.player_names()).fillna("Inconnu")
+
+            top_10 = scorers_in_champ.head(10)[['playerid', 'lastname', 'goals']]
+            top_10.columns = ['ID Joueur', 'Nom', 'Buts']
+            st.dataframe(top_10)
+
+            # === Graphique interactif avec Plotly ===
+            fig = px.bar(
+                top_10,
+                x='Nom',
+                y='Buts',
+                color='Nom',
+                text='Buts',
+                title=f"Top 10 des buteurs dans {champ_name}",
+                labels={'Nom': 'Joueur', 'Buts': 'Nombre de buts'},
             )
+            fig.update_traces(textposition='outside')
+            fig.update_layout(xaxis_tickangle=-45, showlegend=False)
+            st.plotly_chart(fig, use_container_width=True)
 
-        # Visualisation interactive avec Plotly
-        summary = cont.reset_index().melt(id_vars='lieu', value_vars=['Victoire', 'Nul', 'Défaite'],
-                                          var_name='Résultat', value_name='Count')
-        fig = px.bar(
-            summary,
-            x='lieu',
-            y='Count',
-            color='Résultat',
-            barmode='group',
-            text='Count',
-            category_orders={'lieu': ['Domicile', 'Extérieur'], 'Résultat': ['Victoire', 'Nul', 'Défaite']},
-            color_discrete_map={'Victoire': 'green', 'Nul': 'gray', 'Défaite': 'red'},
-            title="Répartition des victoires, nuls et défaites selon le lieu"
-        )
-        fig.update_traces(textposition='outside')
-        fig.update_layout(yaxis_title='Nombre de matchs')
-        st.plotly_chart(fig, use_container_width=True)
+            # === Classement du joueur ===
+            if player_id in scorers_in_champ['playerid'].values:
+                rank = scorers_in_champ[scorers_in_champ['playerid'] == player_id].index[0] + 1
+                total = len(scorers_in_champ)
+                st.success(
+                    f"🎯 {name} est **{rank}ᵉ** meilleur buteur du championnat **{champ_name}** sur {total} buteurs.")
+            else:
+                st.info("Le joueur n’a pas marqué dans ce championnat.")
+
+
+# Choix d'un club (par défaut le premier club dont le nom contient default)
+def club_selector(ds, label, key, default):
+    team_names = ds.team_names()
+    team_ids = sorted(team_names.index, key=lambda tid: str(team_names[tid]))
+    default_id = ds.find_team_id(default)
+    index = team_ids.index(default_id) if default_id in team_ids else 0
+    return st.selectbox(label, team_ids, index=index, key=key, format_func=lambda tid: str(team_names[tid]))
+
+
+def page_head_to_head(ds):
+    # 5.3 Comparaison de deux clubs (par défaut Liverpool et Arsenal)
+    st.header("👕 5.3 - Analyse des statistiques de deux clubs")
+    col1, col2 = st.columns(2)
+    with col1:
+        club_a_id = club_selector(ds, "Club", 'h2h_club_a', 'Liverpool')
+    with col2:
+        club_b_id = club_selector(ds, "Adversaire", 'h2h_club_b', 'Arsenal')
+
+    if club_a_id is None or club_b_id is None:
+        st.error("❌ Aucun club dans les données.")
+        return
+    if club_a_id == club_b_id:
+        st.warning("Choisissez deux clubs différents.")
+        return
+
+    team_names = ds.team_names()
+    club_a, club_b = team_names[club_a_id], team_names[club_b_id]
+    teams = ds.teams()
+
+    clubs = teams[teams['idteam'].isin([club_a_id, club_b_id])]
+
+    st.write("### IDs des clubs")
+    clubs_reset = clubs.reset_index(drop=True)
+    st.dataframe(clubs_reset)
+
+    # 5.3 Joueurs du second club
+    st.subheader(f"Joueurs ayant joué pour {club_b}")
+
+    # Récupérer les IDs des joueurs ayant joué pour le club
+    club_b_players_ids = ds.team_player_rows(club_b_id)['playerid'].unique()
+
+    # Filtrer les joueurs
+    players = ds.players()
+    club_b_players = players[players['playerid'].isin(club_b_players_ids)]
+
+    # Nettoyer et trier
+    player_table = (
+        club_b_players[['playerid', 'lastname']]
+        .drop_duplicates()
+        .sort_values(by='lastname')
+        .reset_index(drop=True)
+    )
+
+    st.markdown(f"#### {len(player_table)} joueurs ont été repérés pour {club_b}")
+    st.dataframe(player_table)
+
+    # 5.3 Joueurs passés directement d'un club à l'autre, sur une période
+    st.subheader(f"Transferts entre {club_a} et {club_b}")
+    dates = ds.matches()['date']
+    first, last = dates.min().date(), dates.max().date()
+    period = st.date_input("Période", value=(first, last), min_value=first, max_value=last, key='h2h_moves_period')
+    start, end = period if len(period) == 2 else (period[0], period[0])
+    moves = ds.spells().moves(club_a_id, club_b_id, start, end)
+    if moves.empty:
+        st.info(f"Aucun joueur passé de {club_a} à {club_b} (ou inversement) sur la période.")
     else:
-        st.warning("📁 Merci d’uploader d’abord un fichier JSON/ZIP dans l’onglet Upload.")
-
-# 5.5 Paris sportif
-# === Charger les données ===
-with tabs[8]:
-    if "data_loaded" in st.session_state and st.session_state["data_loaded"]:
-        matches_df = pd.read_csv('./csv_output/matches.csv')
-        teams_df = pd.read_csv('./csv_output/teams.csv')
-
-        # === Fusionner les données ===
-        matches_df = matches_df.merge(teams_df, left_on='home_idteam', right_on='idteam', how='left')
-        matches_df = matches_df.rename(columns={'name': 'home_team_name'})
-
-        matches_df = matches_df.merge(teams_df, left_on='away_idteam', right_on='idteam', how='left')
-        matches_df = matches_df.rename(columns={'name': 'away_team_name'})
-
-        # === Fonction pour calculer le gain pour un club donné ===
-        def get_total_gain_for_club(club_name):
-            club_matches = matches_df[
-                (matches_df['home_team_name'] == club_name) | (matches_df['away_team_name'] == club_name)
-            ]
-
-            total_gain = 0
-            for _, row in club_matches.iterrows():
-                if row['home_team_name'] == club_name:
-                    if row['home_score'] > row['away_score']:
-                        gain = row['quotation_home'] - 1
-                    else:
-                        gain = -1
-                elif row['away_team_name'] == club_name:
-                    if row['away_score'] > row['home_score']:
-                        gain = row['quotation_away'] - 1
-                    else:
-                        gain = -1
-                total_gain += gain
-
-            return total_gain
-
-        # === Calcul des gains pour tous les clubs ===
-        club_names = pd.unique(pd.concat([matches_df['home_team_name'], matches_df['away_team_name']]))
-        club_gains = [{'club': name, 'gain': get_total_gain_for_club(name)} for name in club_names]
-        club_gains_df = pd.DataFrame(club_gains).sort_values(by='gain', ascending=False).reset_index(drop=True)
-
-        # === Interface Streamlit ===
-        st.header("💸 5.5 Classement des clubs selon les gains de paris sportifs")
-        st.write("Gain net si on avait misé 1€ sur chaque victoire d'un club.")
-
-        # Tableau
-        st.dataframe(club_gains_df)
-
-        # Graphique
-        top10 = club_gains_df.head(10).copy()
-        top10['gain_fmt'] = top10['gain'].apply(lambda x: f"{x:.2f}€")
-
-        fig = px.bar(
-            top10,
-            x='gain',
-            y='club',
-            orientation='h',
-            color='gain',
-            color_continuous_scale='greens',
-            text='gain_fmt',
-            title='📊 Top 10 des clubs les plus rentables',
-            labels={'gain': 'Gain en €', 'club': 'Club'},
-            hover_data=[]  # Ne pas afficher toutes les colonnes
-        )
-
-        fig.update_layout(yaxis=dict(autorange="reversed"))
-        fig.update_traces(
-            textposition='outside',
-            hovertemplate='%{y}<br>Gain : %{x:.2f}€<extra></extra>'  # Contrôle du tooltip
-        )
+        st.dataframe(pd.DataFrame({
+            'ID': moves['playerid'],
+            'Joueur': moves['player_name'],
+            'De': moves['from_team'],
+            'Vers': moves['to_team'],
+            'Date': moves['date'].dt.strftime('%d/%m/%Y'),
+        }), hide_index=True)
+
+    # 5.3 Un match entre les deux clubs existe-t-il ?
+    st.subheader(f"Matchs entre {club_a} et {club_b}")
+
+    # Matchs de la paire lus dans l'index des confrontations
+    direct_matches = ds.head_to_head_matches(club_a_id, club_b_id)
+
+    if direct_matches.empty:
+        st.warning(f"Aucun match trouvé entre {club_a} et {club_b}.")
+    else:
+        st.success(f"{len(direct_matches)} match(s) trouvé(s) entre {club_a} et {club_b}.")
+
+        # Bilan précalculé du point de vue du premier club
+        record = ds.head_to_head().record(club_a_id, club_b_id)
+        cols = st.columns(5)
+        cols[0].metric(f"Victoires {club_a}", record['wins'])
+        cols[1].metric("Nuls", record['draws'])
+        cols[2].metric(f"Victoires {club_b}", record['losses'])
+        cols[3].metric(f"Buts {club_a}", record['goals_for'])
+        cols[4].metric(f"Buts {club_b}", record['goals_against'])
+
+        # Affichage des matchs
+        home = direct_matches['home_idteam'].map(team_names).astype(str)
+        away = direct_matches['away_idteam'].map(team_names).astype(str)
+        match_data = pd.DataFrame({
+            'Date': direct_matches['date'].dt.strftime('%Y-%m-%d'),
+            'Match': home + ' ' + direct_matches['home_score'].astype(str) + ' - '
+                     + direct_matches['away_score'].astype(str) + ' ' + away,
+        }).reset_index(drop=True)
 
+        st.subheader("Résultats des confrontations")
+        st.dataframe(match_data)
+
+        # Prendre le 1er match et afficher les joueurs du premier club
+        match_id = direct_matches.iloc[0]['matchid']
+        club_a_players = ds.head_to_head_lineup(club_a_id, club_b_id, 0)[['playerid', 'position']]
+
+        # Ajouter noms des joueurs
+        club_a_players['lastname'] = club_a_players['playerid'].map(ds.player_names())
+        club_a_players = club_a_players[['lastname', 'position']].drop_duplicates().sort_values('lastname').reset_index(drop=True)
+
+        st.subheader(f"Joueurs de {club_a} lors du match ID {match_id}")
+        st.dataframe(club_a_players)
+
+    # 5.3 Evolution des notes moyennes par position en fonction du temps du premier club
+    st.subheader(f"Évolution interactive des notes moyennes par poste chez {club_a}")
+
+    # === Moyennes mensuelles par poste ===
+    avg_notes = monthly_marks_by_position(ds.fingerprint, ds, club_a_id)
+
+    # === Tracer avec Plotly ===
+    fig = px.line(
+        avg_notes,
+        x='month',
+        y='avg_note',
+        color='position',
+        markers=True,
+        title=f"Évolution des notes moyennes par poste - {club_a}",
+        labels={
+            'month': 'Mois',
+            'avg_note': 'Note moyenne',
+            'position': 'Poste'
+        }
+    )
+
+    fig.update_traces(hovertemplate='<br>Mois: %{x|%B %Y}<br>Note: %{y:.2f}')
+    fig.update_layout(hovermode='x unified', legend_title_text='Poste')
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    # 5.3 Evolution des écarts de résultats des deux clubs
+    st.subheader(f"Évolution interactive des écarts de résultats : {club_a} vs {club_b}")
+
+    df_combined = goal_diffs(ds.fingerprint, ds, (club_a_id, club_b_id))
+
+    # Tracer avec Plotly
+    fig = px.line(
+        df_combined,
+        x='date',
+        y='goal_diff',
+        color='club',
+        markers=True,
+        title="Évolution interactive des écarts de résultats",
+        labels={'goal_diff': 'Écart de buts', 'date': 'Date'}
+    )
+
+    fig.update_traces(mode='lines+markers', hovertemplate='<br>Date: %{x|%d %B %Y}<br>Écart: %{y}',
+                      text=df_combined['club'])
+    fig.update_layout(legend_title_text='Club', hovermode='x unified')
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    # 5.3 Nombre moyen de changement par match du second club
+    st.subheader(f"Nombre moyen de changements par match : {club_b}")
+
+    _, per_match, _ = substitution_tables(ds.fingerprint, ds)
+    club_b_matches = per_match[per_match['team_id'] == club_b_id]
+    if club_b_matches.empty:
+        st.info(f"Aucun match joué par {club_b}.")
+        return
+    avg_subs = club_b_matches['substitutions'].mean()
+
+    # Affichage du metric
+    st.metric(label="Moyenne substitutions", value=f"{avg_subs:.2f}")
+
+    # Affichage de l'histogramme avec Plotly
+    st.subheader("Distribution des substitutions par match")
+    fig = px.histogram(
+        club_b_matches,
+        x='substitutions',
+        nbins=int(club_b_matches['substitutions'].max()) + 1,
+        title=f"Histogramme des substitutions - {club_b}",
+        labels={'substitutions': 'Nombre de substitutions', 'count': 'Nombre de matchs'}
+    )
+    fig.update_layout(xaxis_tickmode='linear')
+    st.plotly_chart(fig, use_container_width=True)
+
+
+# 5.3 bis Remplacements de tous les clubs d'un championnat et d'une saison
+def page_substitutions(ds):
+    st.header("🔄 5.3 bis - Remplacements")
+    championship, season = season_selector(ds, 'subs', 5, '2019-2020')
+
+    team_subs, per_match, summary = substitution_tables(ds.fingerprint, ds)
+    in_season = (per_match['championship'] == championship) & (per_match['season'] == season)
+    per_match = per_match[in_season]
+    team_subs = team_subs[(team_subs['championship'] == championship) & (team_subs['season'] == season)]
+    summary = summary[(summary['championship'] == championship) & (summary['season'] == season)]
+    if per_match.empty:
+        st.info("Aucun match joué pour ce championnat et cette saison.")
+        return
+
+    team_names = ds.team_names()
+    label = f"{CHAMPIONSHIP_NAMES.get(championship, f'Championnat {championship}')} {season}"
+
+    # Changements par club
+    st.subheader("Changements par club")
+    table = pd.DataFrame({
+        'Club': summary['team_id'].map(team_names).astype(str),
+        'Matchs': summary['matches'],
+        'Changements': summary['substitutions'],
+        'Moyenne par match': summary['mean_per_match'].round(2),
+        'Minute moyenne': summary['mean_minute'].round(1),
+        'Premier changement (minute moyenne)': summary['mean_first_minute'].round(1),
+        'Sur blessure': summary['injuries'],
+    }).sort_values('Moyenne par match', ascending=False)
+    st.dataframe(table, hide_index=True)
+
+    fig = px.bar(table, x='Club', y='Moyenne par match', title=f"Changements par match - {label}")
+    fig.update_layout(xaxis_tickangle=-45)
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Minutes des changements
+    st.subheader("Minutes des changements")
+    if team_subs.empty:
+        st.info("Aucun changement enregistré pour cette saison.")
+    else:
+        fig = px.histogram(team_subs, x='minute', nbins=18, title=f"Minutes des changements - {label}",
+                           labels={'minute': 'Minute', 'count': 'Nombre de changements'})
         st.plotly_chart(fig, use_container_width=True)
 
-        # Club le plus rentable
-        best_club = top10.iloc[0]['club']
-        best_gain = top10.iloc[0]['gain']
+        timing = substitution_timing(team_subs)
+        timing.index = timing.index.map(team_names).astype(str)
+        timing.index.name = 'Club'
+        st.dataframe(timing[MINUTE_LABELS])
+
+    # Changements et résultat
+    st.subheader("Changements et résultat")
+    means = per_match.groupby('result')['substitutions'].mean()
+    cols = st.columns(3)
+    for col, (code, result) in zip(cols, RESULTS.items()):
+        col.metric(f"Changements par match ({result})", f"{means.get(code, float('nan')):.2f}")
+
+    by_count = substitutions_by_result(per_match).rename(columns=RESULTS)
+    shares = by_count.melt(id_vars=['substitutions', 'matches'], value_vars=list(RESULTS.values()),
+                           var_name='Résultat', value_name='Part')
+    fig = px.bar(
+        shares,
+        x='substitutions',
+        y='Part',
+        color='Résultat',
+        title=f"Résultat selon le nombre de changements - {label}",
+        labels={'substitutions': 'Nombre de changements', 'Part': 'Part des matchs'},
+        hover_data=['matches'],
+    )
+    fig.update_layout(xaxis_tickmode='linear', yaxis_tickformat='.0%')
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Lien descriptif : un club mené au score a tendance à faire plus de changements.")
+
+
+# Événements minute par minute d'un championnat et d'une saison
+EVENT_LABELS = {'goal': "Buts", 'yellow': "Cartons jaunes", 'red': "Cartons rouges", 'substitution': "Remplacements"}
+EVENT_BINS = [0, 15, 30, 45, 60, 75, 90, 255]
+EVENT_BIN_LABELS = ['1-15', '16-30', '31-45', '46-60', '61-75', '76-90', '90+']
+
+
+def page_events(ds):
+    st.header("⏱️ Événements par minute")
+    championship, season = season_selector(ds, 'events', 5, '2019-2020')
+    matches = ds.season_range(championship, season)
+    season_matches = ds.matches(championship, season)
+    events = ds.events()
+    team_names = ds.team_names()
+    player_names = ds.player_names()
+
+    # Événements d'un type dans une fenêtre de minutes, pour tous les matchs de la saison
+    st.subheader("Événements dans une fenêtre de minutes")
+    col1, col2 = st.columns(2)
+    with col1:
+        kind = st.selectbox("Événement", list(EVENT_LABELS), format_func=EVENT_LABELS.get, key='events_kind')
+    with col2:
+        start, end = st.slider("Minutes", min_value=0, max_value=120, value=(80, 120), key='events_window')
+
+    window = events.window(kind, start, end, matches)
+    st.metric(f"{EVENT_LABELS[kind]} entre la {start}e et la {end}e minute", len(window))
+    if not window.empty:
+        per_club = window.groupby('team_id').size().sort_values(ascending=False)
+        st.dataframe(pd.DataFrame({
+            'Club': per_club.index.map(team_names).astype(str),
+            EVENT_LABELS[kind]: per_club.to_numpy(),
+        }), hide_index=True)
+
+    # Répartition par tranche de 15 minutes et par club
+    st.subheader(f"{EVENT_LABELS[kind]} par tranche de 15 minutes")
+    histogram = events.minute_histogram(kind, EVENT_BINS, matches)
+    if histogram.empty:
+        st.info("Aucun événement rattaché à un club pour cette saison.")
+    else:
+        histogram.columns = EVENT_BIN_LABELS
+        histogram.index = histogram.index.map(team_names).astype(str)
+        bars = histogram.rename_axis('Club').reset_index().melt(id_vars='Club', var_name='Tranche',
+                                                                  value_name='Nombre')
+        fig = px.bar(bars, x='Tranche', y='Nombre', color='Club',
+                     title=f"{EVENT_LABELS[kind]} par tranche de minutes - "
+                           f"{CHAMPIONSHIP_NAMES.get(championship, f'Championnat {championship}')} {season}")
+        st.plotly_chart(fig, use_container_width=True)
 
+    # État d'un match à une minute : score, joueurs sur le terrain et événements déjà survenus
+    st.subheader("État d'un match à une minute donnée")
+    home = season_matches['home_idteam'].map(team_names).astype(str)
+    away = season_matches['away_idteam'].map(team_names).astype(str)
+    labels = dict(zip(season_matches['matchid'],
+                      season_matches['date'].dt.strftime('%d/%m/%Y') + " " + home + " - " + away))
+    col1, col2 = st.columns(2)
+    with col1:
+        matchid = st.selectbox("Match", list(labels), format_func=labels.get, key='events_match')
+    with col2:
+        minute = st.slider("Minute", min_value=0, max_value=120, value=45, key='events_minute')
+
+    state = events.state_at(matchid, minute)
+    match = season_matches[season_matches['matchid'] == matchid].iloc[0]
+    home_name, away_name = team_names[match['home_idteam']], team_names[match['away_idteam']]
+    cols = st.columns(3)
+    cols[0].metric(f"Score à la {minute}e minute", f"{state['home_score']} - {state['away_score']}")
+    cols[1].metric(f"Joueurs de {home_name}", state['home_players'])
+    cols[2].metric(f"Joueurs de {away_name}", state['away_players'])
+
+    lineup = state['lineup']
+    cols = st.columns(2)
+    for col, side, name in zip(cols, ['home', 'away'], [home_name, away_name]):
+        players = lineup[lineup['side'] == side]
+        col.write(f"**Sur le terrain : {name}**")
+        col.dataframe(pd.DataFrame({
+            'ID': players['playerid'],
+            'Joueur': players['playerid'].map(player_names),
+        }), hide_index=True)
+
+    so_far = events.match_events(matchid)
+    so_far = so_far[so_far['minute'] <= minute]
+    if not so_far.empty:
+        st.dataframe(pd.DataFrame({
+            'Minute': so_far['minute'].astype(str) + so_far['added'].map(lambda a: f" +{a}" if a else ""),
+            'Événement': so_far['kind'].map(EVENT_LABELS),
+            'Club': so_far['team_id'].map(team_names).astype(object).fillna("Inconnu"),
+            'Joueur': so_far['playerid'].map(player_names),
+            'Entrant': so_far['on_playerid'].map(player_names),
+        }), hide_index=True)
+
+    # Score à cette minute et résultat final, pour tous les matchs de la saison
+    st.subheader(f"Score à la {minute}e minute et résultat final")
+    states = events.states_at(minute, matches).merge(
+        season_matches[['matchid', 'home_score', 'away_score']].rename(
+            columns={'home_score': 'final_home', 'away_score': 'final_away'}),
+        on='matchid',
+    )
+    states = states.dropna(subset=['final_home', 'final_away'])
+    leader = np.sign(states['home_score'] - states['away_score']).map(
+        {1: "Domicile mène", 0: "Égalité", -1: "Extérieur mène"})
+    final = np.sign(states['final_home'] - states['final_away']).astype(int).map(
+        {1: "Victoire domicile", 0: "Nul", -1: "Victoire extérieur"})
+    st.table(pd.crosstab(leader, final).rename_axis(index=f"À la {minute}e minute", columns="Résultat final"))
+
+
+def page_home_advantage(ds):
+    # 5.4 Corrélation entre match à domicile et victoire
+    st.header("🏠📊 5.4 - Corrélation entre match à domicile et victoire")
+
+    cont, chi2, p = home_away_contingency(ds.fingerprint, ds)
+
+    # Afficher les effectifs
+    st.subheader("Tableau de contingence : effectifs")
+    st.table(cont)
+
+    # Pourcentages ligne à ligne
+    pct = cont.div(cont.sum(axis=1), axis=0) * 100
+    pct = pct.round(1)
+    pct = pct[['Victoire', 'Nul', 'Défaite']]
+    pct_formatted = pct.map(lambda x: f"{x:.1f}%")
+
+    st.subheader("Tableau de contingence : pourcentages (%) par lieu")
+    st.table(pct_formatted)
+
+    # Test du chi2 sur 2x3
+    st.markdown(f"**Chi2** = {chi2:.2f}, **p-value** = {p:.1f}")
+    if p < 0.05:
         st.success(
-            f"💰 **Le club le plus rentable est {best_club}** avec un gain net de **{best_gain:.2f}€** "
-            "si on avait misé 1€ sur chacune de ses victoires."
+            "✅ **Corrélation significative détectée.** On remarque que les résultats (victoire, défaite, nul) "
+            "varient en fonction du lieu du match. Le test du Chi² confirme que cette différence n’est probablement "
+            "pas due au hasard (p < 0.05)."
         )
     else:
-        st.warning("📁 Merci d’uploader d’abord un fichier JSON/ZIP dans l’onglet Upload.")
-
-with tabs[9]:
-    if "data_loaded" in st.session_state and st.session_state["data_loaded"]:
-        # 5.6 Corrélation entre formation et victoire
-        st.header("🧠 5.6 - Corrélation entre formation et victoire")
-        # 1. Charger les données
-        matches = pd.read_csv('./csv_output/matches.csv', parse_dates=['date'])
-        teams   = pd.read_csv('./csv_output/teams.csv')
-
-        # 2. Mettre en « long » les deux équipes par match
-        home = matches[[
-            'matchid', 'date',
-            'home_idteam', 'home_formation',
-            'home_score', 'away_score'
-        ]].copy()
-        home.columns = [
-            'matchid', 'date',
-            'team_id', 'formation',
-            'score_for', 'score_against'
-        ]
-
-        away = matches[[
-            'matchid', 'date',
-            'away_idteam', 'away_formation',
-            'away_score', 'home_score'
-        ]].copy()
-        away.columns = [
-            'matchid', 'date',
-            'team_id', 'formation',
-            'score_for', 'score_against'
-        ]
-
-        # 3. Calculer le résultat pour chaque ligne (1=victoire, 0=nul, -1=défaite)
-        home['result'] = home['score_for'].gt(home['score_against']).astype(int)
-        home.loc[ home['score_for'] < home['score_against'], 'result'] = -1
-
-        away['result'] = away['score_for'].gt(away['score_against']).astype(int)
-        away.loc[ away['score_for'] < away['score_against'], 'result'] = -1
-
-        # 4. Concaténer les deux DataFrames
-        all_teams = pd.concat([home, away], ignore_index=True)
-
-        def clean_formation(f):
-            f = str(f).lower()
-            # Supprimer les lettres si c'est une forme comme "343d"
-            f = re.sub(r'[^\d]', '', f)
-            return "-".join(f)
-
-        all_teams['formation'] = all_teams['formation'].apply(clean_formation)
-
-        # 5. Calculer le taux de victoire par formation
-        stats = (
-            all_teams
-              .groupby('formation')
-              .agg(
-                 win_rate=('result', lambda x: (x == 1).mean()),
-                 count   =('result', 'size')
-              )
-            .reset_index()
-            .sort_values(
-                by=['win_rate', 'count'],
-                ascending=[False, False]
-            )
-        )
-
-        # Reprendre le DataFrame filtré
-        stats_filtered = stats.copy()
-        stats_filtered['win_rate_pct'] = stats_filtered['win_rate'] * 100  # Pour affichage en %
-
-        # Affichage du tableau (optionnel)
-        st.subheader("📋 Taux de victoire par formation")
-        df_display = stats_filtered[['formation', 'win_rate_pct', 'count']].rename(columns={
-            'formation': 'Formation',
-            'win_rate_pct': 'Taux de victoire (%)',
-            'count': 'Nb matchs'
-        }).reset_index(drop=True)
-        st.dataframe(df_display)
-
-        # Graphique Plotly
-        fig = px.bar(
-            stats_filtered,
-            x='formation',
-            y='win_rate_pct',
-            text='count',
-            labels={'formation': 'Formation', 'win_rate_pct': 'Taux de victoire (%)'},
-            title='📊 Taux de victoire par formation',
-            color='win_rate_pct',
-            color_continuous_scale='Blues'
-        )
-
-        fig.update_traces(
-            textposition='outside',
-            hovertemplate='<b>Formation</b>: %{x}<br>'
-                          '<b>Taux de victoire</b>: %{y:.1f}%<br>'
-                          '<b>Nombre de matchs</b>: %{text}<extra></extra>'
+        st.info(
+            "ℹ️ **Pas de corrélation significative détectée.** On ne constate pas de réelle différence entre les résultats "
+            "à domicile ou à l’extérieur. D’après le test du Chi², ces variations semblent être dues au hasard (p ≥ 0.05)."
         )
 
-        fig.update_layout(
-            xaxis_tickangle=-45,
-            yaxis=dict(title='Taux de victoire (%)'),
-            margin=dict(t=60, b=100),
-            uniformtext_minsize=8,
-            uniformtext_mode='hide'
-        )
+    # Visualisation interactive avec Plotly
+    summary = cont.reset_index().melt(id_vars='lieu', value_vars=['Victoire', 'Nul', 'Défaite'],
+                                      var_name='Résultat', value_name='Count')
+    fig = px.bar(
+        summary,
+        x='lieu',
+        y='Count',
+        color='Résultat',
+        barmode='group',
+        text='Count',
+        category_orders={'lieu': ['Domicile', 'Extérieur'], 'Résultat': ['Victoire', 'Nul', 'Défaite']},
+        color_discrete_map={'Victoire': 'green', 'Nul': 'gray', 'Défaite': 'red'},
+        title="Répartition des victoires, nuls et défaites selon le lieu"
+    )
+    fig.update_traces(textposition='outside')
+    fig.update_layout(yaxis_title='Nombre de matchs')
+    st.plotly_chart(fig, use_container_width=True)
 
-        st.plotly_chart(fig, use_container_width=True)
 
-        st.info(
-            "ℹ️ Globalement, on remarque que même si certaines formations ont un taux de victoire élevé, "
-            "leur faible nombre de matchs limite la fiabilité de ces observations. \n"
-            "Pour les formations les plus jouées, les taux de victoire varient sans qu’un pattern clair n’émerge vraiment, "
-            "ce qui suggère qu’il n’y a pas de corrélation forte et robuste entre la formation utilisée et la victoire."
-        )
+# 5.5 Paris sportif
+def page_betting(ds):
+    results = betting_results(ds.fingerprint, ds)
+    team_names = ds.team_names()
+
+    # === Interface Streamlit ===
+    st.header("💸 5.5 Classement des clubs selon les gains de paris sportifs")
+
+    strategy = st.selectbox("Stratégie", list(STRATEGIES), format_func=lambda s: f"Miser {STRATEGIES[s]}")
+    st.write(f"Gain net si on avait misé 1€ {STRATEGIES[strategy]}.")
+    st.caption("Pas de pari sur un match sans cote (cote absente ou égale à 1) : le classement diffère de "
+               "l'ancien calcul, qui comptait ces matchs (1€ perdu, ou gain nul pour une victoire à 1).")
+
+    # Toutes les saisons ou un championnat et une saison
+    if st.checkbox("Filtrer par championnat et saison"):
+        championship, season = season_selector(ds, 'betting')
+        results = results[(results['championship'] == championship) & (results['season'] == season)]
+
+    club_gains_df = strategy_ranking(results, strategy)
+    if club_gains_df.empty:
+        st.warning("Aucun pari possible avec cette stratégie (cotes absentes).")
+        return
+    club_gains_df.insert(0, 'club', club_gains_df['team_id'].map(team_names))
+
+    # Tableau
+    st.dataframe(
+        club_gains_df[['club', 'bets', 'won', 'gain', 'roi']].rename(columns={
+            'club': 'Club', 'bets': 'Paris', 'won': 'Gagnés', 'gain': 'Gain (€)', 'roi': 'Rendement (€/pari)'
+        }),
+        hide_index=True
+    )
+
+    # Graphique
+    top10 = club_gains_df.head(10).copy()
+    top10['gain_fmt'] = top10['gain'].apply(lambda x: f"{x:.2f}€")
+
+    fig = px.bar(
+        top10,
+        x='gain',
+        y='club',
+        orientation='h',
+        color='gain',
+        color_continuous_scale='greens',
+        text='gain_fmt',
+        title='📊 Top 10 des clubs les plus rentables',
+        labels={'gain': 'Gain en €', 'club': 'Club'},
+        hover_data=[]  # Ne pas afficher toutes les colonnes
+    )
+
+    fig.update_layout(yaxis=dict(autorange="reversed"))
+    fig.update_traces(
+        textposition='outside',
+        hovertemplate='%{y}<br>Gain : %{x:.2f}€<extra></extra>'  # Contrôle du tooltip
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Club le plus rentable
+    best_club = top10.iloc[0]['club']
+    best_gain = top10.iloc[0]['gain']
+
+    st.success(
+        f"💰 **Le club le plus rentable est {best_club}** avec un gain net de **{best_gain:.2f}€** "
+        f"si on avait misé 1€ {STRATEGIES[strategy]}."
+    )
+
+    # Évolution de la bankroll des clubs choisis
+    st.subheader("📈 Évolution de la bankroll")
+    clubs = st.multiselect("Clubs", list(club_gains_df['team_id']), default=list(top10['team_id'].head(3)),
+                           format_func=lambda tid: team_names.get(tid, str(tid)))
+    curves = bankroll_curves(results, strategy, clubs)
+    curves['club'] = curves['team_id'].map(team_names)
+
+    fig = px.line(
+        curves,
+        x='date',
+        y='bankroll',
+        color='club',
+        title="Gains cumulés match après match",
+        labels={'date': 'Date', 'bankroll': 'Gain cumulé (€)', 'club': 'Club'}
+    )
+    fig.update_layout(hovermode='x unified')
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def page_odds(ds):
+    st.header("🎲 Cotes et probabilités implicites")
+    st.write("Probabilités déduites des cotes d'avant-match (marge du bookmaker retirée) comparées aux résultats.")
+
+    probs = odds_probabilities(ds.fingerprint, ds)
+    if probs.empty:
+        st.warning("Aucun match avec des cotes complètes.")
+        return
+
+    # Scores de calibration par championnat et saison
+    st.subheader("📋 Calibration par championnat et saison")
+    scores = calibration_scores(probs)
+    scores['championship'] = scores['championship'].map(lambda c: CHAMPIONSHIP_NAMES.get(c, f"Championnat {c}"))
+    scores['margin'] = scores['margin'] * 100
+    st.dataframe(
+        scores.rename(columns={'championship': 'Championnat', 'season': 'Saison', 'matches': 'Matchs',
+                               'brier': 'Brier', 'log_loss': 'Log-loss', 'margin': 'Marge (%)'}),
+        hide_index=True
+    )
+    st.caption("Brier : 0 = prévision parfaite, 0.667 = probabilités uniformes. "
+               "Log-loss : ln(3) ≈ 1.10 pour des probabilités uniformes.")
+
+    # Courbe de fiabilité
+    st.subheader("🎯 Courbe de fiabilité")
+    if st.checkbox("Filtrer par championnat et saison", key="odds_filter"):
+        championship, season = season_selector(ds, 'odds')
+        probs = probs[(probs['championship'] == championship) & (probs['season'] == season)]
+    n_bins = st.slider("Nombre de classes", min_value=5, max_value=20, value=10)
+    bins = reliability_bins(probs, n_bins=n_bins)
+
+    fig = go.Figure([
+        go.Scatter(x=[0, 1], y=[0, 1], mode='lines', name='Calibration parfaite', line=dict(dash='dash', color='gray')),
+        go.Scatter(x=bins['predicted'], y=bins['observed'], mode='lines+markers', name='Cotes',
+                   customdata=bins['count'], hovertemplate='Prévu : %{x:.2f}<br>Observé : %{y:.2f}<br>'
+                                                           'Issues : %{customdata}<extra></extra>'),
+    ])
+    fig.update_layout(xaxis_title='Probabilité implicite', yaxis_title='Fréquence observée',
+                      xaxis_range=[0, 1], yaxis_range=[0, 1])
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Marge du bookmaker dans le temps
+    st.subheader("💼 Marge du bookmaker au fil du temps")
+    margins = margin_over_time(odds_probabilities(ds.fingerprint, ds))
+    margins['championship'] = margins['championship'].map(lambda c: CHAMPIONSHIP_NAMES.get(c, f"Championnat {c}"))
+    margins['margin'] = margins['margin'] * 100
+    fig = px.line(
+        margins,
+        x='period',
+        y='margin',
+        color='championship',
+        markers=True,
+        labels={'period': 'Mois', 'margin': 'Marge moyenne (%)', 'championship': 'Championnat'}
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def page_simulation(ds):
+    st.header("🎰 Simulation de saison (Monte-Carlo)")
+    st.write("Chaque match de la saison est rejoué en tirant son issue selon les probabilités implicites "
+             "des cotes d'avant-match.")
+
+    championship, season = season_selector(ds, 'simulation', championship=5, season='2019-2020')
+    n_sims = st.select_slider("Nombre de saisons simulées", options=[1000, 5000, 10000, 50000, 100000], value=10000)
+
+    team_ids, position_counts, points_counts = season_simulation(ds.fingerprint, ds, championship, season, n_sims)
+    summary, positions = simulation_summary(team_ids, position_counts, points_counts)
+    team_names = ds.team_names()
+
+    # Comparaison avec le classement réel
+    table = league_table(all_standings(ds.fingerprint, ds), championship, season)
+    likelihood = actual_table_likelihood(team_ids, position_counts, points_counts, table)
+    summary = summary.merge(likelihood, on='team_id', how='left')
+    summary.insert(0, 'club', summary['team_id'].map(team_names))
+
+    st.subheader("📋 Distribution des classements simulés")
+    st.dataframe(
+        summary[['club', 'rank', 'points', 'mean_position', 'mean_points', 'points_p5', 'points_p95',
+                 'p_title', 'p_relegation', 'p_rank', 'p_points_or_more']].rename(columns={
+            'club': 'Club', 'rank': 'Rang réel', 'points': 'Pts réels', 'mean_position': 'Rang moyen',
+            'mean_points': 'Pts moyens', 'points_p5': 'Pts (5 %)', 'points_p95': 'Pts (95 %)',
+            'p_title': 'P(titre)', 'p_relegation': 'P(relégation)', 'p_rank': 'P(rang réel)',
+            'p_points_or_more': 'P(≥ pts réels)'
+        }),
+        hide_index=True
+    )
+
+    # Probabilité de chaque place
+    st.subheader("🔥 Probabilité de chaque place")
+    heatmap = positions.set_index(positions['team_id'].map(team_names)).drop(columns='team_id')
+    heatmap = heatmap.loc[summary['club']]
+    fig = px.imshow(
+        heatmap,
+        color_continuous_scale='Blues',
+        aspect='auto',
+        labels={'x': 'Place', 'y': 'Club', 'color': 'Probabilité'}
+    )
+    fig.update_layout(height=max(400, 25 * len(heatmap)))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def page_elo(ds):
+    st.header("📈 Classement Elo des équipes")
+    st.write("Note de force de chaque équipe, mise à jour après chaque match (avantage du terrain et "
+             "écart de buts pris en compte).")
+
+    # Paramètres du modèle (par défaut : historique calculé à l'ingestion)
+    with st.expander("⚙️ Paramètres"):
+        k = st.slider("Facteur K", min_value=5, max_value=60, value=int(ELO_PARAMS['k']), step=5)
+        home_advantage = st.slider("Avantage du terrain (points Elo)", min_value=0, max_value=150,
+                                   value=int(ELO_PARAMS['home_advantage']), step=10)
+        goal_diff = st.checkbox("Pondérer par l'écart de buts", value=ELO_PARAMS['goal_diff'])
+    params = {'k': float(k), 'home_advantage': float(home_advantage), 'goal_diff': goal_diff}
+    if {**ELO_PARAMS, **params} == ELO_PARAMS:
+        ratings = ds.ratings()
     else:
-        st.warning("📁 Merci d’uploader d’abord un fichier JSON/ZIP dans l’onglet Upload.")
-
+        ratings = elo_ratings(ds.fingerprint, ds, params)
+    team_names = ds.team_names()
+
+    # Évolution des notes des équipes choisies
+    st.subheader("Évolution des notes")
+    team_ids = sorted(ratings.current(), key=lambda tid: str(team_names.get(tid, tid)))
+    default = [tid for tid in (ds.find_team_id('Liverpool'), ds.find_team_id('Arsenal')) if tid in team_ids]
+    selected = st.multiselect("Équipes", team_ids, default=default or team_ids[:2],
+                              format_func=lambda tid: team_names.get(tid, str(tid)))
+    curves = ratings.curves(selected)
+    curves['club'] = curves['team_id'].map(team_names)
+
+    fig = px.line(
+        curves,
+        x='date',
+        y='rating',
+        color='club',
+        title="Évolution de la note Elo",
+        labels={'date': 'Date', 'rating': 'Note Elo', 'club': 'Club'}
+    )
+    fig.update_layout(hovermode='x unified')
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Classement à une date
+    st.subheader("Classement à une date")
+    dates = ds.matches()['date']
+    date = st.date_input("Date", value=dates.max().date(), min_value=dates.min().date(), max_value=dates.max().date())
+    table = ratings.ratings_at(pd.Timestamp(date, tz='UTC') + pd.Timedelta(days=1) - pd.Timedelta(seconds=1))
+    table.insert(0, 'club', table['team_id'].map(team_names))
+    st.dataframe(table.rename(columns={'club': 'Club', 'team_id': 'ID', 'rating': 'Note Elo'}), hide_index=True)
+
+
+def page_formations(ds):
+    # 5.6 Corrélation entre formation et victoire
+    st.header("🧠 5.6 - Corrélation entre formation et victoire")
+
+    # Reprendre le DataFrame calculé
+    stats_filtered = formation_win_rates(ds.fingerprint, ds).copy()
+    stats_filtered['win_rate_pct'] = stats_filtered['win_rate'] * 100  # Pour affichage en %
+
+    # Affichage du tableau (optionnel)
+    st.subheader("📋 Taux de victoire par formation")
+    df_display = stats_filtered[['formation', 'win_rate_pct', 'count']].rename(columns={
+        'formation': 'Formation',
+        'win_rate_pct': 'Taux de victoire (%)',
+        'count': 'Nb matchs'
+    }).reset_index(drop=True)
+    st.dataframe(df_display)
+
+    # Graphique Plotly
+    fig = px.bar(
+        stats_filtered,
+        x='formation',
+        y='win_rate_pct',
+        text='count',
+        labels={'formation': 'Formation', 'win_rate_pct': 'Taux de victoire (%)'},
+        title='📊 Taux de victoire par formation',
+        color='win_rate_pct',
+        color_continuous_scale='Blues'
+    )
+
+    fig.update_traces(
+        textposition='outside',
+        hovertemplate='<b>Formation</b>: %{x}<br>'
+                      '<b>Taux de victoire</b>: %{y:.1f}%<br>'
+                      '<b>Nombre de matchs</b>: %{text}<extra></extra>'
+    )
+
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        yaxis=dict(title='Taux de victoire (%)'),
+        margin=dict(t=60, b=100),
+        uniformtext_minsize=8,
+        uniformtext_mode='hide'
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.info(
+        "ℹ️ Globalement, on remarque que même si certaines formations ont un taux de victoire élevé, "
+        "leur faible nombre de matchs limite la fiabilité de ces observations. \n"
+        "Pour les formations les plus jouées, les taux de victoire varient sans qu’un pattern clair n’émerge vraiment, "
+        "ce qui suggère qu’il n’y a pas de corrélation forte et robuste entre la formation utilisée et la victoire."
+    )
+
+
+# Une section par analyse : seule la section choisie est exécutée à chaque rerun
+PAGES = {
+    "⬆️ Data": page_upload,
+    "⚽️ 4.1 - Clubs": page_clubs,
+    "🧍‍♂️ 4.2 - Joueurs": page_players,
+    "📅 4.3 - Matchs": page_matches,
+    "📈 5.1 - Résultats": page_results,
+    "⚡️ 5.2 - Joueur": page_player,
+    "👕 5.3 - Confrontations": page_head_to_head,
+    "🔄 5.3 bis - Remplacements": page_substitutions,
+    "⏱️ Événements par minute": page_events,
+    "🏠📊 5.4 - Lieu du match/Résultat": page_home_advantage,
+    "💸 5.5 - Paris sportif": page_betting,
+    "🎲 Cotes et probabilités": page_odds,
+    "🎰 Simulation de saison": page_simulation,
+    "📈 Classement Elo": page_elo,
+    "🧠 5.6 - Formation/Victoire": page_formations,
+}
+
+page = st.sidebar.radio("Analyse", list(PAGES), key="page")
+
+if page == "⬆️ Data":
+    page_upload()
+elif dataset_fingerprint() is not None:
+    # Jeu de données partagé entre toutes les sessions (chargé une fois par version des CSV, déjà présents
+    # dans csv_output : l'upload ne sert qu'à les remplacer)
+    PAGES[page](current_dataset())
+else:
+    st.warning("📁 Merci d’uploader d’abord un fichier JSON/ZIP dans l’onglet Upload.")
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from team_view import played
+
+# Backtest de stratégies de paris (mise de 1€ par pari) sur les cotes d'avant-match,
+# pour tous les clubs et toutes les stratégies en une passe vectorisée.
+
+STRATEGIES = {
+    'all': "sur chaque victoire d'un club",
+    'home': "sur chaque victoire d'un club à domicile",
+    'away': "sur chaque victoire d'un club à l'extérieur",
+    'favourite': "sur un club à chaque fois qu'il est favori",
+    'underdog': "sur un club à chaque fois qu'il est outsider",
+    'draw': "sur le match nul dans chaque match d'un club",
+}
+
+
+# Cote utilisable : présente et supérieure à 1 (1.0 = cote non renseignée)
+def valid_odds(odds):
+    return np.isfinite(odds) & (odds > 1)
+
+
+# Gain net de chaque stratégie, une colonne par stratégie (NaN : pas de pari sur ce match).
+# bets : lignes club/match jouées de la vue team_view.
+def strategy_profits(bets):
+    odds_team = bets['odds_team'].to_numpy()
+    odds_opponent = bets['odds_opponent'].to_numpy()
+    odds_draw = bets['odds_draw'].to_numpy()
+    home = bets['home'].to_numpy()
+    result = bets['result'].to_numpy(dtype=np.int8)
+    win = result == 1
+    draw = result == 0
+
+    team_valid = valid_odds(odds_team)
+    win_profit = np.where(win, odds_team - 1, -1.0)
+    draw_profit = np.where(draw, odds_draw - 1, -1.0)
+    staked = {
+        'all': team_valid,
+        'home': team_valid & home,
+        'away': team_valid & ~home,
+        'favourite': team_valid & (odds_team < odds_opponent),
+        'underdog': team_valid & (odds_team > odds_opponent),
+    }
+
+    profits = pd.DataFrame({name: np.where(mask, win_profit, np.nan) for name, mask in staked.items()},
+                           index=bets.index)
+    profits['draw'] = np.where(valid_odds(odds_draw), draw_profit, np.nan)
+    return profits[list(STRATEGIES)]
+
+
+# Paris et gains de toutes les stratégies (vue team_view), à calculer une fois par jeu de données
+def backtest(view):
+    bets = played(view)
+    profits = strategy_profits(bets)
+    return pd.concat([bets[['matchid', 'date', 'championship', 'season', 'team_id']], profits], axis=1)
+
+
+# Classement des clubs pour une stratégie : nombre de paris, paris gagnés, gain net, rendement.
+# by : regroupements supplémentaires, par exemple ['championship', 'season'].
+def strategy_ranking(results, strategy, by=()):
+    keys = list(by) + ['team_id']
+    profit = results[strategy]
+    ranking = (
+        pd.DataFrame({'bets': profit.notna(), 'won': profit > 0, 'gain': profit})
+        .groupby([results[k] for k in keys], observed=True)
+        .sum()
+        .reset_index()
+    )
+    ranking = ranking[ranking['bets'] > 0]
+    ranking['roi'] = ranking['gain'] / ranking['bets']
+    return ranking.sort_values(keys[:-1] + ['gain'], ascending=[True] * (len(keys) - 1) + [False],
+                               kind='stable').reset_index(drop=True)
+
+
+# Évolution de la bankroll (gains cumulés dans l'ordre des dates) pour une stratégie et des clubs
+def bankroll_curves(results, strategy, team_ids):
+    bets = results[results['team_id'].isin(team_ids) & results[strategy].notna()]
+    bets = bets[['date', 'team_id', 'matchid', strategy]].sort_values(['team_id', 'date'], kind='stable')
+    bets['bankroll'] = bets.groupby('team_id')[strategy].cumsum()
+    return bets.drop(columns=strategy).reset_index(drop=True)
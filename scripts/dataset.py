@@ -0,0 +1,306 @@
+import hashlib
+import os
+from functools import lru_cache
+
+import pandas as pd
+import streamlit as st
+
+from elo import EloRatings
+from events import EventStore
+from head_to_head import HeadToHead
+from import_data import TABLE_NAMES, load_data, normalize_tables, output_dir
+from player_seasons import compute_player_seasons, load_player_seasons, normalize_player_seasons
+from player_stats import has_player_stats, load_player_stats, normalize_player_stats, pivot_stats
+from search_index import NameIndex
+from spells import SpellIndex
+from storage import has_parquet
+from standings import CumulativeStandings
+from team_view import build_team_view
+
+# Jeu de données partagé par toutes les sessions Streamlit : chargé une seule fois par
+# version des fichiers de csv_output (empreinte de leur contenu), en lecture seule.
+
+
+# Signature rapide (nom, taille, date de modification) des CSV du dossier
+def files_signature(directory=output_dir):
+    signature = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.csv'):
+            stat = os.stat(os.path.join(directory, name))
+            signature.append((name, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+# Hash du contenu, recalculé seulement quand la signature change
+@lru_cache(maxsize=8)
+def content_hash(signature, directory=output_dir):
+    h = hashlib.sha1()
+    for name, _, _ in signature:
+        h.update(name.encode())
+        with open(os.path.join(directory, name), 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()[:16]
+
+
+# None tant que csv_output ne contient pas toutes les tables (aucune donnée ingérée)
+def dataset_fingerprint(directory=output_dir):
+    if not os.path.exists(directory):
+        return None
+    signature = files_signature(directory)
+    if not {f'{name}.csv' for name in TABLE_NAMES} <= {name for name, _, _ in signature}:
+        return None
+    return content_hash(signature, directory)
+
+
+# Plages de lignes consécutives par valeur de clé : {clé: (début, fin)} (matches triés sur ces clés)
+def range_index(df, keys):
+    positions = df.groupby(keys, observed=True, sort=True).indices
+    return {key: (int(rows[0]), int(rows[-1]) + 1) for key, rows in positions.items()}
+
+
+# Point d'accès unique aux données : tables chargées une fois avec des types cohérents,
+# vues dérivées calculées à la première demande puis conservées.
+class Dataset:
+    def __init__(self, fingerprint, tables, memory):
+        self.fingerprint = fingerprint
+        self.memory = memory
+        self._tables = tables
+        self._views = {}
+
+        # Matchs rangés par (championnat, saison, date) dès l'ingestion (tri stable, sans effet dans ce cas) :
+        # une saison est une plage de lignes
+        matches = tables['matches'].sort_values(['championship', 'season', 'date'], kind='stable')
+        matches = matches.reset_index(drop=True)
+        tables['matches'] = matches
+        self._championship_index = range_index(matches, 'championship')
+        self._season_index = range_index(matches, ['championship', 'season'])
+
+        # Une ligne par club et par match, triée par club : les matchs d'un club sont une plage de lignes
+        self._team_view = build_team_view(matches)
+        self._team_index = range_index(self._team_view, 'team_id')
+
+        # Agrégats joueur/saison sauvegardés à l'ingestion (calculés ici si le fichier n'existe pas),
+        # rangés par joueur
+        player_seasons = tables.get('player_seasons')
+        if player_seasons is None:
+            player_seasons = compute_player_seasons(matches, tables['match_players'], tables['highlights'])
+        player_seasons = normalize_player_seasons(player_seasons)
+        tables['player_seasons'] = player_seasons.sort_values('playerid', kind='stable').reset_index(drop=True)
+        self._player_season_index = range_index(tables['player_seasons'], 'playerid')
+
+        # Stats individuelles au format long et dictionnaire des stats (player_stats.py), vides si absents
+        if tables.get('match_player_stats') is None or tables.get('stat_dict') is None:
+            tables['match_player_stats'] = pd.DataFrame({'matchid': [], 'playerid': [], 'stat_id': [], 'value': []})
+            tables['stat_dict'] = pd.DataFrame({'stat_id': pd.Series([], dtype='int16'), 'stat': []})
+        tables['match_player_stats'] = normalize_player_stats(tables['match_player_stats'])
+
+    # Copie superficielle : une colonne ajoutée ou modifiée dans un onglet
+    # ne touche pas la table partagée entre les sessions
+    def table(self, name):
+        return self._tables[name].copy(deep=False)
+
+    def _view(self, key, build):
+        if key not in self._views:
+            self._views[key] = build()
+        return self._views[key].copy(deep=False)
+
+    def teams(self):
+        return self.table('teams')
+
+    def players(self):
+        return self.table('players')
+
+    def highlights(self):
+        return self.table('highlights')
+
+    def substitutions(self):
+        return self.table('substitutions')
+
+    def match_players(self):
+        return self.table('match_players')
+
+    def transfers(self):
+        return self.table('transfers')
+
+    # --- Vues dérivées ---
+    def championships(self):
+        return sorted(self._championship_index)
+
+    def seasons(self, championship=None):
+        return sorted({s for c, s in self._season_index if championship is None or c == championship})
+
+    # Championnat et/ou saison : lecture directe de la plage de lignes, sans parcourir la table
+    def matches(self, championship=None, season=None):
+        matches = self._tables['matches']
+        if championship is None and season is None:
+            return matches.copy(deep=False)
+        if championship is None:
+            return matches[matches['season'] == season].copy(deep=False)
+        if season is None:
+            start, stop = self._championship_index.get(championship, (0, 0))
+        else:
+            start, stop = self._season_index.get((championship, season), (0, 0))
+        return matches.iloc[start:stop].copy(deep=False)
+
+    # Vue club/match (voir team_view.py), de tous les clubs ou d'un club
+    def team_view(self, team_id=None):
+        if team_id is None:
+            return self._team_view.copy(deep=False)
+        start, stop = self._team_index.get(team_id, (0, 0))
+        return self._team_view.iloc[start:stop].copy(deep=False)
+
+    # Matchs avec le nom des équipes (home_team_name / away_team_name)
+    def matches_with_names(self):
+        def build():
+            names = self._tables['teams'].set_index('idteam')['name']
+            matches = self._tables['matches'].copy()
+            matches['home_team_name'] = matches['home_idteam'].map(names)
+            matches['away_team_name'] = matches['away_idteam'].map(names)
+            return matches
+        return self._view('matches_with_names', build)
+
+    # Matchs d'un club (domicile et extérieur), du plus ancien au plus récent : plage de lignes du club
+    # dans la vue club/match, ramenée aux positions de la table des matchs (matchid unique)
+    def team_matches(self, team_id):
+        if 'match_positions' not in self._views:
+            self._views['match_positions'] = pd.Index(self._tables['matches']['matchid'])
+        positions = self._views['match_positions'].get_indexer(self.team_view(team_id)['matchid'])
+        return self._tables['matches'].iloc[positions].copy(deep=False)
+
+    # Lignes joueur/match avec la date, le championnat et la saison du match
+    def player_match_rows(self):
+        def build():
+            matches = self._tables['matches'][['matchid', 'date', 'championship', 'season']]
+            return self._tables['match_players'].merge(matches, on='matchid', how='left')
+        return self._view('player_match_rows', build)
+
+    def team_player_rows(self, team_id):
+        rows = self.player_match_rows()
+        return rows[rows['team_id'] == team_id]
+
+    # Agrégats joueur/saison, de tous les joueurs ou d'un joueur
+    def player_seasons(self, player_id=None):
+        if player_id is None:
+            return self.table('player_seasons')
+        start, stop = self._player_season_index.get(player_id, (0, 0))
+        return self._tables['player_seasons'].iloc[start:stop].copy(deep=False)
+
+    # Passages en club (transfers) indexés par joueur, par club et par paire de clubs (spells.py)
+    def spells(self):
+        if 'spells' not in self._views:
+            self._views['spells'] = SpellIndex(self._tables['transfers'])
+        return self._views['spells']
+
+    # Noms des stats individuelles disponibles (stat_dict)
+    def stat_names(self):
+        return sorted(self._tables['stat_dict']['stat'].astype(str))
+
+    # Lignes joueur/match avec les stats demandées en colonnes (seules ces stats sont élargies ; une stat
+    # déjà présente en colonne, comme dans les anciens match_players.csv, est gardée telle quelle)
+    def with_player_stats(self, rows, stats):
+        stats = [stat for stat in stats if stat not in rows]
+        if not stats:
+            return rows
+        return pivot_stats(self._tables['match_player_stats'], self._tables['stat_dict'], stats, rows)
+
+    def player_transfers(self, player_id):
+        return self.spells().player(player_id)
+
+    def player_names(self):
+        return self._view('player_names', lambda: self._tables['players'].drop_duplicates('playerid')
+                          .set_index('playerid')['lastname'])
+
+    def team_names(self):
+        return self._view('team_names', lambda: self._tables['teams'].set_index('idteam')['name'])
+
+    # Classement Elo : historique sauvegardé à l'ingestion (complété si besoin) avec les paramètres
+    # par défaut, seul gardé dans le Dataset ; recalculé à chaque appel pour d'autres paramètres (mis
+    # en cache, en nombre limité, par la page)
+    def ratings(self, params=None):
+        if params is not None:
+            ratings = EloRatings.load(output_dir, params)
+            ratings.update(self._tables['matches'])
+            return ratings
+        if 'ratings' not in self._views:
+            ratings = EloRatings.load(output_dir)
+            ratings.update(self._tables['matches'])
+            self._views['ratings'] = ratings
+        return self._views['ratings']
+
+    # Bilans cumulés match après match : classement à n'importe quelle date
+    def cumulative_standings(self):
+        if 'cumulative_standings' not in self._views:
+            self._views['cumulative_standings'] = CumulativeStandings(self._team_view)
+        return self._views['cumulative_standings']
+
+    # Événements minute par minute (buts, cartons, remplacements) de tous les matchs (events.py)
+    def events(self):
+        if 'events' not in self._views:
+            self._views['events'] = EventStore(self._tables['matches'], self._tables['highlights'],
+                                               self._tables['substitutions'], self._tables['match_players'])
+        return self._views['events']
+
+    # Positions (début, fin) des matchs d'un championnat et d'une saison dans la table des matchs
+    def season_range(self, championship, season):
+        return self._season_index.get((championship, season), (0, 0))
+
+    # Confrontations directes : index par paire de clubs, bilans et plages des feuilles de match
+    # précalculés ; feuilles de match (match_players) rangées par (match, club)
+    def head_to_head(self):
+        if 'head_to_head' not in self._views:
+            lineups = self._tables['match_players'].sort_values(['matchid', 'team_id'], kind='stable')
+            self._views['lineups'] = lineups.reset_index(drop=True)
+            self._views['head_to_head'] = HeadToHead(self._tables['matches'], self._views['lineups'])
+        return self._views['head_to_head']
+
+    # Matchs entre deux clubs, du plus ancien au plus récent
+    def head_to_head_matches(self, team_a, team_b):
+        positions = self.head_to_head().positions(team_a, team_b)
+        return self._tables['matches'].iloc[positions].copy(deep=False)
+
+    # Feuille de match de team_a pour le n-ième match entre les deux clubs (0 : le plus ancien), lue
+    # par la plage précalculée dans l'index des confrontations
+    def head_to_head_lineup(self, team_a, team_b, n=0):
+        start, stop = self.head_to_head().lineup_ranges(team_a, team_b)[n]
+        return self._views['lineups'].iloc[start:stop].copy(deep=False)
+
+    # Index de recherche des noms de famille des joueurs et des noms de clubs (search_index.py)
+    def player_index(self):
+        if 'player_index' not in self._views:
+            players = self._tables['players'].drop_duplicates('playerid')
+            self._views['player_index'] = NameIndex(players['playerid'].to_numpy(), players['lastname'])
+        return self._views['player_index']
+
+    def team_index(self):
+        if 'team_index' not in self._views:
+            teams = self._tables['teams'].drop_duplicates('idteam')
+            self._views['team_index'] = NameIndex(teams['idteam'].to_numpy(), teams['name'])
+        return self._views['team_index']
+
+    # Club dont le nom (ou l'un de ses mots) commence par le texte recherché, sans tenir compte
+    # de la casse ni des accents
+    def find_team_id(self, name):
+        return self.team_index().find(name)
+
+
+# Une seule version en mémoire pour tout le processus : une nouvelle empreinte remplace l'ancienne
+@st.cache_resource(max_entries=1, show_spinner="Chargement des données...")
+def get_dataset(fingerprint):
+    # Parquet s'il a été généré et reste à jour (python storage.py), sinon CSV ; chaque table
+    # facultative se rabat aussi sur son CSV si son Parquet manque
+    storage_format = 'parquet' if has_parquet(output_dir) else 'csv'
+    *tables, memory = normalize_tables(*load_data(storage_format=storage_format), verbose=False)
+    tables = dict(zip(TABLE_NAMES, tables), player_seasons=load_player_seasons(output_dir, storage_format))
+    if has_player_stats(output_dir):
+        tables['match_player_stats'], tables['stat_dict'] = load_player_stats(output_dir, storage_format)
+    return Dataset(fingerprint, tables, memory)
+
+
+def current_dataset():
+    return get_dataset(dataset_fingerprint())
+
+
+# À appeler après une ingestion : les CSV ont changé, l'ancienne version est libérée
+def invalidate_dataset():
+    get_dataset.clear()
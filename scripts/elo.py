@@ -0,0 +1,180 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Classement Elo des équipes (avantage du terrain, pondération par l'écart de buts).
+# Historique compact (une ligne par équipe et par match), trié par équipe puis date :
+# la note d'une équipe à une date est trouvée par recherche dichotomique.
+# Les nouveaux matchs sont ajoutés à partir des notes courantes, sans rejouer l'historique.
+
+ELO_PARAMS = {
+    'initial': 1500.0,
+    'k': 20.0,
+    'home_advantage': 60.0,
+    'scale': 400.0,
+    'goal_diff': True,
+}
+
+HISTORY_COLUMNS = ['matchid', 'date', 'team_id', 'opponent_id', 'home', 'goals_for', 'goals_against', 'rating']
+
+
+# Multiplicateur du World Football Elo : 1 pour un but d'écart, 1.5 pour deux, (11 + N) / 8 au-delà
+def goal_diff_multiplier(goal_diff):
+    goal_diff = np.abs(goal_diff)
+    return np.where(goal_diff <= 1, 1.0, np.where(goal_diff == 2, 1.5, (11 + goal_diff) / 8))
+
+
+def empty_history():
+    return pd.DataFrame({
+        'matchid': pd.Series(dtype='int32'),
+        'date': pd.Series(dtype='datetime64[ns, UTC]'),
+        'team_id': pd.Series(dtype='int16'),
+        'opponent_id': pd.Series(dtype='int16'),
+        'home': pd.Series(dtype='bool'),
+        'goals_for': pd.Series(dtype='int16'),
+        'goals_against': pd.Series(dtype='int16'),
+        'rating': pd.Series(dtype='float32'),
+    })
+
+
+# Matchs joués, dans l'ordre chronologique
+def played_matches(matches_df):
+    played = matches_df.dropna(subset=['home_score', 'away_score', 'date'])
+    played = played.assign(date=pd.to_datetime(played['date'], utc=True))
+    return played.sort_values(['date', 'matchid'], kind='stable').reset_index(drop=True)
+
+
+class EloRatings:
+    def __init__(self, params=None, history=None):
+        self.params = {**ELO_PARAMS, **(params or {})}
+        self.history = empty_history() if history is None else history
+        self._build_index()
+
+    # Tableaux triés par (équipe, date) et plage de lignes de chaque équipe
+    def _build_index(self):
+        self.history = self.history.sort_values(['team_id', 'date', 'matchid'], kind='stable').reset_index(drop=True)
+        self._dates = self.history['date'].to_numpy(dtype='datetime64[ns]')
+        self._ratings = self.history['rating'].to_numpy()
+        team_ids = self.history['team_id'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, team_ids[1:] != team_ids[:-1]]) if len(team_ids) else np.array([], int)
+        stops = np.r_[starts[1:], len(team_ids)]
+        self._offsets = {int(team_ids[a]): (int(a), int(b)) for a, b in zip(starts, stops)}
+
+    # Note courante (après le dernier match) de chaque équipe
+    def current(self):
+        return {team: float(self._ratings[stop - 1]) for team, (_, stop) in self._offsets.items()}
+
+    # Note de l'équipe après ses matchs joués jusqu'à la date incluse (note initiale avant son premier match)
+    def rating_at(self, team_id, date):
+        start, stop = self._offsets.get(int(team_id), (0, 0))
+        date = pd.Timestamp(date)
+        if date.tzinfo is None:
+            date = date.tz_localize('UTC')
+        pos = np.searchsorted(self._dates[start:stop], np.datetime64(date.tz_convert(None), 'ns'), side='right')
+        return float(self._ratings[start + pos - 1]) if pos else self.params['initial']
+
+    # Classement de toutes les équipes à une date
+    def ratings_at(self, date):
+        ratings = pd.DataFrame({'team_id': list(self._offsets)})
+        ratings['rating'] = [self.rating_at(team, date) for team in ratings['team_id']]
+        return ratings.sort_values('rating', ascending=False, kind='stable').reset_index(drop=True)
+
+    # Historique des notes des équipes demandées
+    def curves(self, team_ids):
+        rows = [self.history.iloc[slice(*self._offsets[int(t)])] for t in team_ids if int(t) in self._offsets]
+        return pd.concat(rows, ignore_index=True) if rows else empty_history()
+
+    # Matchs déjà traités identiques dans matches (mêmes équipes, date et score)
+    def _is_consistent(self, played):
+        if self.history.empty:
+            return True
+        done = self.history[self.history['home']].set_index('matchid')
+        current = played.set_index('matchid').reindex(done.index)
+        return bool(
+            (current['home_idteam'].to_numpy() == done['team_id'].to_numpy()).all()
+            and (current['away_idteam'].to_numpy() == done['opponent_id'].to_numpy()).all()
+            and (current['home_score'].to_numpy() == done['goals_for'].to_numpy()).all()
+            and (current['away_score'].to_numpy() == done['goals_against'].to_numpy()).all()
+            and (current['date'].to_numpy() == done['date'].to_numpy()).all()
+        )
+
+    # Prise en compte des matchs pas encore traités. Si l'un d'eux est antérieur au dernier match traité,
+    # ou si un match traité a changé ou disparu, tout l'historique est recalculé. Renvoie le nombre de matchs traités.
+    def update(self, matches_df):
+        played = played_matches(matches_df)
+        new = played[~played['matchid'].isin(self.history['matchid'])]
+        if not self._is_consistent(played) or (
+                not self.history.empty and not new.empty and new['date'].min() < self.history['date'].max()):
+            self.history = empty_history()
+            new = played
+        if new.empty:
+            return 0
+
+        rows = self._replay(new, self.current() if not self.history.empty else {})
+        self.history = pd.concat([df for df in (self.history, rows) if not df.empty], ignore_index=True)
+        self._build_index()
+        return len(new)
+
+    # Mise à jour séquentielle (chaque match dépend des notes issues des précédents)
+    def _replay(self, matches, ratings):
+        p = self.params
+        home = matches['home_idteam'].to_numpy(dtype=np.int64)
+        away = matches['away_idteam'].to_numpy(dtype=np.int64)
+        home_score = matches['home_score'].to_numpy(dtype=np.int16)
+        away_score = matches['away_score'].to_numpy(dtype=np.int16)
+
+        team_ids = np.unique(np.concatenate([home, away, np.array(list(ratings), dtype=np.int64)]))
+        codes = {t: i for i, t in enumerate(team_ids)}
+        rating = np.array([ratings.get(t, p['initial']) for t in team_ids])
+        home_idx = np.array([codes[t] for t in home], dtype=np.int64)
+        away_idx = np.array([codes[t] for t in away], dtype=np.int64)
+
+        result = np.where(home_score > away_score, 1.0, np.where(home_score == away_score, 0.5, 0.0))
+        weight = p['k'] * (goal_diff_multiplier(home_score - away_score) if p['goal_diff'] else 1.0)
+        weight = np.broadcast_to(weight, result.shape)
+
+        home_after = np.empty(len(matches))
+        away_after = np.empty(len(matches))
+        for i in range(len(matches)):
+            h, a = home_idx[i], away_idx[i]
+            expected = 1 / (1 + 10 ** ((rating[a] - rating[h] - p['home_advantage']) / p['scale']))
+            delta = weight[i] * (result[i] - expected)
+            rating[h] += delta
+            rating[a] -= delta
+            home_after[i], away_after[i] = rating[h], rating[a]
+
+        history = pd.DataFrame({
+            'matchid': np.concatenate([matches['matchid'].to_numpy()] * 2).astype(np.int32),
+            'date': pd.concat([matches['date'], matches['date']], ignore_index=True),
+            'team_id': np.concatenate([home, away]).astype(np.int16),
+            'opponent_id': np.concatenate([away, home]).astype(np.int16),
+            'home': np.repeat([True, False], len(matches)),
+            'goals_for': np.concatenate([home_score, away_score]),
+            'goals_against': np.concatenate([away_score, home_score]),
+            'rating': np.concatenate([home_after, away_after]).astype(np.float32),
+        })
+        return history[HISTORY_COLUMNS]
+
+    def save(self, directory):
+        self.history.to_csv(os.path.join(directory, 'elo_history.csv'), index=False)
+        with open(os.path.join(directory, 'elo_params.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.params, f, indent=1)
+
+    # Historique sauvegardé s'il a été calculé avec les mêmes paramètres, sinon historique vide
+    @classmethod
+    def load(cls, directory, params=None):
+        ratings = cls(params)
+        history_path = os.path.join(directory, 'elo_history.csv')
+        params_path = os.path.join(directory, 'elo_params.json')
+        if not (os.path.exists(history_path) and os.path.exists(params_path)):
+            return ratings
+        with open(params_path, 'r', encoding='utf-8') as f:
+            if json.load(f) != ratings.params:
+                return ratings
+
+        history = pd.read_csv(history_path)
+        history['date'] = pd.to_datetime(history['date'], utc=True)
+        return cls(params, history.astype({'matchid': 'int32', 'team_id': 'int16', 'opponent_id': 'int16',
+                                          'goals_for': 'int16', 'goals_against': 'int16', 'rating': 'float32'}))
@@ -0,0 +1,238 @@
+import numpy as np
+import pandas as pd
+
+# Événements des matchs minute par minute (buts, cartons, remplacements) dans des tableaux contigus rangés
+# par (type, match, minute), avec les bornes de chaque couple (type, match) (format CSR) : les événements
+# d'un type pour un match sont une plage de lignes, et une fenêtre de minutes se lit par dichotomie pour
+# tous les matchs à la fois. Un match est repéré par sa position dans la table des matchs (rangée par
+# championnat, saison, date) : les matchs d'une saison sont une plage de positions.
+
+EVENT_KINDS = ['goal', 'yellow', 'red', 'substitution']
+# Types de highlights de chaque catégorie ('redcard' : carton 'red' des bookings de matchData)
+HIGHLIGHT_TYPES = {
+    'goal': ['goal'],
+    'yellow': ['yellowcard'],
+    'red': ['redcard', 'secondyellow', 'straightred'],
+}
+SIDES = ['home', 'away']
+EVENT_COLUMNS = ['matchid', 'kind', 'minute', 'added', 'side', 'team_id', 'playerid', 'on_playerid']
+LINEUP_COLUMNS = ['playerid', 'side', 'team_id']
+STATE_COLUMNS = ['matchid', 'home_score', 'away_score', 'home_players', 'away_players']
+
+# Clé de tri d'un événement : ligne CSR (type, match), puis minute, puis temps additionnel (45 +2 avant 46)
+ADDED_SLOTS = 32
+MINUTE_SLOTS = 256 * ADDED_SLOTS
+STARTERS = 11
+
+
+# '63' -> (63, 0), '90 +3' -> (90, 3)
+def match_minutes(times):
+    parts = times.astype(str).str.extract(r'^\s*(\d+)\s*(?:\+\s*(\d+))?')
+    minute = pd.to_numeric(parts[0], errors='coerce')
+    added = pd.to_numeric(parts[1], errors='coerce').fillna(0)
+    return minute.to_numpy(dtype=np.float64), added.to_numpy(dtype=np.float64)
+
+
+# Positions start, start + 1, ..., stop - 1 de chaque plage, mises bout à bout
+def _expand_ranges(starts, stops):
+    lengths = np.maximum(stops - starts, 0)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.array([], dtype=np.int64)
+    offsets = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+    return offsets + np.arange(total)
+
+
+# 'home' -> 0, 'away' -> 1, inconnu -> -1
+def _side_codes(sides):
+    return sides.astype(object).map({'home': 0, 'away': 1}).fillna(-1).to_numpy(dtype=np.int64)
+
+
+class EventStore:
+    # matches_df : table des matchs (index 0..n-1) ; le club d'un événement vient de son côté
+    # (highlights.side, substitutions.side)
+    def __init__(self, matches_df, highlights_df, substitutions_df, match_players_df):
+        self._matches = pd.Index(matches_df['matchid'])
+        self._home = matches_df['home_idteam'].to_numpy(dtype=np.int64)
+        self._away = matches_df['away_idteam'].to_numpy(dtype=np.int64)
+        n = len(self._matches)
+
+        sheets = (
+            match_players_df[['matchid', 'playerid', 'team_id', 'formation_place']]
+            .dropna(subset=['playerid', 'team_id'])
+            .drop_duplicates(['matchid', 'playerid'])
+        )
+        sheet_positions = self._matches.get_indexer(sheets['matchid'])
+        sheet_sides = self._sides(sheet_positions, sheets['team_id'].to_numpy(dtype=np.int64))
+
+        # Buts et cartons : côté enregistré à l'ingestion (celui de matchData, juste pour les buts contre
+        # son camp) ; anciens highlights.csv sans côté : côté du joueur sur la feuille de match
+        types = highlights_df['type'].astype(str)
+        highlight_kinds = np.full(len(highlights_df), -1)
+        for kind, values in HIGHLIGHT_TYPES.items():
+            highlight_kinds[types.isin(values).to_numpy()] = EVENT_KINDS.index(kind)
+        if 'side' in highlights_df:
+            highlight_sides = _side_codes(highlights_df['side'])
+        else:
+            player_sides = pd.Series(sheet_sides, index=pd.MultiIndex.from_arrays(
+                [sheets['matchid'], sheets['playerid']]))
+            keys = pd.MultiIndex.from_arrays([highlights_df['matchid'], highlights_df['playerid']])
+            highlight_sides = player_sides.reindex(keys).fillna(-1).to_numpy(dtype=np.int64)
+
+        # Remplacements (côté enregistré à l'ingestion)
+        sub_sides = _side_codes(substitutions_df['side'])
+
+        events = pd.DataFrame({
+            'position': np.r_[self._matches.get_indexer(highlights_df['matchid']),
+                              self._matches.get_indexer(substitutions_df['matchid'])],
+            'kind': np.r_[highlight_kinds, np.full(len(substitutions_df), EVENT_KINDS.index('substitution'))],
+            'time': pd.concat([highlights_df['time'].astype(str), substitutions_df['time'].astype(str)],
+                              ignore_index=True),
+            'side': np.r_[highlight_sides, sub_sides],
+            'playerid': np.r_[highlights_df['playerid'].to_numpy(dtype=np.float64),
+                              substitutions_df['off_playerid'].to_numpy(dtype=np.float64)],
+            'on_playerid': np.r_[np.full(len(highlights_df), np.nan),
+                                 substitutions_df['on_playerid'].to_numpy(dtype=np.float64)],
+        })
+        minute, added = match_minutes(events['time'])
+        keep = (events['position'].to_numpy() >= 0) & (events['kind'].to_numpy() >= 0) & np.isfinite(minute)
+        events, minute, added = events[keep], minute[keep], added[keep]
+
+        rows = events['kind'].to_numpy(dtype=np.int64) * n + events['position'].to_numpy(dtype=np.int64)
+        sort_keys = (rows * MINUTE_SLOTS + np.clip(minute, 0, 255).astype(np.int64) * ADDED_SLOTS
+                     + np.clip(added, 0, ADDED_SLOTS - 1).astype(np.int64))
+        order = np.argsort(sort_keys, kind='stable')
+        self._keys = sort_keys[order]
+        self._positions = events['position'].to_numpy(dtype=np.int64)[order]
+        self._kinds = events['kind'].to_numpy(dtype=np.int64)[order]
+        self._minutes = minute[order]
+        self._added = added[order]
+        self._event_sides = events['side'].to_numpy(dtype=np.int64)[order]
+        self._players = events['playerid'].to_numpy()[order]
+        self._on_players = events['on_playerid'].to_numpy()[order]
+        # Bornes de chaque ligne (type, match)
+        self._offsets = np.searchsorted(self._keys, np.arange(len(EVENT_KINDS) * n + 1) * MINUTE_SLOTS)
+        # Sommes cumulées par côté : nombre d'événements d'un côté dans une plage par différence
+        self._home_counts = np.r_[0, np.cumsum(self._event_sides == 0)]
+        self._away_counts = np.r_[0, np.cumsum(self._event_sides == 1)]
+
+        # Titulaires (formation_place > 0) rangés par match
+        starters = np.flatnonzero((pd.to_numeric(sheets['formation_place'], errors='coerce') > 0).to_numpy()
+                                  & (sheet_positions >= 0))
+        order = starters[np.argsort(sheet_positions[starters], kind='stable')]
+        self._starter_players = sheets['playerid'].to_numpy(dtype=np.float64)[order]
+        self._starter_sides = sheet_sides[order]
+        self._starter_offsets = np.searchsorted(sheet_positions[order], np.arange(n + 1))
+
+    def __len__(self):
+        return len(self._keys)
+
+    # Côté (0 domicile, 1 extérieur, -1 inconnu) du club team_ids dans les matchs aux positions données
+    def _sides(self, positions, team_ids):
+        valid = positions >= 0
+        home = np.where(valid, self._home[np.where(valid, positions, 0)], -1)
+        away = np.where(valid, self._away[np.where(valid, positions, 0)], -1)
+        return np.where(valid & (team_ids == home), 0, np.where(valid & (team_ids == away), 1, -1))
+
+    # Positions des matchs : toutes, une plage (start, stop) ou des identifiants de match
+    def positions(self, matches=None):
+        if matches is None:
+            return np.arange(len(self._matches))
+        if isinstance(matches, tuple):
+            return np.arange(*matches)
+        positions = self._matches.get_indexer(pd.Index(np.atleast_1d(matches)))
+        return positions[positions >= 0]
+
+    # Plages [début, fin) des événements d'un type, par match, dont la minute est dans [start, end]
+    def _ranges(self, kind, positions, start=None, end=None):
+        rows = EVENT_KINDS.index(kind) * len(self._matches) + positions
+        lo, hi = self._offsets[rows], self._offsets[rows + 1]
+        if start is not None:
+            lo = np.searchsorted(self._keys, rows * MINUTE_SLOTS + int(start) * ADDED_SLOTS, side='left')
+        if end is not None:
+            hi = np.searchsorted(self._keys, rows * MINUTE_SLOTS + min(int(end) + 1, 256) * ADDED_SLOTS, side='left')
+        return lo, np.maximum(lo, hi)
+
+    def _frame(self, index):
+        positions, sides = self._positions[index], self._event_sides[index]
+        team_ids = np.where(sides == 0, self._home[positions], self._away[positions])
+        return pd.DataFrame({
+            'matchid': self._matches.to_numpy()[positions],
+            'kind': np.array(EVENT_KINDS, dtype=object)[self._kinds[index]],
+            'minute': self._minutes[index].astype(np.int32),
+            'added': self._added[index].astype(np.int32),
+            'side': pd.Series(np.array(SIDES + [None], dtype=object)[sides]),
+            'team_id': pd.Series(np.where(sides >= 0, team_ids, 0), dtype='Int64').where(sides >= 0),
+            'playerid': pd.array(self._players[index]).astype('Int64'),
+            'on_playerid': pd.array(self._on_players[index]).astype('Int64'),
+        })[EVENT_COLUMNS]
+
+    # Événements d'un type entre les minutes start et end incluses (temps additionnel compris dans sa
+    # minute : 90 +3 compte pour la 90e), pour les matchs demandés, par match puis par minute
+    def window(self, kind, start=None, end=None, matches=None):
+        lo, hi = self._ranges(kind, self.positions(matches), start, end)
+        return self._frame(_expand_ranges(lo, hi))
+
+    # Tous les événements d'un match, dans l'ordre du match
+    def match_events(self, matchid):
+        positions = self.positions(matchid)
+        index = np.concatenate([_expand_ranges(*self._ranges(kind, positions)) for kind in EVENT_KINDS])
+        order = np.lexsort((self._kinds[index], self._added[index], self._minutes[index]))
+        return self._frame(index[order]).reset_index(drop=True)
+
+    # Nombre d'événements d'un type par club et par tranche de minutes (bins : bornes des tranches,
+    # une minute m est dans la tranche ]b_i, b_i+1]) ; groups : colonnes de match ajoutées à la clé
+    # (championnat, saison...), alignées sur la table des matchs
+    def minute_histogram(self, kind, bins, matches=None, groups=None):
+        index = _expand_ranges(*self._ranges(kind, self.positions(matches)))
+        index = index[self._event_sides[index] >= 0]
+        positions, sides = self._positions[index], self._event_sides[index]
+        keys = {'team_id': np.where(sides == 0, self._home[positions], self._away[positions])}
+        for name, values in (groups or {}).items():
+            keys[name] = np.asarray(values)[positions]
+        keys['bin'] = pd.cut(self._minutes[index], bins)
+        counts = pd.DataFrame(keys).groupby(list(keys), observed=False).size()
+        return counts.unstack('bin', fill_value=0).loc[lambda t: t.sum(axis=1) > 0]
+
+    # État de tous les matchs demandés à la minute m : score et nombre de joueurs sur le terrain
+    # (titulaires moins les expulsés), d'après les événements jusqu'à la minute m incluse
+    def states_at(self, minute, matches=None):
+        positions = self.positions(matches)
+        columns = {'matchid': self._matches.to_numpy()[positions]}
+        for kind, names in (('goal', ('home_score', 'away_score')), ('red', ('home_players', 'away_players'))):
+            lo, hi = self._ranges(kind, positions, end=minute)
+            columns[names[0]] = self._home_counts[hi] - self._home_counts[lo]
+            columns[names[1]] = self._away_counts[hi] - self._away_counts[lo]
+        columns['home_players'] = STARTERS - columns['home_players']
+        columns['away_players'] = STARTERS - columns['away_players']
+        return pd.DataFrame(columns)[STATE_COLUMNS]
+
+    # Joueurs sur le terrain à la minute m : titulaires et entrants, moins sortants et expulsés
+    def lineup_at(self, matchid, minute):
+        positions = self.positions(matchid)
+        if len(positions) == 0:
+            return pd.DataFrame(columns=LINEUP_COLUMNS)
+        position = positions[0]
+        start, stop = self._starter_offsets[position], self._starter_offsets[position + 1]
+        subs = _expand_ranges(*self._ranges('substitution', positions, end=minute))
+        reds = _expand_ranges(*self._ranges('red', positions, end=minute))
+
+        players = np.r_[self._starter_players[start:stop], self._on_players[subs]]
+        sides = np.r_[self._starter_sides[start:stop], self._event_sides[subs]]
+        out = np.r_[self._players[subs], self._players[reds]]
+        keep = ~np.isin(players, out) & ~np.isnan(players)
+        players, sides = players[keep], sides[keep]
+        return pd.DataFrame({
+            'playerid': players.astype(np.int64),
+            'side': np.array(SIDES + [None], dtype=object)[sides],
+            'team_id': np.where(sides == 0, self._home[position], self._away[position]),
+        })[LINEUP_COLUMNS]
+
+    # Score et joueurs sur le terrain d'un match à la minute m
+    def state_at(self, matchid, minute):
+        state = self.states_at(minute, matchid)
+        if state.empty:
+            return None
+        state = state.iloc[0].to_dict()
+        state['lineup'] = self.lineup_at(matchid, minute)
+        return state
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+# Forme des joueurs : moyenne glissante, moyenne exponentielle (EWMA) et séries d'une statistique
+# (par défaut final_mark_2015), pour tous les joueurs en une passe sur les lignes triées par
+# (joueur, date). Les lignes d'un joueur sont une plage contiguë, lue par recherche dichotomique.
+
+FORM_COLUMNS = ['playerid', 'matchid', 'date', 'value', 'match_number', 'rolling_mean', 'ewma', 'streak']
+
+
+# rows : lignes joueur/match avec la date (Dataset.player_match_rows). Seuls les matchs où la
+# statistique est renseignée comptent. span : portée de l'EWMA (par défaut la fenêtre).
+# streak : nombre de matchs consécutifs au-dessus (> 0) ou en dessous (< 0) de la moyenne du joueur.
+def compute_form(rows, stat='final_mark_2015', window=3, span=None):
+    rows = rows[['playerid', 'matchid', 'date', stat]].dropna(subset=['playerid', 'date', stat])
+    rows = rows.sort_values(['playerid', 'date', 'matchid'], kind='stable').reset_index(drop=True)
+    players = rows['playerid'].to_numpy()
+    values = rows[stat].to_numpy(dtype=np.float64)
+    n = len(values)
+    idx = np.arange(n)
+
+    # Début de la plage de chaque joueur, propagé à toutes ses lignes
+    is_first = np.r_[True, players[1:] != players[:-1]] if n else np.zeros(0, dtype=bool)
+    first_row = np.maximum.accumulate(np.where(is_first, idx, 0)) if n else idx
+    match_number = idx - first_row + 1
+
+    # Moyenne glissante par différence de sommes cumulées (NaN avant window matchs)
+    sums = np.r_[0.0, np.cumsum(values)]
+    rolling_mean = (sums[idx + 1] - sums[np.maximum(idx + 1 - window, 0)]) / window
+    rolling_mean[match_number < window] = np.nan
+
+    ewma = (
+        rows[stat].astype(np.float64)
+        .groupby(rows['playerid'], sort=False)
+        .ewm(span=span or window)
+        .mean()
+        .droplevel(0)
+        .reindex(rows.index)
+        .to_numpy()
+    )
+
+    # Séries : une nouvelle série commence à chaque joueur ou à chaque passage au-dessus/en dessous
+    above = values >= rows.groupby('playerid', sort=False)[stat].transform('mean').to_numpy(dtype=np.float64)
+    is_run_start = is_first | np.r_[True, above[1:] != above[:-1]] if n else is_first
+    run_start = np.maximum.accumulate(np.where(is_run_start, idx, 0)) if n else idx
+    run_length = idx - run_start + 1
+
+    return pd.DataFrame({
+        'playerid': players,
+        'matchid': rows['matchid'].to_numpy(),
+        'date': rows['date'],
+        'value': values,
+        'match_number': match_number.astype(np.int32),
+        'rolling_mean': rolling_mean,
+        'ewma': ewma,
+        'streak': np.where(above, run_length, -run_length).astype(np.int32),
+    })[FORM_COLUMNS]
+
+
+# Lignes d'un joueur (plage de lignes, form triée par joueur)
+def player_form(form, player_id):
+    players = form['playerid'].to_numpy()
+    start = np.searchsorted(players, player_id, side='left')
+    stop = np.searchsorted(players, player_id, side='right')
+    return form.iloc[start:stop]
+
+
+# Joueurs avec moins de window matchs : pas de moyenne glissante
+def short_histories(form, window):
+    counts = form.groupby('playerid', sort=True).size()
+    return counts[counts < window].rename('matches').reset_index()
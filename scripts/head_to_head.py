@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# Confrontations directes entre deux clubs : index par paire non ordonnée (plus petit id, plus grand id)
+# vers les positions des matchs de la paire (dans l'ordre chronologique), bilan précalculé et, pour
+# chaque match, la plage de lignes de la feuille de match de chaque club.
+
+RECORD_COLUMNS = ['played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against']
+
+
+def pair_key(team_a, team_b):
+    return (min(int(team_a), int(team_b)), max(int(team_a), int(team_b)))
+
+
+# Clé entière (match, club) dans l'ordre des lignes triées par (matchid, team_id) ; identifiants
+# manquants après tous les autres, comme dans sort_values
+def lineup_keys(matchid, team_id):
+    matchid = pd.Series(matchid).to_numpy(dtype=np.int64, na_value=2 ** 31)
+    team_id = pd.Series(team_id).to_numpy(dtype=np.int64, na_value=2 ** 16 - 1)
+    return matchid * 2 ** 16 + team_id
+
+
+class HeadToHead:
+    # matches_df : table des matchs (index 0..n-1), les positions renvoyées sont celles de ses lignes
+    # lineups_df : feuilles de match triées par (matchid, team_id), les plages renvoyées sont ses lignes
+    def __init__(self, matches_df, lineups_df):
+        home = matches_df['home_idteam'].to_numpy(dtype=np.int64)
+        away = matches_df['away_idteam'].to_numpy(dtype=np.int64)
+        home_score = matches_df['home_score'].to_numpy(dtype=np.float64)
+        away_score = matches_df['away_score'].to_numpy(dtype=np.float64)
+        first_home = home <= away
+        goals_first = np.where(first_home, home_score, away_score)
+        goals_second = np.where(first_home, away_score, home_score)
+        played = np.isfinite(goals_first) & np.isfinite(goals_second)
+
+        pairs = pd.DataFrame({
+            'first': np.minimum(home, away),
+            'second': np.maximum(home, away),
+            'date': matches_df['date'].to_numpy(),
+            'position': np.arange(len(matches_df)),
+            'played': played.astype(np.int32),
+            'wins': (played & (goals_first > goals_second)).astype(np.int32),
+            'draws': (played & (goals_first == goals_second)).astype(np.int32),
+            'losses': (played & (goals_first < goals_second)).astype(np.int32),
+            'goals_for': np.where(played, goals_first, 0).astype(np.int32),
+            'goals_against': np.where(played, goals_second, 0).astype(np.int32),
+        }).sort_values(['first', 'second', 'date'], kind='stable').reset_index(drop=True)
+
+        groups = pairs.groupby(['first', 'second'])
+        positions = pairs['position'].to_numpy()
+        self._positions = {(int(a), int(b)): positions[rows] for (a, b), rows in groups.indices.items()}
+        # Bilan du point de vue du plus petit id de la paire
+        self._records = groups[RECORD_COLUMNS].sum()
+
+        # Plages (début, fin) des feuilles de match par position de match : colonne 0 domicile, 1 extérieur
+        self._home = home
+        keys = lineup_keys(lineups_df['matchid'], lineups_df['team_id'])
+        matchid = matches_df['matchid']
+        wanted = np.stack([lineup_keys(matchid, home), lineup_keys(matchid, away)], axis=1)
+        self._lineups = np.stack([np.searchsorted(keys, wanted, side='left'),
+                                  np.searchsorted(keys, wanted, side='right')], axis=-1)
+
+    # Positions des matchs entre les deux clubs, du plus ancien au plus récent
+    def positions(self, team_a, team_b):
+        return self._positions.get(pair_key(team_a, team_b), np.array([], dtype=np.int64))
+
+    # Bilan de team_a contre team_b (victoires, nuls, défaites, buts pour et contre)
+    def record(self, team_a, team_b):
+        key = pair_key(team_a, team_b)
+        if key not in self._records.index:
+            return dict.fromkeys(RECORD_COLUMNS, 0)
+        record = {col: int(value) for col, value in self._records.loc[key].items()}
+        if key[0] != int(team_a):
+            record['wins'], record['losses'] = record['losses'], record['wins']
+            record['goals_for'], record['goals_against'] = record['goals_against'], record['goals_for']
+        return record
+
+    # Plages (début, fin) des feuilles de match de team_a pour chaque match de la paire, dans l'ordre
+    # chronologique
+    def lineup_ranges(self, team_a, team_b):
+        positions = self.positions(team_a, team_b)
+        away = (self._home[positions] != int(team_a)).astype(np.int64)
+        return self._lineups[positions, away]
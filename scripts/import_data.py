@@ -1,10 +1,19 @@
+import numpy as np
 import pandas as pd
 import json
 import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from elo import EloRatings
+from player_seasons import compute_player_seasons
+from player_stats import STATS_COLUMNS, intern_stats, load_player_stats, stats_with_names
+from storage import TABLE_NAMES, convert_csv_to_parquet, has_parquet, read_table
 
 # Répertoires
 output_dir = './csv_output'
 os.makedirs(output_dir, exist_ok=True)
+manifest_path = os.path.join(output_dir, 'manifest.json')
 
 # Conteneurs pour les données
 teams = []
@@ -18,6 +27,11 @@ match_players = []
 seen_teams = set()
 seen_players = set()
 
+# Tables produites par le parsing
+TABLES = ['teams', 'players', 'matches', 'highlights', 'substitutions', 'match_players', 'match_player_stats']
+# Colonnes des tables construites à partir de tuples plutôt que de dictionnaires
+TABLE_COLUMNS = {'match_player_stats': STATS_COLUMNS}
+
 # Fonction utilitaire pour accéder à des clés imbriquées sans erreur
 def safe_get(d, *keys, default=None):
     for k in keys:
@@ -30,171 +44,456 @@ def safe_get(d, *keys, default=None):
 def is_goal_valid(goal_event):
     return goal_event.get('type') != 'var'
 
-def parse_json_files(json_directory):
-    teams, players, matches, highlights, substitutions, match_players = [], [], [], [], [], []
+# Extraction des données d'un match (JSON déjà chargé) dans les conteneurs
+def extract_match(data, tables, seen_teams, seen_players):
+    teams, players, matches = tables['teams'], tables['players'], tables['matches']
+    highlights, substitutions, match_players = tables['highlights'], tables['substitutions'], tables['match_players']
+    match_player_stats = tables['match_player_stats']
+
+    # --- Equipes ---
+    for side in ['Home', 'Away']:
+        tid = safe_get(data, side, 'id')
+        tname = safe_get(data, side, 'club', default='Unknown')
+        if tid and tid not in seen_teams:
+            teams.append({'idteam': tid, 'name': tname})
+            seen_teams.add(tid)
+
+    # --- Match ---
+    mid = safe_get(data, 'id')
+    home_goals = [g for g in safe_get(data, 'matchData', 'home', 'goals', default=[]) if is_goal_valid(g)]
+    away_goals = [g for g in safe_get(data, 'matchData', 'away', 'goals', default=[]) if is_goal_valid(g)]
+
+    # Récupération formations home/away (en protégeant si players est vide)
+    def get_formation(side):
+        players_data = safe_get(data, side, 'players', default={})
+        if players_data:
+            first_player = next(iter(players_data.values()))
+            return first_player.get('info', {}).get('formation_used')
+        return None
+
+    matches.append({
+        'matchid': mid,
+        'date': safe_get(data, 'dateMatch'),
+        'home_idteam': safe_get(data, 'Home', 'id'),
+        'away_idteam': safe_get(data, 'Away', 'id'),
+        'duration': safe_get(data, 'matchTime'),
+        'period': safe_get(data, 'period'),
+        'championship': safe_get(data, 'championship'),
+        'home_formation': get_formation('Home'),
+        'away_formation': get_formation('Away'),
+        'quotation_home': safe_get(data, 'quotationPreGame', 'Home'),
+        'quotation_away': safe_get(data, 'quotationPreGame', 'Away'),
+        'quotation_draw': safe_get(data, 'quotationPreGame', 'Draw'),
+        'home_score': len(home_goals),
+        'away_score': len(away_goals)
+    })
+
+    # --- Joueurs et joueurs par match ---
+    for side in ['Home', 'Away']:
+        team_id = safe_get(data, side, 'id')
+        players_data = safe_get(data, side, 'players', default={})
+
+        for pid, info in players_data.items():
+            pinfo = safe_get(info, 'info', default={})
+            pid_val = pinfo.get('idplayer')
+            lname = pinfo.get('lastname')
+
+            if pid_val and pid_val not in seen_players:
+                players.append({'playerid': pid_val, 'lastname': lname})
+                seen_players.add(pid_val)
+
+            # Infos joueur dans ce match
+            row = {
+                'playerid': pid_val,
+                'matchid': mid,
+                'team_id': team_id,
+                'position': pinfo.get('position'),
+                'formation_place': pinfo.get('formation_place'),
+                'play_duration': pinfo.get('mins_played'),
+                'final_mark_2015': pinfo.get('note_final_2015'),
+                'quotation_player': safe_get(data, 'quotationPlayers', f'player_{pid_val}')
+            }
+            match_players.append(row)
+
+            # Stats diverses au format long (une ligne par stat présente dans le JSON)
+            stats = safe_get(info, 'stat', default={})
+            for stat, value in stats.items():
+                match_player_stats.append((mid, pid_val, stat, value))
+
+    # --- Highlights : buts & cartons (buts annulés gardés avec le type 'var', hors score) ---
+    # Côté (home/away) de matchData : un but compte pour ce côté, y compris un but contre son camp
+    for side in ['home', 'away']:
+        for event in safe_get(data, 'matchData', side, 'goals', default=[]):
+            highlights.append({
+                'matchid': mid,
+                'time': event.get('time'),
+                'playerid': event.get('playerId'),
+                'type': 'goal' if is_goal_valid(event) else 'var',
+                'side': side
+            })
+
+    for side in ['home', 'away']:
+        for event in safe_get(data, 'matchData', side, 'bookings', default=[]):
+            btype = event.get('type')
+            if btype == 'yellow':
+                btype = 'yellowcard'
+            elif btype == 'red':
+                btype = 'redcard'
+
+            highlights.append({
+                'matchid': mid,
+                'time': event.get('time'),
+                'playerid': event.get('playerId'),
+                'type': btype,
+                'side': side
+            })
+
+    # --- Substitutions (deux sources possibles) ---
+    # Un même changement peut figurer dans les deux sources : dédoublonnage sur (minute, sortant, entrant).
+    # Côté du club (home/away) : celui de matchData, sinon celui des joueurs concernés
+    player_sides = {}
+    for side in ['Home', 'Away']:
+        for info in safe_get(data, side, 'players', default={}).values():
+            player_sides[safe_get(info, 'info', 'idplayer')] = side.lower()
+
+    seen_substitutions = set()
+
+    def add_substitution(sub, side):
+        key = (str(sub.get('time')), sub.get('subOff'), sub.get('subOn'))
+        if key in seen_substitutions:
+            return
+        seen_substitutions.add(key)
+        substitutions.append({
+            'matchid': mid,
+            'time': sub.get('time'),
+            'off_playerid': sub.get('subOff'),
+            'on_playerid': sub.get('subOn'),
+            'reason': sub.get('reason', 'Unknown'),
+            'side': side or player_sides.get(sub.get('subOff')) or player_sides.get(sub.get('subOn'))
+        })
+
+    for side in ['home', 'away']:
+        for sub in safe_get(data, 'matchData', side, 'substitutions', default=[]):
+            add_substitution(sub, side)
+    for ev in safe_get(data, 'timeline', default=[]):
+        if ev.get('type') == 'substitution':
+            add_substitution(ev, None)
+
+    return mid
+
+
+# Parsing d'un lot de sources JSON : renvoie un DataFrame (colonnes) par table.
+# Une source est un chemin de fichier ou un objet fichier déjà ouvert (membre de ZIP...).
+# Utilisé tel quel en mode séquentiel, par chaque worker en mode parallèle et pour les ZIP.
+def parse_json_stream(sources):
+    tables = {name: [] for name in TABLES}
     seen_teams, seen_players = set(), set()
+    # Correspondance fichier -> match, utilisée par le manifeste d'ingestion
+    parsed_sources = []
+
+    for source in sources:
+        name = source if isinstance(source, str) else getattr(source, 'name', '')
+        try:
+            if isinstance(source, str):
+                with open(source, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            else:
+                data = json.load(source)
+        except Exception as e:
+            print(f"Skipping {os.path.basename(str(name))} due to error: {e}")
+            continue
+        mid = extract_match(data, tables, seen_teams, seen_players)
+        parsed_sources.append({'file': os.path.basename(str(name)), 'matchid': mid})
+
+    partial = {name: pd.DataFrame(rows, columns=TABLE_COLUMNS.get(name)) for name, rows in tables.items()}
+    partial['sources'] = pd.DataFrame(parsed_sources, columns=['file', 'matchid'])
+    return partial
+
+
+# Membres JSON d'un ZIP ouverts un par un (un seul membre en mémoire à la fois)
+def iter_zip_json(zip_file):
+    for member in zip_file.namelist():
+        if not member.endswith('.json'):
+            continue
+        with zip_file.open(member) as f:
+            yield f
+
+
+# Fusion des résultats partiels dans l'ordre des lots (déterministe).
+# Le drop_duplicates garde la première occurrence, comme seen_teams/seen_players.
+def merge_partials(partials):
+    merged = {}
+    for name in TABLES:
+        frames = [p[name] for p in partials if not p[name].empty]
+        merged[name] = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=TABLE_COLUMNS.get(name))
+
+    merged['teams'] = merged['teams'].drop_duplicates(subset=['idteam'], ignore_index=True)
+    merged['players'] = merged['players'].drop_duplicates(subset=['playerid'], ignore_index=True)
+    merged['matches'] = merged['matches'].drop_duplicates(subset=['matchid'], ignore_index=True)
+    merged['sources'] = pd.concat([p['sources'] for p in partials], ignore_index=True)
+    return merged
+
+
+# Découpage de la liste de fichiers en lots contigus
+def split_chunks(items, n_chunks):
+    n_chunks = max(1, min(n_chunks, len(items)))
+    size, rest = divmod(len(items), n_chunks)
+    chunks, start = [], 0
+    for i in range(n_chunks):
+        stop = start + size + (1 if i < rest else 0)
+        chunks.append(items[start:stop])
+        start = stop
+    return chunks
+
+
+# Liste triée des fichiers JSON du dossier
+def list_json_files(json_directory):
+    return [os.path.join(json_directory, fname) for fname in sorted(os.listdir(json_directory))
+            if fname.endswith('.json')]
+
+
+# Parsing d'une liste de fichiers, en parallèle si workers > 1 (None : autant que de coeurs)
+def parse_paths(paths, workers=1):
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers > 1 and len(paths) > 1:
+        # Plusieurs lots par worker pour équilibrer la charge
+        chunks = split_chunks(paths, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(parse_json_stream, chunks))
+    else:
+        partials = [parse_json_stream(paths)]
+
+    return merge_partials(partials)
 
 
+def parse_json_files(json_directory, workers=1):
     # Parcours des fichiers JSON
     if not os.path.exists(json_directory):
         print(f"Le dossier {json_directory} n'existe pas !")
         os.makedirs(json_directory)
     else:
-        for fname in os.listdir(json_directory):
-            if not fname.endswith('.json'):
-                continue
-            path = os.path.join(json_directory, fname)
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except Exception as e:
-                print(f"Skipping {fname} due to error: {e}")
-                continue
-
-            # --- Equipes ---
-            for side in ['Home', 'Away']:
-                tid = safe_get(data, side, 'id')
-                tname = safe_get(data, side, 'club', default='Unknown')
-                if tid and tid not in seen_teams:
-                    teams.append({'idteam': tid, 'name': tname})
-                    seen_teams.add(tid)
-
-            # --- Match ---
-            mid = safe_get(data, 'id')
-            home_goals = [g for g in safe_get(data, 'matchData', 'home', 'goals', default=[]) if is_goal_valid(g)]
-            away_goals = [g for g in safe_get(data, 'matchData', 'away', 'goals', default=[]) if is_goal_valid(g)]
-
-            # Récupération formations home/away (en protégeant si players est vide)
-            def get_formation(side):
-                players_data = safe_get(data, side, 'players', default={})
-                if players_data:
-                    first_player = next(iter(players_data.values()))
-                    return first_player.get('info', {}).get('formation_used')
-                return None
-
-            matches.append({
-                'matchid': mid,
-                'date': safe_get(data, 'dateMatch'),
-                'home_idteam': safe_get(data, 'Home', 'id'),
-                'away_idteam': safe_get(data, 'Away', 'id'),
-                'duration': safe_get(data, 'matchTime'),
-                'period': safe_get(data, 'period'),
-                'championship': safe_get(data, 'championship'),
-                'home_formation': get_formation('Home'),
-                'away_formation': get_formation('Away'),
-                'quotation_home': safe_get(data, 'quotationPreGame', 'Home'),
-                'quotation_away': safe_get(data, 'quotationPreGame', 'Away'),
-                'quotation_draw': safe_get(data, 'quotationPreGame', 'Draw'),
-                'home_score': len(home_goals),
-                'away_score': len(away_goals)
-            })
+        # Tri des fichiers pour un résultat identique quel que soit le nombre de workers
+        paths = list_json_files(json_directory)
+        tables = parse_paths(paths, workers=workers)
+        save_manifest(build_manifest(paths, tables['sources']))
+
+        return save_tables(tables)
+
+
+# Ingestion directe d'un ZIP (zipfile.ZipFile) ou de tout itérable d'objets fichiers,
+# sans extraction préalable sur le disque
+def parse_json_zip(zip_file):
+    sources = iter_zip_json(zip_file) if isinstance(zip_file, zipfile.ZipFile) else zip_file
+    tables = merge_partials([parse_json_stream(sources)])
+    # Les tables ne correspondent plus au dossier JSON : la prochaine ingestion incrémentale repart de zéro
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    return save_tables(tables)
+
+
+# --- Saisons ---
+# Une nouvelle saison commence après une coupure d'au moins SEASON_GAP_DAYS jours si la reprise a lieu
+# entre juillet et octobre : la trêve hivernale et l'arrêt du printemps 2020 ne coupent pas la saison.
+SEASON_GAP_DAYS = 21
+SEASON_START_MONTHS = [7, 8, 9, 10]
+
+
+# Saison ("2019-2020") déduite du calendrier de chaque championnat, nommée d'après son premier match
+def infer_seasons(matches_df):
+    dates = pd.to_datetime(matches_df['date'], utc=True)
+    order = pd.DataFrame({'championship': matches_df['championship'], 'date': dates}).sort_values(
+        ['championship', 'date'], kind='stable')
+
+    new_championship = order['championship'].ne(order['championship'].shift())
+    gap = order['date'].diff() >= pd.Timedelta(days=SEASON_GAP_DAYS)
+    new_season = new_championship | (gap & order['date'].dt.month.isin(SEASON_START_MONTHS))
+
+    first_date = order['date'].groupby(new_season.cumsum()).transform('first')
+    start_year = first_date.dt.year - (first_date.dt.month < 7).astype(int)
+    season = (start_year.astype('Int64').astype(str) + '-' + (start_year + 1).astype('Int64').astype(str))
+    return season.where(first_date.notna()).reindex(matches_df.index)
+
+
+# Matchs avec leur saison, rangés par (championnat, saison, date) : chaque saison est une plage contiguë
+def with_seasons(matches_df):
+    matches_df = matches_df.assign(season=infer_seasons(matches_df))
+    order = pd.to_datetime(matches_df['date'], utc=True)
+    return (
+        matches_df.assign(_date=order)
+        .sort_values(['championship', 'season', '_date'], kind='stable')
+        .drop(columns='_date')
+        .reset_index(drop=True)
+    )
+
+
+# Anciens substitutions.csv (sans côté, doublons des deux sources) : dédoublonnés sur (match, minute,
+# sortant, entrant), côté déduit du club du joueur sortant (sinon entrant) sur la feuille de match
+def with_substitution_sides(substitutions_df, match_players_df, matches_df):
+    subs = (
+        substitutions_df.assign(_time=substitutions_df['time'].astype(str))
+        .drop_duplicates(['matchid', '_time', 'off_playerid', 'on_playerid'])
+        .drop(columns='_time')
+        .reset_index(drop=True)
+    )
+    sheets = match_players_df[['matchid', 'playerid', 'team_id']].dropna().drop_duplicates(['matchid', 'playerid'])
+
+    def team_of(column):
+        return subs[['matchid', column]].merge(
+            sheets, left_on=['matchid', column], right_on=['matchid', 'playerid'], how='left')['team_id']
+
+    team = team_of('off_playerid').fillna(team_of('on_playerid')).to_numpy()
+    teams = subs[['matchid']].merge(matches_df[['matchid', 'home_idteam', 'away_idteam']], on='matchid', how='left')
+    side = np.select([team == teams['home_idteam'].to_numpy(), team == teams['away_idteam'].to_numpy()],
+                     ['home', 'away'], None)
+    return subs.assign(side=side)
+
+
+def save_tables(tables):
+    # Création DataFrames
+    teams_df = tables['teams']
+    players_df = tables['players']
+    matches_df = with_seasons(tables['matches']) if not tables['matches'].empty else tables['matches']
+    highlights_df = tables['highlights']
+    substitutions_df = tables['substitutions']
+    match_players_df = tables['match_players']
+
+    # Sauvegarde
+    teams_df.to_csv(os.path.join(output_dir, 'teams.csv'), index=False)
+    players_df.to_csv(os.path.join(output_dir, 'players.csv'), index=False)
+    matches_df.to_csv(os.path.join(output_dir, 'matches.csv'), index=False)
+    highlights_df.to_csv(os.path.join(output_dir, 'highlights.csv'), index=False)
+    substitutions_df.to_csv(os.path.join(output_dir, 'substitutions.csv'), index=False)
+    match_players_df.to_csv(os.path.join(output_dir, 'match_players.csv'), index=False)
+    stats_long, stat_dict = intern_stats(tables['match_player_stats'])
+    stats_long.to_csv(os.path.join(output_dir, 'match_player_stats.csv'), index=False)
+    stat_dict.to_csv(os.path.join(output_dir, 'stat_dict.csv'), index=False)
+
+    print("✅ Export CSV terminé.")
+    print(f"Teams: {len(teams_df)}")
+    print(f"Players: {len(players_df)}")
+    print(f"Matches: {len(matches_df)}")
+    print(f"Highlights: {len(highlights_df)}")
+    print(f"Substitutions: {len(substitutions_df)}")
+    print(f"Match Players: {len(match_players_df)}")
+    print(f"Match Player Stats: {len(stats_long)} ({len(stat_dict)} stats)")
+
+    return teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df
+
+
+# --- Manifeste des fichiers déjà ingérés (nom, taille, date de modification, match) ---
+def file_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def build_manifest(paths, sources, manifest=None):
+    manifest = dict(manifest or {})
+    match_by_file = dict(zip(sources['file'], sources['matchid']))
+    for path in paths:
+        fname = os.path.basename(path)
+        if fname in match_by_file:
+            manifest[fname] = {**file_signature(path), 'matchid': match_by_file[fname]}
+    return manifest
+
+
+def load_manifest():
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest):
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+
+
+# Ingestion incrémentale : seuls les fichiers nouveaux ou modifiés depuis le dernier passage
+# sont parsés, puis fusionnés dans les tables existantes. Les transferts ne sont recalculés
+# que pour les joueurs concernés.
+def update_data(json_directory='../data', workers=1):
+    manifest = load_manifest()
+    if manifest is None or not all(os.path.exists(p) for p in table_paths(TABLES + ['stat_dict', 'transfers'])):
+        # Première ingestion : parsing complet
+        return load_data(json_directory, force_refresh=True, workers=workers)
+
+    paths = list_json_files(json_directory) if os.path.exists(json_directory) else []
+    current = {os.path.basename(p): p for p in paths}
+    changed = [p for fname, p in current.items()
+               if fname not in manifest
+               or {k: manifest[fname].get(k) for k in ('size', 'mtime')} != file_signature(p)]
+    removed = [fname for fname in manifest if fname not in current]
+
+    loaded = TABLES[:-1]
+    old = {name: pd.read_csv(path) for name, path in zip(loaded, table_paths(loaded))}
+    if not changed and not removed:
+        print("✅ Aucun nouveau fichier, données inchangées.")
+        transfers_df = pd.read_csv(os.path.join(output_dir, 'transfers.csv'))
+        return tuple(old[name] for name in loaded) + (transfers_df,)
+    old['match_player_stats'] = stats_with_names(*load_player_stats(output_dir))
+    if 'side' not in old['substitutions'] and not old['substitutions'].empty:
+        old['substitutions'] = with_substitution_sides(old['substitutions'], old['match_players'], old['matches'])
+
+    new = parse_paths(changed, workers=workers)
+
+    # Matchs à remplacer : fichiers modifiés/supprimés et matchs re-parsés
+    stale_ids = {manifest[os.path.basename(p)]['matchid'] for p in changed if os.path.basename(p) in manifest}
+    stale_ids |= {manifest[fname]['matchid'] for fname in removed}
+    stale_ids |= set(new['sources']['matchid'])
+
+    old_mp = old['match_players']
+    affected_players = set(old_mp.loc[old_mp['matchid'].isin(stale_ids), 'playerid'])
+    if not new['match_players'].empty:
+        affected_players |= set(new['match_players']['playerid'])
+
+    tables = {}
+    for name in ['matches', 'highlights', 'substitutions', 'match_players', 'match_player_stats']:
+        kept = old[name][~old[name]['matchid'].isin(stale_ids)] if not old[name].empty else old[name]
+        frames = [df for df in (kept, new[name]) if not df.empty]
+        tables[name] = pd.concat(frames, ignore_index=True) if frames else kept
+    # Equipes et joueurs : les lignes existantes restent prioritaires
+    for name, key in [('teams', 'idteam'), ('players', 'playerid')]:
+        frames = [df for df in (old[name], new[name]) if not df.empty]
+        tables[name] = pd.concat(frames, ignore_index=True).drop_duplicates(subset=[key], ignore_index=True)
+
+    for fname in removed:
+        del manifest[fname]
+    save_manifest(build_manifest(changed, new['sources'], manifest))
+
+    print(f"🔄 {len(changed)} fichier(s) nouveau(x) ou modifié(s), {len(removed)} supprimé(s).")
+    teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df = save_tables(tables)
+    transfers_df = save_transfers(
+        compute_transfers(matches_df, players_df, teams_df, match_players_df, player_ids=affected_players),
+        player_ids=affected_players
+    )
+    update_ratings(matches_df)
+    update_player_seasons(matches_df, match_players_df, highlights_df)
+
+    return teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df, transfers_df
+
+
+def table_paths(names):
+    return [os.path.join(output_dir, f'{name}.csv') for name in names]
+
+
+# storage_format='parquet' : lecture des tables Parquet typées (columns={table: [colonnes]}
+# pour ne lire que certaines colonnes), créées à partir des CSV si elles n'existent pas encore
+def load_data(json_directory='../data', force_refresh=False, workers=1, incremental=False,
+              storage_format='csv', columns=None):
+    if storage_format == 'parquet' and not force_refresh and not incremental and has_parquet(output_dir):
+        print("✅ Données chargées depuis Parquet.")
+        return tuple(read_table(name, columns=(columns or {}).get(name), directory=output_dir)
+                     for name in TABLE_NAMES)
 
-            # --- Joueurs et joueurs par match ---
-            for side in ['Home', 'Away']:
-                team_id = safe_get(data, side, 'id')
-                players_data = safe_get(data, side, 'players', default={})
-
-                for pid, info in players_data.items():
-                    pinfo = safe_get(info, 'info', default={})
-                    pid_val = pinfo.get('idplayer')
-                    lname = pinfo.get('lastname')
-
-                    if pid_val and pid_val not in seen_players:
-                        players.append({'playerid': pid_val, 'lastname': lname})
-                        seen_players.add(pid_val)
-
-                    # Infos joueur dans ce match
-                    row = {
-                        'playerid': pid_val,
-                        'matchid': mid,
-                        'team_id': team_id,
-                        'position': pinfo.get('position'),
-                        'formation_place': pinfo.get('formation_place'),
-                        'play_duration': pinfo.get('mins_played'),
-                        'final_mark_2015': pinfo.get('note_final_2015'),
-                        'quotation_player': safe_get(data, 'quotationPlayers', f'player_{pid_val}')
-                    }
-                    # Stats diverses ajoutées dynamiquement
-                    stats = safe_get(info, 'stat', default={})
-                    row.update(stats)
-                    match_players.append(row)
-
-            # --- Highlights : buts & cartons ---
-            for event in safe_get(data, 'matchData', 'home', 'goals', default=[]) + safe_get(data, 'matchData', 'away', 'goals', default=[]):
-                highlights.append({
-                    'matchid': mid,
-                    'time': event.get('time'),
-                    'playerid': event.get('playerId'),
-                    'type': 'goal'
-                })
-
-            for event in safe_get(data, 'matchData', 'home', 'bookings', default=[]) + safe_get(data, 'matchData', 'away', 'bookings', default=[]):
-                btype = event.get('type')
-                if btype == 'yellow':
-                    btype = 'yellowcard'
-                elif btype == 'red':
-                    btype = 'redcard'
-
-                highlights.append({
-                    'matchid': mid,
-                    'time': event.get('time'),
-                    'playerid': event.get('playerId'),
-                    'type': btype
-                })
-
-            # --- Substitutions (deux sources possibles) ---
-            for sub in safe_get(data, 'matchData', 'home', 'substitutions', default=[]) + safe_get(data, 'matchData', 'away', 'substitutions', default=[]):
-                substitutions.append({
-                    'matchid': mid,
-                    'time': sub.get('time'),
-                    'off_playerid': sub.get('subOff'),
-                    'on_playerid': sub.get('subOn'),
-                    'reason': sub.get('reason', 'Unknown')
-                })
-            for ev in safe_get(data, 'timeline', default=[]):
-                if ev.get('type') == 'substitution':
-                    substitutions.append({
-                        'matchid': mid,
-                        'time': ev.get('time'),
-                        'off_playerid': ev.get('subOff'),
-                        'on_playerid': ev.get('subOn'),
-                        'reason': ev.get('reason', 'Unknown')
-                    })
-
-
-        # Création DataFrames
-        teams_df = pd.DataFrame(teams).drop_duplicates(subset=['idteam'])
-        players_df = pd.DataFrame(players).drop_duplicates(subset=['playerid'])
-        matches_df = pd.DataFrame(matches).drop_duplicates(subset=['matchid'])
-        highlights_df = pd.DataFrame(highlights)
-        substitutions_df = pd.DataFrame(substitutions)
-        match_players_df = pd.DataFrame(match_players)
-
-        # Sauvegarde
-        teams_df.to_csv(os.path.join(output_dir, 'teams.csv'), index=False)
-        players_df.to_csv(os.path.join(output_dir, 'players.csv'), index=False)
-        matches_df.to_csv(os.path.join(output_dir, 'matches.csv'), index=False)
-        highlights_df.to_csv(os.path.join(output_dir, 'highlights.csv'), index=False)
-        substitutions_df.to_csv(os.path.join(output_dir, 'substitutions.csv'), index=False)
-        match_players_df.to_csv(os.path.join(output_dir, 'match_players.csv'), index=False)
-
-        print("✅ Export CSV terminé.")
-        print(f"Teams: {len(teams_df)}")
-        print(f"Players: {len(players_df)}")
-        print(f"Matches: {len(matches_df)}")
-        print(f"Highlights: {len(highlights_df)}")
-        print(f"Substitutions: {len(substitutions_df)}")
-        print(f"Match Players: {len(match_players_df)}")
-
-        return teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df
-
-
-def load_data(json_directory='../data', force_refresh=False):
     csv_files = ['teams.csv', 'players.csv', 'matches.csv', 'highlights.csv', 'substitutions.csv',
                  'match_players.csv']
     csv_paths = [os.path.join(output_dir, f) for f in csv_files]
 
-    if all(os.path.exists(p) for p in csv_paths) and not force_refresh:
+    if incremental and not force_refresh:
+        data = update_data(json_directory, workers=workers)
+    elif all(os.path.exists(p) for p in csv_paths) and not force_refresh:
         teams_df = pd.read_csv(csv_paths[0])
         players_df = pd.read_csv(csv_paths[1])
         matches_df = pd.read_csv(csv_paths[2])
@@ -203,57 +502,243 @@ def load_data(json_directory='../data', force_refresh=False):
         match_players_df = pd.read_csv(csv_paths[5])
         transfers_df = pd.read_csv(os.path.join(output_dir, 'transfers.csv'))
         print("✅ Données chargées depuis les CSV.")
+        data = teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df, transfers_df
     else:
-        teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df = parse_json_files(json_directory)
-        transfers_df = compute_transfers_from_csv()
+        teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df = parse_json_files(json_directory, workers=workers)
+        transfers_df = save_transfers(compute_transfers(matches_df, players_df, teams_df, match_players_df))
+        update_ratings(matches_df)
+        update_player_seasons(matches_df, match_players_df, highlights_df)
+        data = teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df, transfers_df
+
+    if storage_format == 'parquet':
+        convert_csv_to_parquet(output_dir)
+
+    return data
+
+
+# Chargement depuis un ZIP uploadé : parsing en flux puis calcul des transferts
+def load_data_from_zip(zip_file):
+    teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df = parse_json_zip(zip_file)
+    transfers_df = save_transfers(compute_transfers(matches_df, players_df, teams_df, match_players_df))
+    update_ratings(matches_df)
+    update_player_seasons(matches_df, match_players_df, highlights_df)
 
     return teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df, transfers_df
 
-def compute_transfers_from_csv():
-    matches_df = pd.read_csv('./csv_output/matches.csv', parse_dates=['date'])
-    players_df = pd.read_csv('./csv_output/players.csv')
-    teams_df = pd.read_csv('./csv_output/teams.csv')
-    match_players_df = pd.read_csv('./csv_output/match_players.csv')
+# Détection des passages en club (spells) par encodage des séries (run-length) :
+# les lignes joueur/date triées sont découpées à chaque changement de joueur ou de club.
+# player_ids : ne calculer que ces joueurs.
+def compute_transfers(matches_df, players_df, teams_df, match_players_df, player_ids=None):
+    if player_ids is not None:
+        match_players_df = match_players_df[match_players_df['playerid'].isin(player_ids)]
 
+    matches = pd.DataFrame({'matchid': matches_df['matchid'], 'date': pd.to_datetime(matches_df['date'], utc=True)})
     mp = (
-        match_players_df
-        .merge(matches_df[['matchid', 'date']], on='matchid')
+        match_players_df[['playerid', 'matchid', 'team_id']]
+        .dropna(subset=['playerid'])
+        .merge(matches, on='matchid')
         .merge(teams_df[['idteam', 'name']], left_on='team_id', right_on='idteam')
         .rename(columns={'name': 'team_name'})
+        .sort_values(by=['playerid', 'date'])
+        .reset_index(drop=True)
     )
 
-    mp = mp.sort_values(by=['playerid', 'date'])
-    transfers = []
-    for pid, group in mp.groupby('playerid'):
-        group = group.reset_index(drop=True)
-        start_date = group.at[0, 'date']
-        current_team = group.at[0, 'team_name']
-        player_name = players_df.loc[players_df['playerid'] == pid, 'lastname'].iat[0]
-
-        for i in range(1, len(group)):
-            row = group.loc[i]
-            if row['team_name'] != current_team:
-                end_date = row['date'] - pd.Timedelta(days=1)
-                transfers.append({
-                    'playerid': pid,
-                    'player_name': player_name,
-                    'team': current_team,
-                    'start_date': start_date.date().isoformat(),
-                    'end_date': end_date.date().isoformat(),
-                })
-                current_team = row['team_name']
-                start_date = row['date']
-
-        last_date = group['date'].max()
-        transfers.append({
-            'playerid': pid,
-            'player_name': player_name,
-            'team': current_team,
-            'start_date': start_date.date().isoformat(),
-            'end_date': last_date.date().isoformat(),
-        })
-
-    transfers_df = pd.DataFrame(transfers)
+    # Début de série : nouveau joueur ou club différent de la ligne précédente (comparé sur l'identifiant :
+    # deux clubs peuvent porter le même nom, le nom ne sert qu'à l'affichage)
+    new_player = mp['playerid'].ne(mp['playerid'].shift())
+    is_start = new_player | mp['team_id'].ne(mp['team_id'].shift())
+    is_end = is_start.shift(-1, fill_value=True)
+
+    starts = mp.loc[is_start].reset_index(drop=True)
+    ends = mp.loc[is_end].reset_index(drop=True)
+
+    # Fin de série : veille du passage suivant du même joueur, sinon date de son dernier match
+    next_same_player = starts['playerid'].eq(starts['playerid'].shift(-1))
+    end_dates = ends['date'].where(~next_same_player, starts['date'].shift(-1) - pd.Timedelta(days=1))
+
+    names = players_df.drop_duplicates(subset=['playerid']).set_index('playerid')['lastname']
+    return pd.DataFrame({
+        'playerid': starts['playerid'],
+        'player_name': starts['playerid'].map(names),
+        'team_id': starts['team_id'],
+        'team': starts['team_name'],
+        'start_date': starts['date'].dt.strftime('%Y-%m-%d'),
+        'end_date': end_dates.dt.strftime('%Y-%m-%d'),
+    })
+
+
+# Anciens transfers.csv sans identifiant de club : recalculés depuis les feuilles de match si elles sont
+# chargées (les passages de deux clubs homonymes y étaient fusionnés), sinon identifiant déduit du nom
+# quand un seul club le porte
+def with_transfer_team_ids(transfers_df, matches_df, players_df, teams_df, match_players_df):
+    if not match_players_df.empty:
+        return compute_transfers(matches_df, players_df, teams_df, match_players_df)
+    names = teams_df.drop_duplicates(subset=['idteam'])
+    names = names[~names['name'].duplicated(keep=False)].set_index('name')['idteam']
+    transfers_df = transfers_df.assign(team_id=transfers_df['team'].map(names))
+    return transfers_df[['playerid', 'player_name', 'team_id', 'team', 'start_date', 'end_date']]
+
+
+# Sauvegarde de transfers.csv ; avec player_ids, seules les lignes de ces joueurs sont remplacées
+def save_transfers(transfers_df, player_ids=None):
+    if player_ids is not None:
+        old_transfers = pd.read_csv('./csv_output/transfers.csv')
+        old_transfers = old_transfers[~old_transfers['playerid'].isin(player_ids)]
+        transfers_df = (
+            pd.concat([old_transfers, transfers_df], ignore_index=True)
+            .sort_values('playerid', kind='stable')
+            .reset_index(drop=True)
+        )
     transfers_df.to_csv('./csv_output/transfers.csv', index=False)
     print(f"{len(transfers_df)} transferts détectés et exportés dans transfers.csv")
     return transfers_df
+
+
+# player_ids : ne recalculer que ces joueurs, les autres lignes de transfers.csv sont conservées
+def compute_transfers_from_csv(player_ids=None):
+    matches_df = pd.read_csv('./csv_output/matches.csv')
+    players_df = pd.read_csv('./csv_output/players.csv')
+    teams_df = pd.read_csv('./csv_output/teams.csv')
+    match_players_df = pd.read_csv('./csv_output/match_players.csv')
+
+    transfers_df = compute_transfers(matches_df, players_df, teams_df, match_players_df, player_ids=player_ids)
+    return save_transfers(transfers_df, player_ids=player_ids)
+
+
+# Classement Elo complété avec les matchs nouvellement ingérés (recalculé en entier si des matchs
+# déjà traités ont changé, voir elo.py)
+def update_ratings(matches_df):
+    ratings = EloRatings.load(output_dir)
+    count = ratings.update(matches_df.assign(matchid=matchid_to_int(matches_df['matchid'])))
+    ratings.save(output_dir)
+    print(f"{count} match(s) ajouté(s) au classement Elo")
+    return ratings
+
+
+# Agrégats joueur/saison (voir player_seasons.py), recalculés en entier à chaque ingestion
+def update_player_seasons(matches_df, match_players_df, highlights_df):
+    player_seasons = compute_player_seasons(matches_df, match_players_df, highlights_df)
+    player_seasons.to_csv(os.path.join(output_dir, 'player_seasons.csv'), index=False)
+    print(f"{len(player_seasons)} lignes joueur/saison exportées dans player_seasons.csv")
+    return player_seasons
+
+
+# --- Normalisation des types en mémoire ---
+# Colonnes texte à faible cardinalité stockées en catégories
+CATEGORY_COLUMNS = {
+    'teams': ['name'],
+    'matches': ['season', 'period', 'home_formation', 'away_formation'],
+    'highlights': ['type', 'side'],
+    'substitutions': ['reason', 'side'],
+    'match_players': ['position'],
+    'transfers': ['team'],
+}
+# Clés de jointure : un type fixe par colonne, le même dans toutes les tables (Int32/Int16 nullables
+# s'il manque des valeurs), pour que fusions et index se fassent sans conversion
+KEY_DTYPES = {
+    'matchid': 'int32',
+    'playerid': 'int32',
+    'off_playerid': 'int32',
+    'on_playerid': 'int32',
+    'idteam': 'int16',
+    'home_idteam': 'int16',
+    'away_idteam': 'int16',
+    'team_id': 'int16',
+}
+# Compteurs entiers (hors clés) à réduire au plus petit type possible, table par table
+INTEGER_COLUMNS = {
+    'matches': ['duration', 'championship', 'home_score', 'away_score'],
+    'match_players': ['formation_place', 'play_duration'],
+}
+DATE_COLUMNS = {
+    'matches': ['date'],
+    'transfers': ['start_date', 'end_date'],
+}
+
+
+# 'match_1059702' -> 1059702
+def matchid_to_int(series):
+    if not pd.api.types.is_integer_dtype(series):
+        series = series.astype(str).str.extract(r'(\d+)$')[0]
+    return key_integer(series, KEY_DTYPES['matchid'])
+
+
+# Type fixe d'une clé (int32, int16), en version nullable (Int32, Int16) s'il y a des valeurs manquantes
+def key_integer(series, dtype):
+    series = pd.to_numeric(series, errors='coerce')
+    return series.astype(dtype.capitalize() if series.isna().any() else dtype)
+
+
+# Entier le plus petit possible, nullable (Int8/Int16/...) s'il y a des valeurs manquantes
+def downcast_integer(series):
+    series = pd.to_numeric(series, errors='coerce')
+    if series.isna().any():
+        small = pd.to_numeric(series.dropna(), downcast='integer')
+        return series.astype(small.dtype.name.capitalize()) if len(small) else series.astype('Int32')
+    return pd.to_numeric(series, downcast='integer')
+
+
+def as_category(series):
+    # Formations lues comme nombres dans les CSV (433) : ramenées au texte avant la catégorie
+    if pd.api.types.is_numeric_dtype(series):
+        series = series.astype('Int64').astype(str).replace('<NA>', pd.NA)
+    return series.astype('category')
+
+
+def memory_usage(tables):
+    return {name: df.memory_usage(deep=True).sum() for name, df in tables.items()}
+
+
+def memory_report(before, after):
+    report = pd.DataFrame({'avant (Mo)': pd.Series(before), 'après (Mo)': pd.Series(after)}) / 1e6
+    report.loc['total'] = report.sum()
+    report['gain (%)'] = (1 - report['après (Mo)'] / report['avant (Mo)']) * 100
+    return report.round(2)
+
+
+# Normalisation unique après chargement : matchid entier, clés au même type partout, compteurs réduits,
+# texte à faible cardinalité en catégories, dates tz-aware (UTC) parsées une fois
+def normalize_tables(teams_df, players_df, matches_df, highlights_df, substitutions_df, match_players_df,
+                     transfers_df, verbose=True):
+    tables = dict(zip(TABLE_NAMES, (teams_df, players_df, matches_df, highlights_df, substitutions_df,
+                                    match_players_df, transfers_df)))
+    before = memory_usage(tables)
+
+    # Anciens matches.csv sans saison : inférée au chargement
+    if 'season' not in tables['matches'] and not tables['matches'].empty:
+        tables['matches'] = with_seasons(tables['matches'])
+    # Anciens substitutions.csv sans côté : dédoublonnés et côté déduit au chargement
+    if 'side' not in tables['substitutions'] and not tables['substitutions'].empty:
+        tables['substitutions'] = with_substitution_sides(tables['substitutions'], tables['match_players'],
+                                                          tables['matches'])
+    # Anciens transfers.csv sans identifiant de club
+    transfers = tables['transfers']
+    if ('team_id' not in transfers or transfers['team_id'].isna().all()) and not transfers.empty:
+        tables['transfers'] = with_transfer_team_ids(transfers, tables['matches'], tables['players'],
+                                                     tables['teams'], tables['match_players'])
+
+    normalized = {}
+    for name, df in tables.items():
+        df = df.copy()
+        if 'matchid' in df:
+            df['matchid'] = matchid_to_int(df['matchid'])
+        for col, dtype in KEY_DTYPES.items():
+            if col in df and col != 'matchid':
+                df[col] = key_integer(df[col], dtype)
+        for col in INTEGER_COLUMNS.get(name, []):
+            if col in df:
+                df[col] = downcast_integer(df[col])
+        for col in CATEGORY_COLUMNS.get(name, []):
+            if col in df:
+                df[col] = as_category(df[col])
+        for col in DATE_COLUMNS.get(name, []):
+            if col in df:
+                df[col] = pd.to_datetime(df[col], utc=True)
+        normalized[name] = df
+
+    report = memory_report(before, memory_usage(normalized))
+    if verbose:
+        print("📦 Mémoire des tables avant/après normalisation :")
+        print(report.to_string())
+
+    return tuple(normalized[name] for name in TABLE_NAMES) + (report,)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Probabilités implicites des cotes d'avant-match (marge du bookmaker retirée) et calibration :
+# courbes de fiabilité, score de Brier et log-loss, calculés sur tableaux pour tous les matchs.
+
+OUTCOMES = ['home', 'draw', 'away']
+ODDS_COLUMNS = ['quotation_home', 'quotation_draw', 'quotation_away']
+
+
+# Probabilités implicites normalisées (somme = 1) et marge (somme des 1/cote - 1).
+# Un match dont une cote est absente ou égale à 1 est écarté.
+def implied_probabilities(matches_df):
+    odds = matches_df[ODDS_COLUMNS].to_numpy(dtype=np.float64)
+    scores = matches_df[['home_score', 'away_score']].to_numpy(dtype=np.float64)
+    valid = (np.isfinite(odds) & (odds > 1)).all(axis=1) & np.isfinite(scores).all(axis=1)
+
+    odds, scores = odds[valid], scores[valid]
+    raw = 1 / odds
+    overround = raw.sum(axis=1)
+    probs = raw / overround[:, None]
+
+    # Résultat observé : 0 = domicile, 1 = nul, 2 = extérieur
+    outcome = np.where(scores[:, 0] > scores[:, 1], 0, np.where(scores[:, 0] == scores[:, 1], 1, 2))
+
+    result = matches_df.loc[valid, ['matchid', 'date', 'championship', 'season']].reset_index(drop=True)
+    for i, name in enumerate(OUTCOMES):
+        result[f'p_{name}'] = probs[:, i]
+    result['margin'] = overround - 1
+    result['outcome'] = outcome.astype(np.int8)
+    return result
+
+
+def _probability_matrix(probs):
+    return probs[[f'p_{name}' for name in OUTCOMES]].to_numpy()
+
+
+# Score de Brier multi-classes par match : somme sur les 3 issues de (p - observé)²
+def brier_scores(probs):
+    p = _probability_matrix(probs)
+    observed = np.zeros_like(p)
+    observed[np.arange(len(p)), probs['outcome'].to_numpy()] = 1
+    return ((p - observed) ** 2).sum(axis=1)
+
+
+# Log-loss par match : -log de la probabilité donnée à l'issue observée
+def log_losses(probs):
+    p = _probability_matrix(probs)
+    p_outcome = p[np.arange(len(p)), probs['outcome'].to_numpy()]
+    return -np.log(np.clip(p_outcome, 1e-15, 1))
+
+
+# Brier, log-loss et marge moyenne par groupe (par défaut par championnat et saison)
+def calibration_scores(probs, by=('championship', 'season')):
+    by = list(by)
+    scores = probs[by].assign(
+        matches=1,
+        brier=brier_scores(probs),
+        log_loss=log_losses(probs),
+        margin=probs['margin'].to_numpy(),
+    )
+    return (
+        scores.groupby(by, observed=True)
+        .agg(matches=('matches', 'sum'), brier=('brier', 'mean'), log_loss=('log_loss', 'mean'),
+             margin=('margin', 'mean'))
+        .reset_index()
+    )
+
+
+# Courbe de fiabilité : les 3 probabilités de chaque match sont rangées par classe de largeur 1/n_bins,
+# puis comparées à la fréquence observée de l'issue dans chaque classe
+def reliability_bins(probs, n_bins=10):
+    p = _probability_matrix(probs).ravel()
+    observed = np.zeros((len(probs), len(OUTCOMES)))
+    observed[np.arange(len(probs)), probs['outcome'].to_numpy()] = 1
+    observed = observed.ravel()
+
+    bins = np.minimum((p * n_bins).astype(int), n_bins - 1)
+    count = np.bincount(bins, minlength=n_bins)
+    predicted = np.bincount(bins, weights=p, minlength=n_bins)
+    hits = np.bincount(bins, weights=observed, minlength=n_bins)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table = pd.DataFrame({
+            'bin_start': np.arange(n_bins) / n_bins,
+            'bin_end': np.arange(1, n_bins + 1) / n_bins,
+            'count': count,
+            'predicted': predicted / count,
+            'observed': hits / count,
+        })
+    return table[table['count'] > 0].reset_index(drop=True)
+
+
+# Marge moyenne du bookmaker par mois et par championnat
+def margin_over_time(probs, freq='M'):
+    dates = pd.to_datetime(probs['date'], utc=True).dt.tz_localize(None)
+    return (
+        probs.assign(period=dates.dt.to_period(freq).dt.to_timestamp())
+        .groupby(['championship', 'period'], observed=True)['margin']
+        .mean()
+        .reset_index()
+    )
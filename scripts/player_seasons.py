@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from events import HIGHLIGHT_TYPES
+from storage import PLAYER_SEASONS_TABLE_NAMES, has_parquet, read_table
+
+# Agrégats par (joueur, club, championnat, saison) calculés à l'ingestion et sauvegardés dans
+# player_seasons.csv : matchs joués, minutes, buts, cartons, note moyenne (final_mark_2015).
+# Le club vient de la feuille de match ; un événement (but, carton) d'un joueur absent de la
+# feuille de match est compté avec un club manquant.
+
+PLAYER_SEASON_KEYS = ['playerid', 'team_id', 'championship', 'season']
+PLAYER_SEASON_COLUMNS = PLAYER_SEASON_KEYS + ['appearances', 'minutes', 'goals', 'yellow_cards', 'red_cards',
+                                              'mean_mark']
+COUNT_COLUMNS = ['appearances', 'minutes', 'goals', 'yellow_cards', 'red_cards']
+
+# Types de highlights comptés dans chaque colonne : mêmes catégories que events.py
+EVENT_TYPES = {
+    'goals': HIGHLIGHT_TYPES['goal'],
+    'yellow_cards': HIGHLIGHT_TYPES['yellow'],
+    'red_cards': HIGHLIGHT_TYPES['red'],
+}
+
+
+# matches_df doit contenir la saison (voir import_data.with_seasons)
+def compute_player_seasons(matches_df, match_players_df, highlights_df):
+    matches = matches_df[['matchid', 'championship', 'season']]
+
+    # Feuilles de match : une ligne par joueur et par match
+    sheets = match_players_df[['matchid', 'playerid', 'team_id', 'play_duration', 'final_mark_2015']]
+    sheets = sheets.dropna(subset=['playerid']).merge(matches, on='matchid')
+    minutes = pd.to_numeric(sheets['play_duration'], errors='coerce').fillna(0).to_numpy()
+    marks = pd.to_numeric(sheets['final_mark_2015'], errors='coerce').to_numpy(dtype=np.float64)
+    sheet_rows = sheets[PLAYER_SEASON_KEYS].assign(
+        appearances=(minutes > 0).astype(np.int32),
+        minutes=minutes.astype(np.int32),
+        mark_sum=np.nan_to_num(marks),
+        mark_count=np.isfinite(marks).astype(np.int32),
+    )
+
+    # Événements, rattachés au club du joueur sur la feuille de match
+    events = (
+        highlights_df[['matchid', 'playerid', 'type']]
+        .dropna(subset=['playerid'])
+        .merge(matches, on='matchid')
+        .merge(sheets[['matchid', 'playerid', 'team_id']].drop_duplicates(['matchid', 'playerid']),
+               on=['matchid', 'playerid'], how='left')
+    )
+    event_type = events['type'].astype(str)
+    event_rows = events[PLAYER_SEASON_KEYS].assign(**{
+        column: event_type.isin(types).to_numpy().astype(np.int32) for column, types in EVENT_TYPES.items()
+    })
+
+    table = (
+        pd.concat([sheet_rows, event_rows], ignore_index=True)
+        .groupby(PLAYER_SEASON_KEYS, observed=True, dropna=False)
+        .sum()
+        .reset_index()
+    )
+    table[COUNT_COLUMNS] = table[COUNT_COLUMNS].fillna(0).astype(np.int32)
+    table['mean_mark'] = table['mark_sum'] / table['mark_count'].where(table['mark_count'] > 0)
+    table = table.sort_values(['playerid', 'championship', 'season', 'team_id'], kind='stable')
+    return table[PLAYER_SEASON_COLUMNS].reset_index(drop=True)
+
+
+# player_seasons.csv (ou .parquet à jour) s'il existe, sinon None
+def load_player_seasons(directory='./csv_output', storage_format='csv'):
+    if storage_format == 'parquet' and has_parquet(directory, PLAYER_SEASONS_TABLE_NAMES):
+        return read_table('player_seasons', directory=directory)
+    path = os.path.join(directory, 'player_seasons.csv')
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path)
+
+
+# Types compacts : mêmes conventions que normalize_tables (clés au type de KEY_DTYPES, club nullable)
+def normalize_player_seasons(player_seasons):
+    # Import local : import_data importe ce module
+    from import_data import KEY_DTYPES, key_integer
+
+    player_seasons = player_seasons.copy()
+    player_seasons['playerid'] = key_integer(player_seasons['playerid'], KEY_DTYPES['playerid'])
+    player_seasons['team_id'] = player_seasons['team_id'].astype(KEY_DTYPES['team_id'].capitalize())
+    player_seasons['championship'] = player_seasons['championship'].astype('Int8')
+    player_seasons['season'] = player_seasons['season'].astype('category')
+    player_seasons[COUNT_COLUMNS] = player_seasons[COUNT_COLUMNS].astype(np.int32)
+    player_seasons['mean_mark'] = player_seasons['mean_mark'].astype('float32')
+    return player_seasons
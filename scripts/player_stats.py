@@ -0,0 +1,82 @@
+import os
+
+import pandas as pd
+
+from storage import STATS_TABLE_NAMES, has_parquet, read_table
+
+# Stats individuelles par match au format long : (matchid, playerid, stat_id, value),
+# avec un dictionnaire des stats (stat_id -> nom) au lieu d'une colonne par stat.
+
+STATS_COLUMNS = ['matchid', 'playerid', 'stat', 'value']
+
+
+# Remplace le nom de la stat par un identifiant entier (dictionnaire trié par nom)
+def intern_stats(stats_df):
+    if stats_df.empty:
+        return (pd.DataFrame(columns=['matchid', 'playerid', 'stat_id', 'value']),
+                pd.DataFrame(columns=['stat_id', 'stat']))
+
+    stats = stats_df['stat'].astype(str).astype('category')
+    stat_dict = pd.DataFrame({'stat_id': range(len(stats.cat.categories)), 'stat': stats.cat.categories})
+    stats_long = pd.DataFrame({
+        'matchid': stats_df['matchid'].values,
+        'playerid': stats_df['playerid'].values,
+        'stat_id': stats.cat.codes.values.astype('int16'),
+        'value': pd.to_numeric(stats_df['value'], errors='coerce').values,
+    })
+    return stats_long.dropna(subset=['value']).reset_index(drop=True), stat_dict
+
+
+# Retour aux noms de stats (utilisé pour fusionner des tables internées séparément)
+def stats_with_names(stats_long, stat_dict):
+    names = stat_dict.set_index('stat_id')['stat']
+    return pd.DataFrame({
+        'matchid': stats_long['matchid'].values,
+        'playerid': stats_long['playerid'].values,
+        'stat': stats_long['stat_id'].map(names).values,
+        'value': stats_long['value'].values,
+    })
+
+
+def load_player_stats(directory='./csv_output', storage_format='csv'):
+    if storage_format == 'parquet' and has_parquet(directory, STATS_TABLE_NAMES):
+        return tuple(read_table(name, directory=directory) for name in STATS_TABLE_NAMES)
+    stats_long = pd.read_csv(os.path.join(directory, 'match_player_stats.csv'))
+    stat_dict = pd.read_csv(os.path.join(directory, 'stat_dict.csv'))
+    return stats_long, stat_dict
+
+
+def has_player_stats(directory='./csv_output'):
+    return all(os.path.exists(os.path.join(directory, name)) for name in ('match_player_stats.csv', 'stat_dict.csv'))
+
+
+# Types compacts : mêmes conventions que normalize_tables (clés au type de KEY_DTYPES)
+def normalize_player_stats(stats_long):
+    # Import local : import_data importe ce module
+    from import_data import KEY_DTYPES, key_integer, matchid_to_int
+
+    stats_long = stats_long.copy()
+    stats_long['matchid'] = matchid_to_int(stats_long['matchid'])
+    stats_long['playerid'] = key_integer(stats_long['playerid'], KEY_DTYPES['playerid'])
+    stats_long['stat_id'] = stats_long['stat_id'].astype('int16')
+    stats_long['value'] = stats_long['value'].astype('float32')
+    return stats_long
+
+
+# Tableau large (une colonne par stat) limité aux stats demandées.
+# match_players_df : si fourni, les stats sont ajoutées à ses lignes (jointure gauche).
+def pivot_stats(stats_long, stat_dict, stats, match_players_df=None):
+    wanted = stat_dict[stat_dict['stat'].isin(stats)]
+    subset = stats_long[stats_long['stat_id'].isin(wanted['stat_id'])]
+    wide = (
+        subset
+        .pivot_table(index=['matchid', 'playerid'], columns='stat_id', values='value', aggfunc='first')
+        .rename(columns=wanted.set_index('stat_id')['stat'])
+        .reindex(columns=stats)
+        .reset_index()
+    )
+    wide.columns.name = None
+
+    if match_players_df is None:
+        return wide
+    return match_players_df.merge(wide, on=['matchid', 'playerid'], how='left')
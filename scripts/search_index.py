@@ -0,0 +1,148 @@
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Recherche de noms (joueurs, clubs) : noms normalisés (minuscules, accents retirés, ponctuation
+# remplacée par des espaces), triés pour la recherche par préfixe (bisect) sur le nom complet et
+# sur chacun de ses mots, et index de trigrammes pour la recherche approchée (fautes de frappe).
+
+COMBINING = '[\u0300-\u036f]'
+SEPARATORS = r'[\W_]+'
+
+# Score des candidats : nom identique, nom commençant par la recherche, mot commençant par la
+# recherche ; recherche approchée : similarité de Jaccard des trigrammes (< 1)
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+WORD_PREFIX_SCORE = 1.5
+# Nombre maximal de noms examinés pour un préfixe très court ('a')
+MAX_PREFIX_ENTRIES = 100
+
+
+def fold(text):
+    text = re.sub(COMBINING, '', unicodedata.normalize('NFKD', str(text))).lower()
+    return re.sub(SEPARATORS, ' ', text).strip()
+
+
+def fold_series(names):
+    return (
+        names.astype(str)
+        .str.normalize('NFKD')
+        .str.replace(COMBINING, '', regex=True)
+        .str.lower()
+        .str.replace(SEPARATORS, ' ', regex=True)
+        .str.strip()
+    )
+
+
+# Trigrammes codés en entiers : trois points de code (21 bits chacun) dans un entier 64 bits
+def trigram_code(gram):
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {trigram_code(padded[i:i + 3]) for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    def __init__(self, ids, names):
+        names = pd.Series(names).astype(str).reset_index(drop=True)
+        self._ids = np.asarray(ids)
+        self._names = names.to_numpy()
+        folded = fold_series(names)
+
+        # Entrées triées : nom complet et chacun de ses mots, vers la ligne du nom
+        words = folded.str.split(' ').explode()
+        entries = pd.concat([
+            pd.DataFrame({'key': folded.to_numpy(), 'row': np.arange(len(folded)), 'full': True}),
+            pd.DataFrame({'key': words.to_numpy(), 'row': words.index.to_numpy(), 'full': False}),
+        ], ignore_index=True)
+        entries = entries[entries['key'] != ''].drop_duplicates(['key', 'row'])
+        entries = entries.sort_values(['key', 'row'], kind='stable')
+        self._keys = entries['key'].tolist()
+        self._entry_rows = entries['row'].to_numpy()
+        self._entry_full = entries['full'].to_numpy()
+        self._entry_scores = np.where(self._entry_full, PREFIX_SCORE, WORD_PREFIX_SCORE)
+
+        # Départage des candidats de même score : longueur du nom puis rang alphabétique
+        self._name_lengths = names.str.len().to_numpy()
+        self._name_ranks = np.empty(len(names), dtype=np.int64)
+        self._name_ranks[np.argsort(self._names.astype(str), kind='stable')] = np.arange(len(names))
+
+        # Trigrammes des noms complets, calculés sur la matrice des points de code (une ligne par nom) :
+        # lignes de chaque trigramme (plage de _gram_rows), triées par code puis ligne, sans doublon
+        padded = np.array(('  ' + folded + ' ').tolist() or [''])
+        lengths = np.char.str_len(padded)
+        points = padded.view(np.uint32).reshape(len(padded), -1).astype(np.uint64)
+        codes = (points[:, :-2] << np.uint64(42)) | (points[:, 1:-1] << np.uint64(21)) | points[:, 2:]
+        valid = np.arange(codes.shape[1])[None, :] < (lengths - 2)[:, None]
+        rows = np.broadcast_to(np.arange(len(padded))[:, None], codes.shape)[valid]
+        codes = codes[valid]
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        keep = np.r_[True, (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])] if len(codes) else []
+        codes, rows = codes[keep], rows[keep]
+
+        unique, starts, counts = np.unique(codes, return_index=True, return_counts=True)
+        self._gram_rows = rows.astype(np.int32)
+        self._gram_index = dict(zip(unique.tolist(), zip(starts.tolist(), (starts + counts).tolist())))
+        self._gram_counts = np.bincount(self._gram_rows, minlength=len(folded))
+
+    def __len__(self):
+        return len(self._ids)
+
+    # Noms dont le nom complet ou l'un des mots commence par la recherche : lignes et meilleur score
+    # de chaque ligne, lus sur la plage d'entrées (les entrées égales à la recherche sont en tête)
+    def _prefix_rows(self, key):
+        start = bisect.bisect_left(self._keys, key)
+        stop = bisect.bisect_left(self._keys, key + '\U0010ffff', lo=start)
+        stop = min(stop, start + MAX_PREFIX_ENTRIES)
+        exact = bisect.bisect_right(self._keys, key, lo=start, hi=stop)
+        scores = self._entry_scores[start:stop].copy()
+        scores[:exact - start][self._entry_full[start:exact]] = EXACT_SCORE
+        rows, inverse = np.unique(self._entry_rows[start:stop], return_inverse=True)
+        best = np.zeros(len(rows))
+        np.maximum.at(best, inverse, scores)
+        return rows, best
+
+    # Noms les plus proches par trigrammes communs : lignes et similarité
+    def _fuzzy_rows(self, key, limit):
+        grams = trigrams(key)
+        postings = [self._gram_rows[slice(*self._gram_index[g])] for g in grams if g in self._gram_index]
+        if not postings:
+            return np.array([], dtype=np.int64), np.array([])
+        # Lignes et nombre de trigrammes communs (longueur des séries de la liste fusionnée triée) : coût
+        # proportionnel aux listes lues, pas au nombre de noms
+        merged = np.sort(np.concatenate(postings))
+        starts = np.flatnonzero(np.r_[True, merged[1:] != merged[:-1]])
+        rows, common = merged[starts], np.diff(np.r_[starts, len(merged)])
+        similarity = common / (len(grams) + self._gram_counts[rows] - common)
+        if len(rows) > limit:
+            best = np.argpartition(-similarity, limit)[:limit]
+            rows, similarity = rows[best], similarity[best]
+        return rows, similarity
+
+    # Lignes et scores classés : noms identiques ou commençant par la recherche, et seulement s'il n'y
+    # en a aucun, recherche approchée ; à score égal, le nom le plus court puis l'ordre alphabétique
+    def _ranked(self, query, limit, fuzzy):
+        key = fold(query)
+        if not key:
+            return np.array([], dtype=np.int64), np.array([])
+        rows, scores = self._prefix_rows(key)
+        if fuzzy and not len(rows):
+            rows, scores = self._fuzzy_rows(key, limit)
+        order = np.lexsort((self._name_ranks[rows], self._name_lengths[rows], -scores))[:limit]
+        return rows[order], scores[order]
+
+    # Candidats classés (id, nom, score)
+    def search(self, query, limit=10, fuzzy=True):
+        rows, scores = self._ranked(query, limit, fuzzy)
+        return pd.DataFrame({'id': self._ids[rows], 'name': self._names[rows], 'score': scores})
+
+    # Meilleur candidat par préfixe (nom ou mot), None si aucun ; sans passer par un DataFrame
+    def find(self, query):
+        rows, _ = self._ranked(query, 1, fuzzy=False)
+        return self._ids[rows[0]] if len(rows) else None
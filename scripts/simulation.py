@@ -0,0 +1,137 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Simulation Monte-Carlo d'une saison à partir des cotes d'avant-match : chaque match est tiré
+# selon les probabilités implicites (marge retirée), par lots de saisons en tableaux NumPy.
+# Départage des égalités de points au hasard (les scores ne sont pas simulés).
+
+HOME_POINTS = np.array([3, 1, 0], dtype=np.float32)
+AWAY_POINTS = np.array([0, 1, 3], dtype=np.float32)
+BATCH_SIZE = 10000
+
+
+# Probabilités domicile/nul/extérieur de chaque match ; cote absente ou égale à 1 :
+# fréquences observées du championnat à la place
+def outcome_probabilities(matches_df):
+    odds = matches_df[['quotation_home', 'quotation_draw', 'quotation_away']].to_numpy(dtype=np.float64)
+    valid = (np.isfinite(odds) & (odds > 1)).all(axis=1)
+    probs = np.empty_like(odds)
+    raw = 1 / odds[valid]
+    probs[valid] = raw / raw.sum(axis=1, keepdims=True)
+
+    if not valid.all():
+        home = matches_df['home_score'].to_numpy(dtype=np.float64)
+        away = matches_df['away_score'].to_numpy(dtype=np.float64)
+        played = np.isfinite(home) & np.isfinite(away)
+        if played.any():
+            base = np.array([(home > away)[played].mean(), (home == away)[played].mean(),
+                             (home < away)[played].mean()])
+        else:
+            base = np.full(3, 1 / 3)
+        probs[~valid] = base
+    return probs
+
+
+# Un lot de saisons : nombre de fois où chaque équipe finit à chaque place et avec chaque total de points
+def simulate_batch(cum_probs, home_idx, away_idx, n_teams, n_sims, seed):
+    rng = np.random.default_rng(seed)
+    n_matches = len(home_idx)
+
+    # Matrices d'incidence match -> équipe (domicile / extérieur)
+    home_matrix = np.zeros((n_matches, n_teams), dtype=np.float32)
+    home_matrix[np.arange(n_matches), home_idx] = 1
+    away_matrix = np.zeros((n_matches, n_teams), dtype=np.float32)
+    away_matrix[np.arange(n_matches), away_idx] = 1
+
+    # Issue de chaque match : 0 = domicile, 1 = nul, 2 = extérieur
+    u = rng.random((n_sims, n_matches), dtype=np.float32)
+    outcome = (u >= cum_probs[:, 0]).astype(np.int8) + (u >= cum_probs[:, 1])
+    points = HOME_POINTS[outcome] @ home_matrix + AWAY_POINTS[outcome] @ away_matrix
+    points = np.rint(points).astype(np.int32)
+
+    # Classement : points, puis tirage au sort entre équipes à égalité
+    order = np.argsort(-(points + rng.random((n_sims, n_teams), dtype=np.float32) * 0.5), axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n_teams)[None, :], axis=1)
+
+    max_points = int(3 * max(np.bincount(home_idx, minlength=n_teams) + np.bincount(away_idx, minlength=n_teams)))
+    teams = np.arange(n_teams)[None, :]
+    position_counts = np.bincount((teams * n_teams + positions).ravel(), minlength=n_teams * n_teams)
+    points_counts = np.bincount((teams * (max_points + 1) + points).ravel(), minlength=n_teams * (max_points + 1))
+    return position_counts.reshape(n_teams, n_teams), points_counts.reshape(n_teams, max_points + 1)
+
+
+def _simulate_batch(args):
+    return simulate_batch(*args)
+
+
+# Simulation de n_sims saisons d'un championnat (matches_df : les matchs d'une saison).
+# workers > 1 : lots répartis sur plusieurs processus (None : autant que de coeurs).
+# Les graines des lots sont dérivées de seed : résultat identique quel que soit workers.
+def simulate_season(matches_df, n_sims=10000, seed=0, workers=1, batch_size=BATCH_SIZE):
+    team_ids, codes = np.unique(
+        np.concatenate([matches_df['home_idteam'].to_numpy(), matches_df['away_idteam'].to_numpy()]),
+        return_inverse=True,
+    )
+    n_matches, n_teams = len(matches_df), len(team_ids)
+    home_idx, away_idx = codes[:n_matches], codes[n_matches:]
+    cum_probs = np.cumsum(outcome_probabilities(matches_df), axis=1)[:, :2].astype(np.float32)
+
+    sizes = [min(batch_size, n_sims - start) for start in range(0, n_sims, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(cum_probs, home_idx, away_idx, n_teams, size, s) for size, s in zip(sizes, seeds)]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_simulate_batch, tasks))
+    else:
+        results = [simulate_batch(*task) for task in tasks]
+
+    position_counts = sum(r[0] for r in results)
+    points_counts = sum(r[1] for r in results)
+    return team_ids, position_counts, points_counts
+
+
+# Synthèse par équipe : points moyens et intervalle 5-95 %, probabilités de titre et de relégation,
+# probabilité de chaque place (colonnes 1..n)
+def simulation_summary(team_ids, position_counts, points_counts, relegated=3):
+    n_sims = position_counts[0].sum()
+    position_probs = position_counts / n_sims
+    points_values = np.arange(points_counts.shape[1])
+    points_cdf = np.cumsum(points_counts, axis=1) / n_sims
+
+    summary = pd.DataFrame({
+        'team_id': team_ids,
+        'mean_points': (points_counts * points_values).sum(axis=1) / n_sims,
+        'points_p5': (points_cdf < 0.05).sum(axis=1),
+        'points_p95': (points_cdf < 0.95).sum(axis=1),
+        'mean_position': (position_probs * np.arange(1, len(team_ids) + 1)).sum(axis=1),
+        'p_title': position_probs[:, 0],
+        'p_relegation': position_probs[:, -relegated:].sum(axis=1) if relegated else 0.0,
+    })
+    positions = pd.DataFrame(position_probs, columns=np.arange(1, len(team_ids) + 1))
+    positions.insert(0, 'team_id', team_ids)
+    return summary.sort_values('mean_position').reset_index(drop=True), positions
+
+
+# Probabilité, pour chaque équipe, de finir à sa place réelle et avec au moins ses points réels
+def actual_table_likelihood(team_ids, position_counts, points_counts, table):
+    n_sims = position_counts[0].sum()
+    index = {tid: i for i, tid in enumerate(team_ids)}
+    rows = table[table['team_id'].isin(index)]
+    team_idx = rows['team_id'].map(index).to_numpy()
+    rank = rows['rank'].to_numpy() - 1
+    points = np.minimum(rows['points'].to_numpy(), points_counts.shape[1] - 1)
+    at_least = np.cumsum(points_counts[:, ::-1], axis=1)[:, ::-1] / n_sims
+    return pd.DataFrame({
+        'team_id': rows['team_id'].to_numpy(),
+        'rank': rows['rank'].to_numpy(),
+        'points': rows['points'].to_numpy(),
+        'p_rank': position_counts[team_idx, rank] / n_sims,
+        'p_points_or_more': at_least[team_idx, points],
+    })
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+# Passages en club (transfers.csv : joueur, club, début, fin incluse) rangés deux fois : par joueur et
+# par club (identifiant, le nom ne sert qu'à l'affichage), triés par date de début. Les passages d'un joueur ou d'un club forment une plage de lignes,
+# les dates sont cherchées par dichotomie dans ces plages. Les passages d'un même joueur ne se
+# chevauchent pas (un passage se termine la veille du suivant).
+
+SPELL_COLUMNS = ['playerid', 'player_name', 'team_id', 'team', 'start_date', 'end_date']
+MOVE_COLUMNS = ['playerid', 'player_name', 'from_team_id', 'from_team', 'to_team_id', 'to_team', 'date']
+
+
+# Date (date, texte ou Timestamp) ramenée au jour
+def to_day(date):
+    return np.datetime64(pd.Timestamp(date).date(), 'D')
+
+
+def _days(dates):
+    return pd.to_datetime(dates, utc=True).dt.tz_localize(None).to_numpy().astype('datetime64[D]')
+
+
+class SpellIndex:
+    def __init__(self, transfers_df):
+        spells = transfers_df[SPELL_COLUMNS].dropna(subset=['playerid', 'team', 'start_date', 'end_date'])
+        spells = spells.assign(team=spells['team'].astype(str))
+
+        # Par joueur : plage de lignes lue par dichotomie sur les identifiants triés
+        self._by_player = spells.sort_values(['playerid', 'start_date'], kind='stable').reset_index(drop=True)
+        self._players = self._by_player['playerid'].to_numpy()
+        self._player_starts = _days(self._by_player['start_date'])
+        self._player_ends = _days(self._by_player['end_date'])
+
+        # Par club : {identifiant du club: (début, fin)} vers les lignes triées par date de début (passages
+        # sans identifiant de club ignorés)
+        by_team = spells.dropna(subset=['team_id'])
+        self._by_team = by_team.sort_values(['team_id', 'start_date'], kind='stable').reset_index(drop=True)
+        self._team_starts = _days(self._by_team['start_date'])
+        self._team_ends = _days(self._by_team['end_date'])
+        self._team_index = {int(team): (int(rows[0]), int(rows[-1]) + 1)
+                            for team, rows in self._by_team.groupby('team_id').indices.items()}
+
+        # Mouvements : deux passages consécutifs d'un même joueur, datés du début du second,
+        # rangés par (club quitté, club rejoint, date)
+        spells = self._by_player
+        same_player = spells['playerid'].to_numpy()[1:] == spells['playerid'].to_numpy()[:-1]
+        before, after = spells.iloc[:-1][same_player], spells.iloc[1:][same_player]
+        self._moves = pd.DataFrame({
+            'playerid': after['playerid'].to_numpy(),
+            'player_name': after['player_name'].to_numpy(),
+            'from_team_id': before['team_id'].to_numpy(),
+            'from_team': before['team'].to_numpy(),
+            'to_team_id': after['team_id'].to_numpy(),
+            'to_team': after['team'].to_numpy(),
+            'date': after['start_date'].to_numpy(),
+        }, columns=MOVE_COLUMNS)
+        self._moves = self._moves.sort_values(['from_team_id', 'to_team_id', 'date'],
+                                              kind='stable').reset_index(drop=True)
+        self._move_days = _days(self._moves['date']) if len(self._moves) else np.array([], dtype='datetime64[D]')
+        self._move_index = {(int(a), int(b)): (int(rows[0]), int(rows[-1]) + 1)
+                            for (a, b), rows in self._moves.groupby(['from_team_id', 'to_team_id']).indices.items()}
+
+    def _player_range(self, player_id):
+        return (int(np.searchsorted(self._players, player_id, side='left')),
+                int(np.searchsorted(self._players, player_id, side='right')))
+
+    # Passages d'un joueur, du plus ancien au plus récent
+    def player(self, player_id):
+        start, stop = self._player_range(player_id)
+        return self._by_player.iloc[start:stop].copy(deep=False)
+
+    # Passage du joueur en cours à la date (Series), None s'il n'avait pas de club
+    def club_at(self, player_id, date):
+        start, stop = self._player_range(player_id)
+        day = to_day(date)
+        row = start + int(np.searchsorted(self._player_starts[start:stop], day, side='right')) - 1
+        if row < start or self._player_ends[row] < day:
+            return None
+        return self._by_player.iloc[row]
+
+    # Passages au club (identifiant) qui recouvrent [start, end] (bornes incluses, None : pas de limite)
+    def team(self, team_id, start=None, end=None):
+        lo, hi = self._team_index.get(int(team_id), (0, 0))
+        if end is not None:
+            hi = lo + int(np.searchsorted(self._team_starts[lo:hi], to_day(end), side='right'))
+        rows = np.arange(lo, hi)
+        if start is not None:
+            rows = rows[self._team_ends[lo:hi] >= to_day(start)]
+        return self._by_team.iloc[rows].copy(deep=False)
+
+    # Effectif du club à une date : joueurs dont un passage au club contient la date
+    def squad_at(self, team_id, date):
+        return self.team(team_id, date, date)
+
+    # Joueurs passés directement d'un club à l'autre (dans les deux sens) entre start et end inclus
+    def moves(self, team_a, team_b, start=None, end=None):
+        parts = []
+        for pair in ((int(team_a), int(team_b)), (int(team_b), int(team_a))):
+            lo, hi = self._move_index.get(pair, (0, 0))
+            days = self._move_days[lo:hi]
+            first = lo + (int(np.searchsorted(days, to_day(start), side='left')) if start is not None else 0)
+            last = lo + (int(np.searchsorted(days, to_day(end), side='right')) if end is not None else hi - lo)
+            parts.append(self._moves.iloc[first:last])
+        return pd.concat(parts).sort_values('date', kind='stable').reset_index(drop=True)
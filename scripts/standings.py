@@ -0,0 +1,117 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from team_view import played
+
+# Classements (V/N/D, buts, points) de tous les championnats et de toutes les saisons
+# en une seule passe vectorisée : une ligne par (championnat, saison, équipe).
+
+POINTS = {'win': 3, 'draw': 1}
+
+STANDINGS_COLUMNS = ['championship', 'season', 'rank', 'team_id', 'played', 'wins', 'draws', 'losses',
+                     'goals_for', 'goals_against', 'goal_diff', 'points', 'win_ratio']
+# Totaux additifs, cumulés match après match
+COUNT_COLUMNS = ['played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against']
+
+
+# Bilan de chaque ligne club/match jouée de la vue team_view (1 victoire, nul ou défaite)
+def team_results(view):
+    view = played(view)
+    outcome = view['result'].to_numpy(dtype=np.int8)
+    results = view[['championship', 'season', 'date', 'team_id']].copy()
+    results['played'] = np.ones(len(view), dtype=np.int32)
+    results['wins'] = (outcome == 1).astype(np.int32)
+    results['draws'] = (outcome == 0).astype(np.int32)
+    results['losses'] = (outcome == -1).astype(np.int32)
+    results['goals_for'] = view['goals_for'].to_numpy(dtype=np.int32)
+    results['goals_against'] = view['goals_against'].to_numpy(dtype=np.int32)
+    return results
+
+
+# Points, différence de buts et rang à partir des totaux (played, wins, ...) de chaque équipe
+def rank_standings(standings, team_names=None):
+    standings = standings.copy()
+    standings['goal_diff'] = standings['goals_for'] - standings['goals_against']
+    standings['points'] = standings['wins'] * POINTS['win'] + standings['draws'] * POINTS['draw']
+    standings['win_ratio'] = standings['wins'] / standings['played'].where(standings['played'] > 0)
+
+    # Ordre du classement : points, différence de buts, buts marqués
+    standings = standings.sort_values(
+        ['championship', 'season', 'points', 'goal_diff', 'goals_for'],
+        ascending=[True, True, False, False, False],
+        kind='stable',
+    ).reset_index(drop=True)
+    standings['rank'] = standings.groupby(['championship', 'season'], observed=True).cumcount() + 1
+    standings = standings[STANDINGS_COLUMNS]
+
+    if team_names is not None:
+        standings.insert(standings.columns.get_loc('team_id') + 1, 'team', standings['team_id'].map(team_names))
+    return standings
+
+
+# Classements de tous les (championnat, saison) présents dans la vue team_view.
+# team_names : série idteam -> nom, ajoute une colonne 'team'.
+def compute_standings(view, team_names=None):
+    standings = (
+        team_results(view)
+        .groupby(['championship', 'season', 'team_id'], observed=True)[COUNT_COLUMNS]
+        .sum()
+        .reset_index()
+    )
+    return rank_standings(standings, team_names)
+
+
+# Classement d'un championnat pour une saison
+def league_table(standings, championship, season):
+    table = standings[(standings['championship'] == championship) & (standings['season'] == season)]
+    return table.reset_index(drop=True)
+
+
+# Classements à n'importe quelle date : pour chaque (championnat, saison) et chaque équipe, bilan cumulé
+# après chacun de ses matchs (lignes triées par date). Le classement à une date se lit par une
+# recherche dichotomique par équipe, sans recalcul.
+class CumulativeStandings:
+    def __init__(self, view):
+        keys = ['championship', 'season', 'team_id']
+        results = team_results(view).sort_values(keys + ['date'], kind='stable').reset_index(drop=True)
+        cumulative = results.groupby(keys, observed=True)[COUNT_COLUMNS].cumsum()
+
+        self._dates = results['date'].to_numpy(dtype='datetime64[ns]')
+        self._counts = cumulative.to_numpy(dtype=np.int32)
+        self._offsets = {}
+        for (championship, season, team_id), rows in results.groupby(keys, observed=True).indices.items():
+            self._offsets.setdefault((championship, season), {})[team_id] = (int(rows[0]), int(rows[-1]) + 1)
+
+        # Jours de match de chaque saison
+        days = results['date'].dt.tz_convert(None).dt.normalize().to_numpy()
+        self._calendar = {key: np.unique(days[rows])
+                          for key, rows in results.groupby(keys[:2], observed=True).indices.items()}
+
+    def matchdays(self, championship, season):
+        return [pd.Timestamp(d).date() for d in self._calendar.get((championship, season), [])]
+
+    # Classement d'un championnat et d'une saison après les matchs joués jusqu'à la date :
+    # un jour (datetime.date) inclut tous ses matchs, un instant (Timestamp) les matchs commencés avant
+    def table_at(self, championship, season, date, team_names=None):
+        if isinstance(date, datetime.date) and not isinstance(date, datetime.datetime):
+            date = pd.Timestamp(date) + pd.Timedelta(days=1) - pd.Timedelta(nanoseconds=1)
+        date = pd.Timestamp(date)
+        if date.tzinfo is not None:
+            date = date.tz_convert(None)
+        date = np.datetime64(date, 'ns')
+
+        teams = self._offsets.get((championship, season), {})
+        counts = np.zeros((len(teams), len(COUNT_COLUMNS)), dtype=np.int32)
+        for i, (start, stop) in enumerate(teams.values()):
+            pos = np.searchsorted(self._dates[start:stop], date, side='right')
+            if pos:
+                counts[i] = self._counts[start + pos - 1]
+
+        table = pd.DataFrame(counts, columns=COUNT_COLUMNS)
+        table.insert(0, 'team_id', list(teams))
+        table.insert(0, 'season', season)
+        table.insert(0, 'championship', championship)
+        return rank_standings(table, team_names)
+
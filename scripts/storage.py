@@ -0,0 +1,181 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Stockage en colonnes (Parquet) avec un schéma explicite par table,
+# alternative aux CSV de csv_output (types conservés, lecture par colonnes).
+
+TABLE_NAMES = ['teams', 'players', 'matches', 'highlights', 'substitutions', 'match_players', 'transfers']
+# Stats individuelles au format long (voir player_stats)
+STATS_TABLE_NAMES = ['match_player_stats', 'stat_dict']
+# Agrégats joueur/saison calculés à l'ingestion (voir player_seasons)
+PLAYER_SEASONS_TABLE_NAMES = ['player_seasons']
+
+SCHEMAS = {
+    'teams': pa.schema([
+        ('idteam', pa.int16()),
+        ('name', pa.string()),
+    ]),
+    'players': pa.schema([
+        ('playerid', pa.int32()),
+        ('lastname', pa.string()),
+    ]),
+    'matches': pa.schema([
+        ('matchid', pa.string()),
+        ('date', pa.timestamp('s', tz='UTC')),
+        ('home_idteam', pa.int16()),
+        ('away_idteam', pa.int16()),
+        ('duration', pa.int16()),
+        ('period', pa.string()),
+        ('championship', pa.int8()),
+        ('season', pa.string()),
+        ('home_formation', pa.string()),
+        ('away_formation', pa.string()),
+        ('quotation_home', pa.float64()),
+        ('quotation_away', pa.float64()),
+        ('quotation_draw', pa.float64()),
+        ('home_score', pa.int8()),
+        ('away_score', pa.int8()),
+    ]),
+    'highlights': pa.schema([
+        ('matchid', pa.string()),
+        ('time', pa.string()),
+        ('playerid', pa.int32()),
+        ('type', pa.string()),
+        ('side', pa.string()),
+    ]),
+    'substitutions': pa.schema([
+        ('matchid', pa.string()),
+        ('time', pa.string()),
+        ('off_playerid', pa.int32()),
+        ('on_playerid', pa.int32()),
+        ('reason', pa.string()),
+        ('side', pa.string()),
+    ]),
+    'match_players': pa.schema([
+        ('playerid', pa.int32()),
+        ('matchid', pa.string()),
+        ('team_id', pa.int16()),
+        ('position', pa.string()),
+        ('formation_place', pa.int8()),
+        ('play_duration', pa.int16()),
+        ('final_mark_2015', pa.float64()),
+        ('quotation_player', pa.float64()),
+    ]),
+    'match_player_stats': pa.schema([
+        ('matchid', pa.string()),
+        ('playerid', pa.int32()),
+        ('stat_id', pa.int16()),
+        ('value', pa.float32()),
+    ]),
+    'stat_dict': pa.schema([
+        ('stat_id', pa.int16()),
+        ('stat', pa.string()),
+    ]),
+    'player_seasons': pa.schema([
+        ('playerid', pa.int32()),
+        ('team_id', pa.int16()),
+        ('championship', pa.int8()),
+        ('season', pa.string()),
+        ('appearances', pa.int32()),
+        ('minutes', pa.int32()),
+        ('goals', pa.int32()),
+        ('yellow_cards', pa.int32()),
+        ('red_cards', pa.int32()),
+        ('mean_mark', pa.float32()),
+    ]),
+    'transfers': pa.schema([
+        ('playerid', pa.int32()),
+        ('player_name', pa.string()),
+        ('team_id', pa.int16()),
+        ('team', pa.string()),
+        ('start_date', pa.timestamp('s')),
+        ('end_date', pa.timestamp('s')),
+    ]),
+}
+
+
+def parquet_path(name, directory='./csv_output'):
+    return os.path.join(directory, f'{name}.parquet')
+
+
+# Texte en conservant les valeurs manquantes (433.0 lu dans un CSV redevient "433")
+def _as_strings(series):
+    def to_str(v):
+        if pd.isna(v):
+            return None
+        if isinstance(v, float) and v.is_integer():
+            return str(int(v))
+        return str(v)
+    return series.map(to_str)
+
+
+def _column_to_arrow(series, pa_type):
+    if pa.types.is_string(pa_type):
+        return pa.array(_as_strings(series), type=pa_type, from_pandas=True)
+    if pa.types.is_timestamp(pa_type):
+        return pa.array(pd.to_datetime(series, utc=pa_type.tz is not None), type=pa_type, from_pandas=True)
+    return pa.array(pd.to_numeric(series, errors='coerce'), type=pa_type, from_pandas=True)
+
+
+# Conversion d'un DataFrame vers une table Arrow conforme au schéma de la table
+def to_arrow(df, name):
+    schema = SCHEMAS[name]
+    fields, arrays = [], []
+    # Colonnes absentes du fichier (anciens CSV sans saison, côté...) non ajoutées : la normalisation
+    # au chargement les reconstruit comme pour le CSV
+    for field in schema:
+        if field.name not in df:
+            continue
+        fields.append(field)
+        arrays.append(_column_to_arrow(df[field.name], field.type))
+
+    # Colonnes hors schéma (anciens fichiers match_players avec une colonne par stat)
+    for col in df.columns:
+        if col not in schema.names:
+            fields.append(pa.field(col, pa.float64()))
+            arrays.append(_column_to_arrow(df[col], pa.float64()))
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def write_table(df, name, directory='./csv_output'):
+    pq.write_table(to_arrow(df, name), parquet_path(name, directory), compression='zstd')
+
+
+# Lecture avec projection : seules les colonnes demandées sont lues
+def read_table(name, columns=None, directory='./csv_output'):
+    return pd.read_parquet(parquet_path(name, directory), columns=columns)
+
+
+# Parquet présent et à jour (pas plus ancien que le CSV correspondant)
+def has_parquet(directory='./csv_output', names=TABLE_NAMES):
+    for name in names:
+        path = parquet_path(name, directory)
+        csv_path = os.path.join(directory, f'{name}.csv')
+        if not os.path.exists(path):
+            return False
+        if os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(path):
+            return False
+    return True
+
+
+# Conversion ponctuelle des CSV existants vers Parquet
+def convert_csv_to_parquet(directory='./csv_output'):
+    for name in TABLE_NAMES + STATS_TABLE_NAMES + PLAYER_SEASONS_TABLE_NAMES:
+        csv_path = os.path.join(directory, f'{name}.csv')
+        if not os.path.exists(csv_path):
+            print(f"{csv_path} absent, table ignorée.")
+            continue
+        # Les identifiants texte et les minutes ("90 +2") sont relus tels quels
+        df = pd.read_csv(csv_path, dtype={'matchid': str, 'time': str})
+        write_table(df, name, directory)
+        csv_size = os.path.getsize(csv_path) / 1e6
+        parquet_size = os.path.getsize(parquet_path(name, directory)) / 1e6
+        print(f"{name}: {csv_size:.2f} Mo (CSV) -> {parquet_size:.2f} Mo (Parquet)")
+
+
+if __name__ == '__main__':
+    convert_csv_to_parquet()
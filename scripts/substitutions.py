@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+from events import match_minutes
+from team_view import played
+
+# Remplacements de tous les clubs, calculés une fois : club qui effectue chaque changement (côté du
+# match), nombre de changements par club et par match (lignes de la vue club/match), résumé par club
+# et par saison, répartition des minutes et lien avec le résultat.
+
+# Tranches de minutes (temps additionnel compté dans la 45e ou la 90e minute)
+MINUTE_BINS = [0, 45, 60, 70, 80, 90]
+MINUTE_LABELS = ['1-45', '46-60', '61-70', '71-80', '81-90']
+SUMMARY_KEYS = ['team_id', 'championship', 'season']
+SUMMARY_COLUMNS = SUMMARY_KEYS + ['matches', 'substitutions', 'mean_per_match', 'mean_minute', 'mean_first_minute',
+                                  'injuries']
+
+
+# Une ligne par changement avec le championnat, la saison, le club qui l'effectue, la minute et sa tranche
+def team_substitutions(substitutions_df, matches_df):
+    subs = substitutions_df[substitutions_df['side'].isin(['home', 'away'])]
+    matches = matches_df.set_index('matchid')
+    positions = matches.index.get_indexer(subs['matchid'])
+    subs, positions = subs[positions >= 0], positions[positions >= 0]
+
+    home = (subs['side'] == 'home').to_numpy()
+    minute, added = match_minutes(subs['time'])
+    return pd.DataFrame({
+        'matchid': subs['matchid'].to_numpy(),
+        'championship': matches['championship'].to_numpy()[positions],
+        'season': matches['season'].to_numpy()[positions],
+        'team_id': np.where(home, matches['home_idteam'].to_numpy()[positions],
+                            matches['away_idteam'].to_numpy()[positions]),
+        'side': np.where(home, 'home', 'away'),
+        'minute': minute,
+        'added': added,
+        'period': pd.cut(minute, MINUTE_BINS, labels=MINUTE_LABELS),
+        'reason': subs['reason'].astype(str).to_numpy(),
+        'off_playerid': subs['off_playerid'].to_numpy(),
+        'on_playerid': subs['on_playerid'].to_numpy(),
+    })
+
+
+# Matchs joués de la vue club/match avec le nombre de changements du club (0 si aucun), la minute du
+# premier changement et la minute moyenne. Chaque changement est rattaché à sa ligne (match, club).
+def substitutions_per_match(view, team_subs):
+    view = played(view).reset_index(drop=True)
+    rows = pd.MultiIndex.from_arrays([view['matchid'], view['team_id']]).get_indexer(
+        pd.MultiIndex.from_arrays([team_subs['matchid'], team_subs['team_id']]))
+    found = rows >= 0
+    rows, minute = rows[found], team_subs['minute'].to_numpy()[found]
+    injury = (team_subs['reason'].to_numpy()[found] == 'Injury')
+
+    counts = np.bincount(rows, minlength=len(view))
+    timed = np.isfinite(minute)
+    timed_counts = np.bincount(rows[timed], minlength=len(view))
+    minute_sums = np.bincount(rows[timed], weights=minute[timed], minlength=len(view))
+    first_minute = np.full(len(view), np.inf)
+    np.minimum.at(first_minute, rows[timed], minute[timed])
+
+    return view.assign(
+        substitutions=counts.astype(np.int32),
+        injuries=np.bincount(rows[injury], minlength=len(view)).astype(np.int32),
+        minute_sum=minute_sums,
+        timed_substitutions=timed_counts,
+        first_minute=np.where(np.isfinite(first_minute), first_minute, np.nan),
+    )
+
+
+# Résumé par club, championnat et saison
+def substitution_summary(per_match):
+    summary = (
+        per_match.groupby(SUMMARY_KEYS, observed=True)
+        .agg(matches=('matchid', 'size'), substitutions=('substitutions', 'sum'), injuries=('injuries', 'sum'),
+             minute_sum=('minute_sum', 'sum'), timed_substitutions=('timed_substitutions', 'sum'),
+             mean_first_minute=('first_minute', 'mean'))
+        .reset_index()
+    )
+    summary['mean_per_match'] = summary['substitutions'] / summary['matches']
+    summary['mean_minute'] = summary['minute_sum'] / summary['timed_substitutions'].where(
+        summary['timed_substitutions'] > 0)
+    return summary[SUMMARY_COLUMNS]
+
+
+# Nombre de changements par tranche de minutes, par club (colonnes : tranches)
+def substitution_timing(team_subs):
+    return pd.crosstab(team_subs['team_id'], team_subs['period']).reindex(columns=MINUTE_LABELS, fill_value=0)
+
+
+# Changements et résultat : pour chaque nombre de changements, matchs et part de victoires, nuls et défaites
+def substitutions_by_result(per_match):
+    table = pd.crosstab(per_match['substitutions'], per_match['result'].astype(int))
+    table = table.reindex(columns=[1, 0, -1], fill_value=0)
+    shares = table.div(table.sum(axis=1), axis=0)
+    shares.insert(0, 'matches', table.sum(axis=1))
+    return shares.reset_index()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Vue « une ligne par club et par match » (domicile et extérieur), construite une fois au chargement
+# et partagée par tous les onglets (classements, paris, lieu/résultat, formations, écarts de buts).
+# Lignes triées par (club, date) : les matchs d'un club forment une plage de lignes.
+
+TEAM_VIEW_COLUMNS = ['matchid', 'date', 'championship', 'season', 'team_id', 'opponent_id', 'home',
+                     'goals_for', 'goals_against', 'result', 'formation', 'odds_team', 'odds_opponent',
+                     'odds_draw']
+
+# Code du résultat (colonne result)
+RESULTS = {1: 'Victoire', 0: 'Nul', -1: 'Défaite'}
+
+
+def _both_sides(home, away):
+    if isinstance(home.dtype, pd.CategoricalDtype) and isinstance(away.dtype, pd.CategoricalDtype):
+        return pd.Series(union_categoricals([home, away], ignore_order=True))
+    return pd.concat([home, away], ignore_index=True)
+
+
+def build_team_view(matches_df):
+    home, away = matches_df['home_idteam'], matches_df['away_idteam']
+    home_score, away_score = matches_df['home_score'], matches_df['away_score']
+
+    view = pd.DataFrame({
+        'matchid': _both_sides(matches_df['matchid'], matches_df['matchid']),
+        'date': _both_sides(matches_df['date'], matches_df['date']),
+        'championship': _both_sides(matches_df['championship'], matches_df['championship']),
+        'season': _both_sides(matches_df['season'], matches_df['season']),
+        'team_id': _both_sides(home, away),
+        'opponent_id': _both_sides(away, home),
+        'home': np.repeat([True, False], len(matches_df)),
+        'goals_for': _both_sides(home_score, away_score),
+        'goals_against': _both_sides(away_score, home_score),
+        'formation': _both_sides(matches_df['home_formation'], matches_df['away_formation']),
+        'odds_team': _both_sides(matches_df['quotation_home'], matches_df['quotation_away']).astype(np.float64),
+        'odds_opponent': _both_sides(matches_df['quotation_away'], matches_df['quotation_home']).astype(np.float64),
+        'odds_draw': _both_sides(matches_df['quotation_draw'], matches_df['quotation_draw']).astype(np.float64),
+    })
+    # 1 victoire, 0 nul, -1 défaite (manquant si le score n'est pas connu)
+    view['result'] = np.sign(view['goals_for'] - view['goals_against']).astype('Int8')
+
+    view = view.sort_values(['team_id', 'date', 'matchid'], kind='stable').reset_index(drop=True)
+    return view[TEAM_VIEW_COLUMNS]
+
+
+# Lignes des matchs dont le score est connu
+def played(view):
+    return view[view['result'].notna()]
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Les modules de scripts/ s'importent à plat (comme depuis streamlit run all_scripts.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
@@ -0,0 +1,78 @@
+import random
+
+import pandas as pd
+import pytest
+
+
+# Matchs JSON synthétiques : buts de joueurs de la feuille de match, buts contre son camp (joueur
+# adverse), buteurs absents de la feuille de match, buts annulés par la VAR, cartons et remplacements
+def fake_match(rng, index):
+    home_id, away_id = 1 + 2 * (index % 5), 2 + 2 * (index % 5)
+    squads = {side: [team_id * 100 + k for k in range(14)] for side, team_id in (('Home', home_id), ('Away', away_id))}
+
+    def players(side):
+        return {f'player_{p}': {'info': {'idplayer': p, 'lastname': f'P{p}', 'formation_place': k + 1 if k < 11 else 0,
+                                         'mins_played': 90, 'formation_used': '433'}}
+                for k, p in enumerate(squads[side])}
+
+    def match_data(side, other):
+        goals = []
+        for _ in range(rng.randint(0, 4)):
+            scorer = rng.choice([rng.choice(squads[side][:11]), rng.choice(squads[other][:11]), 999999])
+            goals.append({'time': rng.choice(['12', '45 +2', '77', '90 +4']), 'playerId': scorer,
+                          'type': rng.choice(['goal', 'goal', 'var'])})
+        bookings = [{'time': str(rng.randint(1, 90)), 'playerId': rng.choice(squads[side][:11]),
+                     'type': rng.choice(['yellow', 'red'])} for _ in range(rng.randint(0, 2))]
+        subs = [{'time': str(60 + 5 * k), 'subOff': squads[side][10 - k], 'subOn': squads[side][11 + k],
+                 'reason': 'Tactical'} for k in range(rng.randint(0, 3))]
+        return {'goals': goals, 'bookings': bookings, 'substitutions': subs}
+
+    return {
+        'id': f'match_{1000 + index}',
+        'dateMatch': f'2020-01-{1 + index % 28:02d}T20:00:00Z',
+        'Home': {'id': home_id, 'club': f'Club{home_id}', 'players': players('Home')},
+        'Away': {'id': away_id, 'club': f'Club{away_id}', 'players': players('Away')},
+        'matchTime': 94,
+        'period': 'FullTime',
+        'championship': 1,
+        'matchData': {'home': match_data('Home', 'Away'), 'away': match_data('Away', 'Home')},
+    }
+
+
+@pytest.fixture
+def tables(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from import_data import TABLES, extract_match
+
+    rng = random.Random(0)
+    rows = {name: [] for name in TABLES}
+    seen_teams, seen_players = set(), set()
+    for index in range(200):
+        extract_match(fake_match(rng, index), rows, seen_teams, seen_players)
+    return {name: pd.DataFrame(rows[name]) for name in ('matches', 'highlights', 'substitutions', 'match_players')}
+
+
+def test_final_score_rebuilt_from_events(tables):
+    from events import EventStore
+
+    matches = tables['matches']
+    store = EventStore(matches, tables['highlights'], tables['substitutions'], tables['match_players'])
+    states = store.states_at(120).set_index('matchid').loc[matches['matchid']]
+
+    assert (states['home_score'].to_numpy() == matches['home_score'].to_numpy()).all()
+    assert (states['away_score'].to_numpy() == matches['away_score'].to_numpy()).all()
+
+
+def test_half_time_score_counts_first_half_added_time(tables):
+    from events import EventStore, match_minutes
+
+    store = EventStore(tables['matches'], tables['highlights'], tables['substitutions'], tables['match_players'])
+    goals = tables['highlights'][tables['highlights']['type'] == 'goal']
+    minute, _ = match_minutes(goals['time'])
+    first_half = goals[minute <= 45]
+    expected = first_half.groupby(['matchid', 'side']).size().unstack(fill_value=0)
+
+    states = store.states_at(45).set_index('matchid')
+    expected = expected.reindex(states.index, fill_value=0).reindex(columns=['home', 'away'], fill_value=0)
+    assert (states['home_score'] == expected['home']).all()
+    assert (states['away_score'] == expected['away']).all()
@@ -0,0 +1,34 @@
+import pandas as pd
+
+
+def test_red_booking_counted_as_red_card(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from import_data import TABLES, extract_match, with_seasons
+    from player_seasons import compute_player_seasons
+
+    players = {f'player_{p}': {'info': {'idplayer': p, 'lastname': f'P{p}', 'formation_place': 1,
+                                        'mins_played': 90, 'formation_used': '433'}} for p in (101, 201)}
+    match = {
+        'id': 'match_1000',
+        'dateMatch': '2020-01-05T20:00:00Z',
+        'Home': {'id': 1, 'club': 'Club1', 'players': {'player_101': players['player_101']}},
+        'Away': {'id': 2, 'club': 'Club2', 'players': {'player_201': players['player_201']}},
+        'matchTime': 90,
+        'period': 'FullTime',
+        'championship': 1,
+        'matchData': {
+            'home': {'goals': [], 'bookings': [{'time': '30', 'playerId': 101, 'type': 'red'}], 'substitutions': []},
+            'away': {'goals': [], 'bookings': [{'time': '40', 'playerId': 201, 'type': 'yellow'}],
+                     'substitutions': []},
+        },
+    }
+    rows = {name: [] for name in TABLES}
+    extract_match(match, rows, set(), set())
+    tables = {name: pd.DataFrame(rows[name]) for name in ('matches', 'highlights', 'match_players')}
+
+    seasons = compute_player_seasons(with_seasons(tables['matches']), tables['match_players'],
+                                     tables['highlights']).set_index('playerid')
+    assert seasons.loc[101, 'red_cards'] == 1
+    assert seasons.loc[101, 'yellow_cards'] == 0
+    assert seasons.loc[201, 'yellow_cards'] == 1
+    assert seasons.loc[201, 'red_cards'] == 0
@@ -0,0 +1,27 @@
+import pandas as pd
+
+
+# Deux clubs homonymes (« Paris », ids 149 et 2338) : passer de l'un à l'autre est un transfert
+def test_move_between_clubs_sharing_a_name():
+    from import_data import compute_transfers
+
+    teams = pd.DataFrame({'idteam': [149, 2338, 7], 'name': ['Paris', 'Paris', 'Lyon']})
+    players = pd.DataFrame({'playerid': [10, 20], 'lastname': ['A', 'B']})
+    matches = pd.DataFrame({
+        'matchid': [f'match_{k}' for k in range(6)],
+        'date': pd.date_range('2020-01-01', periods=6, freq='7D', tz='UTC').strftime('%Y-%m-%dT%H:%M:%SZ'),
+    })
+    match_players = pd.DataFrame({
+        'playerid': [10, 10, 10, 10, 20, 20],
+        'matchid': ['match_0', 'match_1', 'match_2', 'match_3', 'match_4', 'match_5'],
+        'team_id': [149, 149, 2338, 2338, 7, 149],
+    })
+
+    transfers = compute_transfers(matches, players, teams, match_players)
+
+    first = transfers[transfers['playerid'] == 10].reset_index(drop=True)
+    assert first['team_id'].tolist() == [149, 2338]
+    assert first['team'].tolist() == ['Paris', 'Paris']
+    assert first['start_date'].tolist() == ['2020-01-01', '2020-01-15']
+    assert first['end_date'].tolist() == ['2020-01-14', '2020-01-22']
+    assert transfers[transfers['playerid'] == 20]['team_id'].tolist() == [7, 149]